@@ -90,17 +90,68 @@ PROCESS_COUNT = 10
 SHEETS_DIRECTORY = "data/sheets"
 REPORTS_DIRECTORY = "data/reports"
 CACHE_DIRECTORY = "data/cache"
+# Cache files written by the exporter: "msgpack" (binary, lazily loaded sections),
+# "json" (human-readable) and/or "shards" (data/cache/<strategy>/, one small
+# metrics-only file per condition; the optimizer commits these instead of the
+# full cache so orders stay out of git); readers prefer msgpack when present
+CACHE_FORMATS = ["msgpack", "json", "shards"]
+# Single test conditions are appended to data/cache/<strategy>.journal as they
+# finish and folded into the cache files every N conditions and after a sweep
+CACHE_COMPACT_EVERY = 8
+# TXT/XLSX reports during a single test sweep: None renders once at the end,
+# N re-renders the latest results in the background at most every N seconds
+RENDER_INTERVAL_SECONDS = None
+# SQLite history of every run's condition metrics and tags (python m.py query); None disables
+RESULTS_DB = "data/results.db"
+# Every downloaded sheet is kept under its content hash (python m.py reanalyze); None disables
+SHEET_ARCHIVE = "data/archive"
+# Agent prompt: inline the N Pine reference sections most relevant to the target
+# condition (TF-IDF over train/pinescripts_docs) within a token budget; 0 = whole file
+DOCS_TOP_K = 6
+DOCS_TOKEN_BUDGET = 2500
+# "focused": the agent edits only the target condition in a scratch file
+# (train/pc_N.openLongK.edit.pine) listing the available variables; the edit is
+# validated and spliced back. "patch": the same slice goes into the prompt, the
+# tool runs without file edits and replies with a <<<PATCH ... PATCH>>> block that
+# is applied the same way (the tool is stopped once the block closes).
+# "full" (default): the agent edits the whole script
+EDIT_MODE = "full"
+# Run TOOL directly from a per-worker session pool (binary resolved once at startup,
+# prompt fed through stdin, no install checks / --version per iteration) instead of
+# a generated bash script; with PREWARM the next process is started while the
+# backtest runs. Falls back to the scripts when the tool is not installed
+AGENT_SESSIONS = True
+AGENT_SESSIONS_PREWARM = True
 # Label Conditions
-OVERFIT_CONDITIONS = {
-    "TOTAL_TRADES_LOWER": 15,
-    "WIN_RATE_UPPER": 80,
+# Each rule: {"tag": ..., "when": [field, op, value]} or {"all"/"any": [...]} / {"not": ...};
+# op is one of < <= > >= == != in, nested fields use dots ("Monte Carlo.Net profit % p5").
+# Re-tag caches after editing with: python m.py tag
+TAG_RULES = [
+    {"tag": "OVERFIT", "when": {"all": [["Total trades", "<", 15], ["Percent profitable", ">", 80]]}},
+    {"tag": "RISK", "when": ["Max drawdown %", "<", -35]},
+    {"tag": "OVERFIT", "when": ["Monte Carlo.Net profit % p5", "<", 0]},
+    {"tag": "RISK", "when": ["Monte Carlo.Max drawdown % p5", "<", -35]},
+    {"tag": "GOOD", "when": {"all": [["Total trades", ">", 30], ["Percent profitable", ">", 80]]}},
+]
+DEFAULT_TAG = "NORMAL"
+
+# Monte Carlo trade resampling (scores stored under "Monte Carlo", used by TAG_RULES)
+ROBUSTNESS_CONDITIONS = {
+    "SAMPLES": 1000,
+    "PERCENTILE": 5,
+    "SEED": 0,
 }
 
-RISK_CONDITIONS = {
-    "MDD_LOWER": -35,
+# Walk-forward breakdown: "yearly" or "rolling" in-sample / out-of-sample windows.
+# Add "profitable_periods_min" to a target criteria dict to reject period-unstable runs
+WALK_FORWARD = {
+    "MODE": "yearly",
+    "IN_SAMPLE_DAYS": 730,
+    "OUT_OF_SAMPLE_DAYS": 365,
 }
 
-GOOD_CONDITIONS = {
-    "TOTAL_TRADES_UPPER": 30,
-    "WIN_RATE_UPPER": 80,
+# Conditions whose trigger sets overlap above this Jaccard similarity are
+# reported as redundant ("in-relation / in-range" with each other)
+OVERLAP_CONDITIONS = {
+    "JACCARD_UPPER": 0.5,
 }
@@ -19,10 +19,10 @@ async def main(_config:any):
     if not config["TOTAL_CONDITIONS"]:
         cache_dir = Path(config['CACHE_DIRECTORY'])
         if cache_dir.exists():
-            exporter = ReportExporter()
+            exporter = ReportExporter(config)
             path = os.path.join(config['CACHE_DIRECTORY'], f"{strategy_settings['strategy_name']}.json")
-            cached_data = exporter.load_cache(path)
-            exporter.exports(cached_data, strategy_settings['strategy_name'])
+            cached_data = exporter.load_cache(path, columnar=True)
+            exporter.exports(cached_data, strategy_settings['strategy_name'], record=False)
     else:
         async with async_playwright() as playwright:
             user_agent = config["USER_AGENT"]
@@ -81,6 +81,176 @@ def run_evaluate(args):
     asyncio.run(evaluate_main(config_manager.get_config()))
 
 
+def run_select(args):
+    """Pick the condition ensemble from cached single tests and optionally write it to config."""
+    sys.path.insert(0, str(Path(__file__).parent / "src"))
+    from analytics.ensemble_selector import EnsembleSelector
+    from utils.config_manager import ConfigManager
+    from utils.report_exporter import ReportExporter
+    
+    config_manager = ConfigManager("config.py")
+    
+    if args.strategy:
+        config_manager.override_strategy(args.strategy)
+    
+    target = dict(config_manager.get('TARGET_CRITERIA', {}))
+    if args.max_drawdown:
+        target['max_drawdown_max'] = args.max_drawdown
+    if args.min_trades:
+        target['total_trades_min'] = args.min_trades
+    
+    cache_path = Path(config_manager.get('CACHE_DIRECTORY', 'data/cache')) / f"{config_manager.get('STRATEGY_NAME')}.json"
+    cache = ReportExporter(config_manager.get_config()).load_cache(str(cache_path), columnar=True)
+    if not cache:
+        print(f"No cache found: {cache_path}")
+        sys.exit(1)
+    
+    selector = EnsembleSelector.from_cache(cache, target, max_nodes=args.max_nodes)
+    best = selector.select()
+    if not best:
+        print(f"No condition subset meets {target} ({selector.nodes} nodes searched)")
+        sys.exit(1)
+    
+    print(f"Conditions: {','.join(best['conditions'])}")
+    print(f"Net profit %: {best['Net profit %']}")
+    print(f"Total positions: {best['Total positions']}")
+    print(f"Max drawdown %: {best['Max drawdown %']}")
+    print(f"Nodes searched: {selector.nodes}")
+    
+    if args.write:
+        config_manager.persist_param('TOTAL_CONDITIONS', best['conditions'])
+        print(f"TOTAL_CONDITIONS written to {config_manager.config_path}")
+
+
+def run_tag(args):
+    """Re-tag cached reports with the current TAG_RULES without re-running the analyzer."""
+    sys.path.insert(0, str(Path(__file__).parent / "src"))
+    import time
+    from analytics.tag_rules import TagRuleEngine
+    from utils.config_manager import ConfigManager
+    from utils.report_exporter import ReportExporter
+    
+    config_manager = ConfigManager("config.py")
+    cache_dir = Path(config_manager.get('CACHE_DIRECTORY', 'data/cache'))
+    if args.strategy:
+        config_manager.override_strategy(args.strategy)
+        paths = [cache_dir / f"{config_manager.get('STRATEGY_NAME')}.json"]
+    else:
+        paths = sorted(cache_dir.glob("*.json"))
+    
+    exporter = ReportExporter(config_manager.get_config())
+    caches = {path: exporter.load_cache(str(path), columnar=True) for path in paths}
+    caches = {path: cache for path, cache in caches.items() if cache}
+    if not caches:
+        print(f"No cache found in: {cache_dir}")
+        sys.exit(1)
+    
+    started = time.perf_counter()
+    changed = TagRuleEngine.from_config(config_manager.get_config()).retag(list(caches.values()))
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"Re-tagged {len(caches)} cache(s): {changed} report(s) changed in {elapsed:.1f} ms")
+    
+    if args.dry_run:
+        return
+    for path, cache in caches.items():
+        exporter.save_cache(cache, path.name)
+
+
+def run_query(args):
+    """Query the results database for the best condition results across runs."""
+    sys.path.insert(0, str(Path(__file__).parent / "src"))
+    import os
+    from datetime import datetime
+    from utils.config_manager import ConfigManager
+    from utils.report_exporter import ReportExporter
+    from utils.results_db import ResultsDB, METRIC_COLUMNS, parse_since
+    
+    config_manager = ConfigManager("config.py")
+    db_path = config_manager.get('RESULTS_DB')
+    if not db_path:
+        print("RESULTS_DB is disabled in config.py")
+        sys.exit(1)
+    db = ResultsDB(db_path)
+    
+    if args.import_caches:
+        cache_dir = Path(config_manager.get('CACHE_DIRECTORY', 'data/cache'))
+        exporter = ReportExporter(config_manager.get_config())
+        for path in sorted(cache_dir.glob("*.json")):
+            cache = exporter.load_cache(str(path))
+            if cache:
+                created_at = datetime.fromtimestamp(os.path.getmtime(path)).isoformat(timespec="seconds")
+                run_id = db.import_cache(path.stem, cache, created_at)
+                print(f"Imported {path.name} as run {run_id}")
+    
+    strategy = None
+    if args.strategy:
+        config_manager.override_strategy(args.strategy)
+        strategy = config_manager.get('STRATEGY_NAME')
+    
+    try:
+        rows = db.query(strategy=strategy, condition=args.condition, since=parse_since(args.since),
+                        until=parse_since(args.until), tag=args.tag, order=args.order, limit=args.limit)
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+    if not rows:
+        print("No results")
+        return
+    
+    columns = ["run_id", "created_at", "strategy", "worker", "condition", *METRIC_COLUMNS, "tags"]
+    print("  ".join(columns))
+    for row in rows:
+        print("  ".join("-" if row[c] is None else str(row[c]) for c in columns))
+
+
+def run_reanalyze(args):
+    """Re-run the analyzer over archived sheets and record the results."""
+    sys.path.insert(0, str(Path(__file__).parent / "src"))
+    import time
+    from analytics.sheet_reanalysis import reanalyze
+    from utils.config_manager import ConfigManager
+    from utils.results_db import ResultsDB
+    from utils.sheet_archive import SheetArchive
+    
+    config_manager = ConfigManager("config.py")
+    archive_dir = config_manager.get('SHEET_ARCHIVE')
+    if not archive_dir:
+        print("SHEET_ARCHIVE is disabled in config.py")
+        sys.exit(1)
+    strategy = None
+    if args.strategy:
+        config_manager.override_strategy(args.strategy)
+        strategy = config_manager.get('STRATEGY_NAME')
+    
+    entries = SheetArchive(archive_dir).entries(strategy=strategy, condition=args.condition)
+    if args.latest:
+        # Only the newest sheet of each (strategy, worker, condition)
+        entries = list({(e["strategy"], e.get("worker"), e["condition"]): e for e in entries}.values())
+    if not entries:
+        print(f"No archived sheets in: {archive_dir}")
+        sys.exit(1)
+    
+    config = config_manager.get_config()
+    db = ResultsDB(config['RESULTS_DB']) if config.get('RESULTS_DB') and not args.dry_run else None
+    started = time.perf_counter()
+    failed = 0
+    for entry, report, error in reanalyze(config, archive_dir, entries, args.workers):
+        condition = entry["condition"] or "global"
+        if error:
+            failed += 1
+            print(f"{entry['digest'][:12]}  {entry['strategy']}  {condition}  failed: {error}")
+            continue
+        if isinstance(report, dict):
+            print(f"{entry['digest'][:12]}  {entry['strategy']}  {condition}  "
+                  f"NP {report.get('Net profit %')}  MDD {report.get('Max drawdown %')}  TT {report.get('Total trades')}")
+        if db:
+            db.record_run(entry["strategy"], [(entry["condition"], report)], source="reanalyze",
+                          code_hash=entry["code_hash"], created_at=entry["created_at"], worker=entry.get("worker"))
+    elapsed = time.perf_counter() - started
+    print(f"Re-analyzed {len(entries)} sheet(s) in {elapsed:.1f}s, {failed} failed"
+          + (f"; recorded to {config['RESULTS_DB']}" if db else ""))
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Trading Analytics Tool',
@@ -92,6 +262,10 @@ Examples:
   python m.py optimize --conditions "1-26"
   python m.py optimize --strategy xau-long --conditions "1-10" --max-iterations 100
   python m.py evaluate --strategy eth-long
+  python m.py select --strategy btc-long --max-drawdown 30 --write
+  python m.py tag --dry-run
+  python m.py query --strategy btc-long --condition 11 --since 7d --order mdd
+  python m.py reanalyze --strategy btc-long --latest --workers 8
         """
     )
     
@@ -113,6 +287,38 @@ Examples:
     ev.add_argument('--strategy', '-s', help='Strategy key')
     ev.add_argument('--conditions', '-c', help='Conditions to evaluate')
     
+    # Select
+    sel = subparsers.add_parser('select', help='Select condition ensemble from cache')
+    sel.add_argument('--strategy', '-s', help='Strategy key')
+    sel.add_argument('--max-drawdown', type=float, help='Portfolio max drawdown %')
+    sel.add_argument('--min-trades', type=int, help='Min positions required')
+    sel.add_argument('--max-nodes', type=int, default=200000, help='Search node budget')
+    sel.add_argument('--write', action='store_true', help='Write TOTAL_CONDITIONS back to config.py')
+    
+    # Tag
+    tag = subparsers.add_parser('tag', help='Re-tag cached reports with TAG_RULES')
+    tag.add_argument('--strategy', '-s', help='Strategy key (all caches when omitted)')
+    tag.add_argument('--dry-run', action='store_true', help='Report changes without writing caches')
+    
+    # Query
+    qry = subparsers.add_parser('query', help='Query results history (RESULTS_DB)')
+    qry.add_argument('--strategy', '-s', help='Strategy key (all strategies when omitted)')
+    qry.add_argument('--condition', '-c', help='Condition id, or "global" for the global test')
+    qry.add_argument('--since', help='Runs newer than "7d" / "12h" / "2w" or an ISO date')
+    qry.add_argument('--until', help='Runs older than "7d" / "12h" / "2w" or an ISO date')
+    qry.add_argument('--tag', help='Only results carrying this tag')
+    qry.add_argument('--order', default='mdd', help='Sort: mdd, profit, trades, win-rate, recent')
+    qry.add_argument('--limit', type=int, default=20, help='Maximum rows')
+    qry.add_argument('--import-caches', action='store_true', help='Import data/cache/*.json first')
+    
+    # Reanalyze
+    rea = subparsers.add_parser('reanalyze', help='Re-run the analyzer over archived sheets (SHEET_ARCHIVE)')
+    rea.add_argument('--strategy', '-s', help='Strategy key (all strategies when omitted)')
+    rea.add_argument('--condition', '-c', help='Condition id, or "global" for the global test')
+    rea.add_argument('--latest', action='store_true', help='Only the newest sheet per strategy, worker and condition')
+    rea.add_argument('--workers', '-w', type=int, help='Worker processes (default: CPU count)')
+    rea.add_argument('--dry-run', action='store_true', help='Print results without recording them to RESULTS_DB')
+    
     args = parser.parse_args()
     
     if not args.mode:
@@ -123,6 +329,14 @@ Examples:
         run_optimize(args)
     elif args.mode == 'evaluate':
         run_evaluate(args)
+    elif args.mode == 'select':
+        run_select(args)
+    elif args.mode == 'tag':
+        run_tag(args)
+    elif args.mode == 'query':
+        run_query(args)
+    elif args.mode == 'reanalyze':
+        run_reanalyze(args)
 
 
 if __name__ == "__main__":
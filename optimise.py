@@ -11,7 +11,8 @@ sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 from automation.tradingview_bot import TradingViewBot
 from utils.config_manager import ConfigManager
-from utils.report_exporter import ReportExporter
+from utils.results_db import ResultsDB
+from utils.file_operations import atomic_copy
 from analytics.strategy_analyzer import StrategyAnalyzer
 import asyncio
 import pyotp
@@ -22,9 +23,9 @@ import json
 import os
 from pathlib import Path
 from train.embedding import run_strategy_embedding, load_pine_code
+from train.agent_sessions import AgentSessionPool
 from utils.github_utils import auto_commit_and_push
 from utils.process_logger import init_logger
-import shutil
 
 
 def main():
@@ -37,7 +38,8 @@ def main():
 def is_target_criteria(results, target):
     """Check if backtest results meet target criteria"""
     return (results["Total trades"] >= target["total_trades_min"] and 
-            abs(results["Max drawdown %"]) <= target["max_drawdown_max"])
+            abs(results["Max drawdown %"]) <= target["max_drawdown_max"] and
+            (results.get("Profitable periods %") or 0) >= target.get("profitable_periods_min", 0))
 
 
 async def run_strategy_agent(config):
@@ -64,23 +66,29 @@ async def run_strategy_agent(config):
         await tdv_login.action_setup_tradingview_login(login_page)
         await login_page.close()
         await asyncio.sleep(5)
-        exporter = ReportExporter()
+        results_db = ResultsDB(config["RESULTS_DB"]) if config.get("RESULTS_DB") else None
         print("[INFO] Authenticate successfully")
 
+        # Resolve the agent tool once; workers then reuse warm processes
+        sessions = None
+        if config.get("AGENT_SESSIONS", False):
+            sessions = AgentSessionPool(prewarm=config.get("AGENT_SESSIONS_PREWARM", True))
+            try:
+                print(f"[INFO] Agent tool: {sessions.resolve(config['TOOL'])}")
+            except (OSError, ValueError) as e:
+                print(f"[WARN] Agent sessions disabled, using tool scripts: {e}")
+                sessions = None
+
         async def excute_optimise(pc_name: str, pc_page: Any):
             """Execute optimization for a single strategy"""
             try:
                 pinescript_path = f"train/{pc_name}.pine"
                 code = load_pine_code(path = pinescript_path)
                 if code == "":
-                    shutil.copy("train/dev.pine", f"train/{pc_name}.pine",follow_symlinks=True)
+                    atomic_copy("train/dev.pine", f"train/{pc_name}.pine")
 
                 logger.update(pc_name, status='INIT', message='Loading cache')
                 
-                cache = exporter.load_cache(pc_name)
-                if not cache:
-                    cache = {}
-                
                 # Setup optimization parameters
                 target = config["TARGET_CRITERIA"]
                 name = config["ASSET_NAME"]
@@ -90,8 +98,8 @@ async def run_strategy_agent(config):
                 max_iterations = config["MAX_ITERATIONS"]
                 max_consecutive_errors = config["MAX_CONSECUTIVE_ERRORS"]
                 
-                single_test_cache = cache.get("single_test", {})
-                backtest = single_test_cache.get(ensemble_open_long, {})
+                # Committed with each iteration's results (the initial backtest below refreshes it)
+                cache_path = os.path.join(config["CACHE_DIRECTORY"], f"{pc_name}.json")
                 
                 consecutive_errors = 0
                 lmm_res = {}
@@ -129,7 +137,7 @@ async def run_strategy_agent(config):
                        iteration_count < max_iterations and
                        consecutive_errors < max_consecutive_errors):
                     if duplicate_consecutive_errors >= config["MAX_DUPLICATE_CONSECUTIVE_ERRORS"]:
-                        shutil.copy("train/dev.pine", f"train/{pc_name}.pine",follow_symlinks=True)
+                        atomic_copy("train/dev.pine", f"train/{pc_name}.pine")
                         logger.update(pc_name, message='Duplicate consecutive errors, reset to dev.pine')
                         lmm_res = {"assistant": ""}
                     iteration_count += 1
@@ -149,8 +157,22 @@ async def run_strategy_agent(config):
                         assitent_comment_before=lmm_res.get("assistant", ""),
                         command="agent",
                         model="auto",
-                        pinescript_path=pinescript_path
+                        pinescript_path=pinescript_path,
+                        docs_top_k=config.get("DOCS_TOP_K", 6),
+                        docs_token_budget=config.get("DOCS_TOKEN_BUDGET", 2500),
+                        edit_mode=config.get("EDIT_MODE", "full"),
+                        sessions=sessions,
+                        worker=pc_name
                     )
+                    if lmm_res.get("focused_edit"):
+                        # The Pine file was left untouched; backtesting it again would record a stale run
+                        consecutive_errors += 1
+                        logger.update(
+                            pc_name,
+                            errors=consecutive_errors,
+                            message=f'Edit rejected: {lmm_res["focused_edit"][:30]}'
+                        )
+                        continue
                     
                     await asyncio.sleep(2)
                     
@@ -186,8 +208,8 @@ async def run_strategy_agent(config):
                         # Save results
                         option = os.environ.get("OPTION", "github")
                         file_path = "data/prompts/" + (
-                            "potential_conditions.json" if is_target_criteria(backtest, target_potential) 
-                            else "another_conditions.json"
+                            "potential_conditions.jsonl" if is_target_criteria(backtest, target_potential) 
+                            else "another_conditions.jsonl"
                         )
                         github_message = (
                             f"{pc_name} | "
@@ -198,6 +220,13 @@ async def run_strategy_agent(config):
                             f"[PP|{backtest['Percent profitable']}]"
                         )
                         
+                        # Keep the model output and verdict next to the run the bot recorded
+                        if results_db:
+                            results_db.record_candidate(
+                                config["STRATEGY_NAME"], strategy_code, assistant=lmm_res.get("assistant", ""),
+                                verdict="potential" if is_target_criteria(backtest, target_potential) else "another",
+                            )
+                        
                         if option == "cache_json":
                             add_to_cache({
                                 **lmm_res,
@@ -208,7 +237,10 @@ async def run_strategy_agent(config):
                                                      else backtest["Percent profitable"],
                             }, file_path)
                         elif option == "github":
-                            auto_commit_and_push(github_message, files_path=[pinescript_path, f"data/cache/{pc_name}.json", f"data/reports/{pc_name}.txt", f"data/reports/{pc_name}.xlsx", f"data/sheets/{pc_name}.xlsx"])
+                            # With cache shards only the metrics of changed conditions are committed
+                            cache_files = (os.path.join(config["CACHE_DIRECTORY"], pc_name)
+                                           if "shards" in config.get("CACHE_FORMATS", []) else cache_path)
+                            auto_commit_and_push(github_message, files_path=[pinescript_path, cache_files, f"data/reports/{pc_name}.txt", f"data/reports/{pc_name}.xlsx", f"data/sheets/{pc_name}.xlsx"])
                         consecutive_errors = 0
                         
                     except Exception as e:
@@ -268,6 +300,8 @@ async def run_strategy_agent(config):
         
         # Stop display
         await logger.stop_live_display()
+        if sessions is not None:
+            await sessions.close()
         
         await asyncio.sleep(5)
         await browser_context.close()
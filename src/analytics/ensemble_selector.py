@@ -0,0 +1,280 @@
+"""
+Ensemble subset selection over cached per-condition single test results.
+"""
+
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+from bitarray import bitarray
+
+from analytics.signal_bitmap import condition_sort_key
+
+
+class EnsembleSelector:
+    """Picks the set of conditions to enable together without new backtests."""
+
+    def __init__(
+        self,
+        single_test: Dict[str, Any],
+        max_drawdown: float,
+        min_trades: int = 0,
+        max_nodes: int = 200000,
+    ):
+        """
+        Initialize selector from cached single test reports.
+
+        Args:
+            single_test: ``single_test`` section of a cache file (condition -> report)
+            max_drawdown: Portfolio max drawdown limit in percent (positive, e.g. 30)
+            min_trades: Minimum number of distinct positions the ensemble must take
+            max_nodes: Search node budget; best subset found so far is returned when hit
+        """
+        self.max_drawdown = abs(float(max_drawdown))
+        self.min_trades = int(min_trades)
+        self.max_nodes = max_nodes
+        self.best: Optional[Dict[str, Any]] = None
+        self.nodes = 0
+        self._build_timelines(single_test)
+
+    def _build_timelines(self, single_test: Dict[str, Any]):
+        """
+        Align every condition's positions on one shared exit-time timeline.
+
+        ``slot_pnl`` holds each condition's P&L % per slot, -inf where the
+        condition takes no position there.
+        """
+        reports = {
+            k: v for k, v in single_test.items()
+            if isinstance(v, dict) and v.get("positions")
+        }
+        slots = sorted({p for report in reports.values() for p in report["positions"]})
+        slot_index = {key: i for i, key in enumerate(slots)}
+
+        capitals = [self._initial_capital(r) for r in reports.values()]
+        fallback_capital = next((c for c in capitals if c), 1000.0)
+
+        self.conditions: List[str] = sorted(reports.keys(), key=condition_sort_key)
+        self.slots = slots
+        self.bitsets: List[bitarray] = []
+        self.slot_pnl = np.full((len(self.conditions), len(slots)), -np.inf)
+        self.position_mdd = np.zeros(len(self.conditions), dtype=float)
+
+        for row, condition in enumerate(self.conditions):
+            report = reports[condition]
+            capital = self._initial_capital(report) or fallback_capital
+            bits = bitarray(len(slots))
+            bits.setall(0)
+            for key, position in report["positions"].items():
+                col = slot_index[key]
+                bits[col] = 1
+                self.slot_pnl[row, col] = sum(
+                    float(o.get("Net P&L USD", 0) or 0) for o in position.get("orders", [])
+                ) / capital * 100
+            self.bitsets.append(bits)
+            self.position_mdd[row] = min(
+                (float(p.get("Position max drawdown %", 0)) for p in report["positions"].values()),
+                default=0.0,
+            )
+
+        self.total_pnl = np.where(np.isneginf(self.slot_pnl), 0.0, self.slot_pnl).sum(axis=1)
+
+    @staticmethod
+    def _initial_capital(report: Dict[str, Any]) -> Optional[float]:
+        """Derive initial capital from TradingView's net profit USD / % pair."""
+        try:
+            net_usd = float(report.get("Net profit", 0))
+            net_pct = float(report.get("Net profit %", 0))
+        except (TypeError, ValueError):
+            return None
+        if net_pct == 0 or net_usd != net_usd or net_pct != net_pct:
+            return None
+        return net_usd / net_pct * 100
+
+    @staticmethod
+    def _slot_pnl(combined: np.ndarray) -> np.ndarray:
+        """P&L % per slot of a combined curve (0 where no member trades)."""
+        return np.where(np.isneginf(combined), 0.0, combined)
+
+    def _result(self, rows: List[int], combined: np.ndarray, union: bitarray) -> Dict[str, Any]:
+        """Metrics of a subset from its combined per-slot curve."""
+        pnl = self._slot_pnl(combined)
+        return {
+            "conditions": sorted((self.conditions[r] for r in rows), key=condition_sort_key),
+            "Net profit %": round(float(pnl.sum()), 4),
+            "Total positions": union.count(),
+            "Max drawdown %": round(min(float(self.position_mdd[rows].min()), self._equity_drawdown(pnl)), 4),
+        }
+
+    @staticmethod
+    def _equity_drawdown(pnl: np.ndarray) -> float:
+        """Running-peak drawdown of a cumulative P&L % curve (<= 0)."""
+        if pnl.size == 0:
+            return 0.0
+        equity = np.concatenate(([0.0], np.cumsum(pnl)))
+        return float((equity - np.maximum.accumulate(equity)).min())
+
+    def evaluate(self, conditions: List[str]) -> Dict[str, Any]:
+        """
+        Score a subset of conditions.
+
+        The enabled conditions share one position per slot, so a slot that
+        several of them trigger is counted once, with the best of their P&L.
+
+        Args:
+            conditions: Condition ids to enable together
+
+        Returns:
+            Dictionary with net profit %, distinct positions and max drawdown %
+        """
+        rows = [self.conditions.index(c) for c in conditions]
+        if not rows:
+            return {"conditions": [], "Net profit %": 0.0, "Total positions": 0, "Max drawdown %": 0.0}
+        union = bitarray(len(self.slots))
+        union.setall(0)
+        for row in rows:
+            union |= self.bitsets[row]
+        return self._result(rows, self.slot_pnl[rows].max(axis=0), union)
+
+    def _is_feasible(self, result: Dict[str, Any]) -> bool:
+        return (
+            abs(result["Max drawdown %"]) <= self.max_drawdown
+            and result["Total positions"] >= self.min_trades
+        )
+
+    def _is_better(self, result: Dict[str, Any], best: Optional[Dict[str, Any]]) -> bool:
+        if best is None:
+            return True
+        return (result["Net profit %"], result["Total positions"]) > (
+            best["Net profit %"], best["Total positions"]
+        )
+
+    def greedy(self) -> Optional[Dict[str, Any]]:
+        """
+        Add conditions in order of standalone profit while the drawdown limit holds.
+
+        Returns:
+            Best feasible subset seen during the greedy pass, or None
+        """
+        chosen: List[str] = []
+        best = None
+        for row in np.argsort(-self.total_pnl, kind="stable"):
+            if self.total_pnl[row] <= 0 and best is not None:
+                break
+            candidate = chosen + [self.conditions[row]]
+            result = self.evaluate(candidate)
+            if abs(result["Max drawdown %"]) > self.max_drawdown:
+                continue
+            chosen = candidate
+            if self._is_feasible(result) and self._is_better(result, best):
+                best = result
+        return best
+
+    def select(self) -> Optional[Dict[str, Any]]:
+        """
+        Branch-and-bound search for the most profitable feasible subset.
+
+        Conditions are explored in order of standalone profit. A branch is cut
+        when any member's position drawdown already breaks the limit (adding
+        conditions can only make it worse), when the best P&L any remaining
+        condition could give each slot cannot beat the incumbent, or when all
+        remaining positions cannot reach ``min_trades``. The greedy result
+        seeds the incumbent.
+
+        The objective is combined net profit (ties: more positions) rather
+        than profit per trade: the per-trade ratio is maximized by the few
+        best trades and ignores profit the other conditions add.
+
+        Returns:
+            Best subset with its metrics, or None when nothing is feasible
+        """
+        order = [int(r) for r in np.argsort(-self.total_pnl, kind="stable")]
+        order = [r for r in order if self.position_mdd[r] >= -self.max_drawdown]
+        # Best P&L the conditions from each depth on can put in each slot
+        slot_suffix = np.full((len(order) + 1, len(self.slots)), -np.inf)
+        for depth in range(len(order) - 1, -1, -1):
+            slot_suffix[depth] = np.maximum(slot_suffix[depth + 1], self.slot_pnl[order[depth]])
+
+        empty = bitarray(len(self.slots))
+        empty.setall(0)
+        remaining_bits: List[bitarray] = [empty]
+        for r in reversed(order):
+            remaining_bits.append(remaining_bits[-1] | self.bitsets[r])
+        remaining_bits.reverse()
+
+        self.best = self.greedy()
+        self.nodes = 0
+        self._search(order, 0, [], np.full(len(self.slots), -np.inf), empty, slot_suffix, remaining_bits)
+        return self.best
+
+    def _search(
+        self,
+        order: List[int],
+        depth: int,
+        chosen: List[int],
+        combined: np.ndarray,
+        union: bitarray,
+        slot_suffix: np.ndarray,
+        remaining_bits: List[bitarray],
+    ):
+        self.nodes += 1
+        if self.nodes > self.max_nodes:
+            return
+
+        if chosen:
+            result = self._result(chosen, combined, union)
+            if self._is_feasible(result) and self._is_better(result, self.best):
+                self.best = result
+
+        if depth >= len(order):
+            return
+        if self.best is not None:
+            # Slots no member trades yet can still be left out (0)
+            bound = np.maximum(np.where(np.isneginf(combined), 0.0, combined), slot_suffix[depth]).sum()
+            if bound <= self.best["Net profit %"]:
+                return
+        if (union | remaining_bits[depth]).count() < self.min_trades:
+            return
+
+        row = order[depth]
+        self._search(
+            order, depth + 1, chosen + [row], np.maximum(combined, self.slot_pnl[row]),
+            union | self.bitsets[row], slot_suffix, remaining_bits,
+        )
+        self._search(order, depth + 1, chosen, combined, union, slot_suffix, remaining_bits)
+
+    @classmethod
+    def from_cache(
+        cls, cache: Dict[str, Any], target: Dict[str, Any], max_nodes: int = 200000
+    ) -> "EnsembleSelector":
+        """
+        Build selector from a loaded cache file and TARGET_CRITERIA.
+
+        Args:
+            cache: Parsed ``data/cache/<strategy>.json``
+            target: Dict with ``max_drawdown_max`` and ``total_trades_min``
+            max_nodes: Search node budget
+
+        Returns:
+            EnsembleSelector instance
+        """
+        return cls(
+            cache.get("single_test", {}) or {},
+            max_drawdown=target.get("max_drawdown_max", 30),
+            min_trades=target.get("total_trades_min", 0),
+            max_nodes=max_nodes,
+        )
+
+
+def select_conditions(cache: Dict[str, Any], target: Dict[str, Any]) -> Tuple[List[str], Optional[Dict[str, Any]]]:
+    """
+    Convenience wrapper returning the chosen condition ids and their metrics.
+
+    Args:
+        cache: Parsed cache file
+        target: TARGET_CRITERIA dict
+
+    Returns:
+        Tuple of (condition ids, metrics or None)
+    """
+    best = EnsembleSelector.from_cache(cache, target).select()
+    return (best["conditions"] if best else []), best
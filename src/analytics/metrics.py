@@ -0,0 +1,242 @@
+"""
+Equity curve, drawdown and risk metrics computed from order records.
+"""
+
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from utils.order_table import OrderTable
+
+DEFAULT_CAPITAL = 1000.0
+
+
+class EquityCurves:
+    """
+    Equity curves of the whole strategy and of every condition on one timeline.
+
+    Row 0 holds every closed trade; row i > 0 holds only the trades whose
+    entry signal contains condition i. Columns are trades ordered by exit
+    time. Each trade is measured as a return on the account equity before it
+    closed (TradingView sizes orders from current equity), so condition curves
+    compound the same returns and all curves come from a single cumulative
+    product.
+    """
+
+    def __init__(
+        self,
+        labels: List[str],
+        membership: np.ndarray,
+        pnl: np.ndarray,
+        entry_time: np.ndarray,
+        exit_time: np.ndarray,
+        closed: np.ndarray,
+        capital: float,
+    ):
+        """
+        Initialize curves from per-trade arrays.
+
+        Args:
+            labels: Curve labels; ``labels[0]`` is the global curve
+            membership: Boolean matrix (curves, trades)
+            pnl: Net P&L USD per trade
+            entry_time: First entry time per trade (datetime64[ns])
+            exit_time: Exit time per trade (datetime64[ns])
+            closed: Mask of closed trades (open trades only count for exposure)
+            capital: Initial capital in USD
+        """
+        order = np.argsort(exit_time, kind="stable")
+        self.labels = labels
+        self.membership = membership[:, order]
+        self.pnl = np.where(closed, pnl, 0.0)[order]
+        self.entry_time = entry_time[order]
+        self.exit_time = exit_time[order]
+        self.closed = closed[order]
+        self.capital = capital
+        equity_before = capital + np.cumsum(self.pnl) - self.pnl
+        self.returns = np.divide(
+            self.pnl, equity_before, out=np.zeros_like(self.pnl), where=equity_before > 0
+        ).clip(-1.0, None)
+
+    @staticmethod
+    def _initial_capital(table: OrderTable) -> float:
+        """Derive initial capital from the Cumulative P&L USD / % columns."""
+        if "Cumulative P&L USD" not in table.columns or "Cumulative P&L %" not in table.columns:
+            return DEFAULT_CAPITAL
+        usd = np.asarray(table.column("Cumulative P&L USD"), dtype=float)
+        pct = np.asarray(table.column("Cumulative P&L %"), dtype=float)
+        valid = np.isfinite(usd) & np.isfinite(pct) & (np.abs(pct) >= 0.5)
+        if not valid.any():
+            return DEFAULT_CAPITAL
+        return float(np.median(usd[valid] / pct[valid] * 100))
+
+    @classmethod
+    def from_orders(
+        cls, orders: Union[OrderTable, List[Dict[str, Any]]], capital: Optional[float] = None
+    ) -> "EquityCurves":
+        """
+        Build curves from the rows of the "List of trades" sheet.
+
+        Args:
+            orders: OrderTable or list of order dictionaries
+            capital: Initial capital; derived from the cumulative P&L columns when None
+
+        Returns:
+            EquityCurves instance (no curve columns when there are no exits)
+        """
+        table = orders if isinstance(orders, OrderTable) else OrderTable.from_records(orders)
+        if capital is None:
+            capital = cls._initial_capital(table) if len(table) else DEFAULT_CAPITAL
+        empty = np.array([], dtype="datetime64[ns]")
+        if len(table) == 0:
+            return cls([None], np.zeros((1, 0), dtype=bool), np.zeros(0), empty, empty, np.zeros(0, dtype=bool), capital)
+
+        types = pd.Series(table.column("Type", ""), dtype=object).astype(str)
+        times = pd.to_datetime(pd.Series(table.column("Date/Time", ""), dtype=object), errors="coerce").to_numpy()
+        is_exit = types.str.contains("Exit", regex=False).to_numpy() & ~np.isnat(times)
+        is_entry = types.str.contains("Entry", regex=False).to_numpy()
+        trade_codes, trade_numbers = pd.factorize(pd.Series(table.column("Trade #"), dtype=object))
+
+        # One column per trade: its first exit, its earliest entry and first entry signal
+        exit_rows = np.flatnonzero(is_exit & (trade_codes >= 0))
+        exit_rows = exit_rows[np.unique(trade_codes[exit_rows], return_index=True)[1]]
+        trade_of_exit = trade_codes[exit_rows]
+        entry_time = times[exit_rows].copy()
+        entry_rows = np.flatnonzero(is_entry & (trade_codes >= 0) & ~np.isnat(times))
+        first_entry = np.full(len(trade_numbers), -1, dtype=np.int64)
+        first_entry[trade_codes[entry_rows][::-1]] = entry_rows[::-1]
+        earliest = np.full(len(trade_numbers), np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(earliest, trade_codes[entry_rows], times[entry_rows].astype(np.int64))
+        has_entry = first_entry[trade_of_exit] >= 0
+        entry_time[has_entry] = earliest[trade_of_exit[has_entry]].astype("datetime64[ns]")
+
+        pnl = np.asarray(table.column("Net P&L USD", 0.0)[exit_rows], dtype=float)
+        signals = table.signals()
+        closed = np.array(
+            [signals.distinct[c].head != "Open" for c in signals.codes[exit_rows].tolist()], dtype=bool
+        ) & np.isfinite(pnl)
+
+        # Condition membership from the entry signal (same keys as the analyzer)
+        entry_rows_of_trade = first_entry[trade_of_exit]
+        signal_codes, distinct = pd.factorize(
+            np.where(entry_rows_of_trade >= 0, signals.codes[np.maximum(entry_rows_of_trade, 0)], -1)
+        )
+        token_ids: Dict[str, int] = {}
+        parsed = [
+            [token_ids.setdefault(k, len(token_ids)) for k in (signals.distinct[d].head if d >= 0 else "").split(" ")[:-1]]
+            for d in distinct
+        ]
+        labels = list(token_ids.keys())
+        signal_tokens = np.zeros((len(distinct), len(labels)), dtype=bool)
+        for s, tokens in enumerate(parsed):
+            signal_tokens[s, tokens] = True
+        membership = np.vstack((np.ones((1, len(exit_rows)), dtype=bool), signal_tokens[signal_codes].T))
+        return cls([None] + labels, membership, pnl, entry_time, times[exit_rows], closed, capital)
+
+    def equity(self) -> np.ndarray:
+        """
+        Equity of every curve after each trade, starting from initial capital.
+
+        Returns:
+            Array of shape (curves, trades + 1)
+        """
+        growth = np.where(self.membership, 1.0 + self.returns, 1.0)
+        start = np.ones((len(self.labels), 1))
+        return self.capital * np.hstack((start, np.cumprod(growth, axis=1)))
+
+    def drawdown(self) -> np.ndarray:
+        """Running-peak drawdown % of every curve (<= 0), same shape as equity()."""
+        equity = self.equity()
+        peak = np.maximum.accumulate(equity, axis=1)
+        return np.divide(equity - peak, peak, out=np.zeros_like(equity), where=peak > 0) * 100
+
+    def exposure(self) -> np.ndarray:
+        """Share of the backtest span (%) each curve holds at least one open trade."""
+        if self.exit_time.size == 0:
+            return np.zeros(len(self.labels))
+        start = self.entry_time.astype(np.int64).astype(float)
+        end = self.exit_time.astype(np.int64).astype(float)
+        span = end.max() - start.min()
+        if span <= 0:
+            return np.zeros(len(self.labels))
+        # Interval union per curve: clip each trade against the latest end seen so far
+        order = np.argsort(start, kind="stable")
+        start, end, member = start[order], end[order], self.membership[:, order]
+        ends = np.where(member, end, -np.inf)
+        covered_until = np.hstack((np.full((len(self.labels), 1), -np.inf), np.maximum.accumulate(ends, axis=1)[:, :-1]))
+        covered = np.clip(end - np.maximum(start, covered_until), 0, None)
+        return np.where(member, covered, 0.0).sum(axis=1) / span * 100
+
+    def yearly_returns(self) -> Tuple[List[int], np.ndarray]:
+        """
+        Return % of every curve per calendar year of trade exits.
+
+        Returns:
+            Tuple of (years, array of shape (curves, years))
+        """
+        if self.exit_time.size == 0:
+            return [], np.zeros((len(self.labels), 0))
+        exit_years = self.exit_time.astype("datetime64[Y]").astype(int) + 1970
+        years, year_index = np.unique(exit_years, return_inverse=True)
+        log_growth = np.zeros((len(self.labels), len(years)))
+        with np.errstate(divide="ignore"):
+            trade_log = np.log1p(np.where(self.membership, self.returns, 0.0))
+        np.add.at(log_growth.T, year_index, trade_log.T)
+        return years.tolist(), np.expm1(log_growth) * 100
+
+    def metrics(self) -> List[Dict[str, Any]]:
+        """
+        Risk metrics of every curve, in ``labels`` order.
+
+        Returns:
+            List of dictionaries with equity max drawdown, CAGR, Calmar ratio,
+            Ulcer index, exposure and per-year returns
+        """
+        equity = self.equity()
+        drawdown = self.drawdown()
+        max_drawdown = drawdown.min(axis=1)
+        ulcer = np.sqrt(np.mean(drawdown ** 2, axis=1))
+        growth = equity[:, -1] / self.capital
+        years = 0.0
+        if self.exit_time.size:
+            span = self.exit_time.max() - self.entry_time.min()
+            years = span / np.timedelta64(1, "D") / 365.25
+        if years > 0:
+            cagr = np.where(growth > 0, (np.maximum(growth, 1e-12) ** (1 / years) - 1) * 100, -100.0)
+        else:
+            cagr = np.zeros(len(self.labels))
+        exposure = self.exposure()
+        year_labels, yearly = self.yearly_returns()
+
+        results = []
+        for i in range(len(self.labels)):
+            results.append({
+                "Equity max drawdown %": round(float(max_drawdown[i]), 4),
+                "CAGR %": round(float(cagr[i]), 4),
+                "Calmar ratio": round(float(cagr[i] / -max_drawdown[i]), 4) if max_drawdown[i] < 0 else None,
+                "Ulcer index": round(float(ulcer[i]), 4),
+                "Exposure %": round(float(exposure[i]), 4),
+                "Yearly returns %": {
+                    str(year): round(float(value), 4) for year, value in zip(year_labels, yearly[i])
+                },
+            })
+        return results
+
+
+def compute_equity_metrics(
+    orders: Union[OrderTable, List[Dict[str, Any]], EquityCurves], capital: Optional[float] = None
+) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    """
+    Compute equity metrics for the whole strategy and each condition in one pass.
+
+    Args:
+        orders: Rows of the "List of trades" sheet, or prebuilt EquityCurves
+        capital: Initial capital; derived from the orders when None
+
+    Returns:
+        Tuple of (global metrics, condition id -> metrics)
+    """
+    curves = orders if isinstance(orders, EquityCurves) else EquityCurves.from_orders(orders, capital)
+    results = curves.metrics()
+    return results[0], dict(zip(curves.labels[1:], results[1:]))
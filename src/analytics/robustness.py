@@ -0,0 +1,136 @@
+"""
+Monte Carlo trade-resampling robustness scores.
+"""
+
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+import numpy as np
+
+from analytics.metrics import EquityCurves
+from utils.order_table import OrderTable
+
+
+class TradeBootstrap:
+    """
+    Bootstrap every equity curve of an EquityCurves set in one NumPy batch.
+
+    Each curve's trade returns are resampled with replacement (same number of
+    trades) many times. All curves are laid out side by side as segments of
+    one flat array per sample, so cumulative equity, running peaks and
+    per-curve reductions are computed for every curve and sample at once.
+    """
+
+    def __init__(self, curves: EquityCurves, max_cells: int = 4_000_000):
+        """
+        Initialize bootstrap from prepared curves.
+
+        Args:
+            curves: Curves built by EquityCurves.from_orders
+            max_cells: Max samples x trades cells held in memory per batch
+        """
+        self.curves = curves
+        self.max_cells = max_cells
+        rows, cols = np.nonzero(curves.membership)
+        self.lengths = curves.membership.sum(axis=1)
+        self.active = np.flatnonzero(self.lengths > 0)
+        self.log_returns = np.log1p(np.maximum(curves.returns[cols], -0.999999))
+        segment_lengths = self.lengths[self.active]
+        self.starts = np.concatenate(([0], np.cumsum(segment_lengths)[:-1])).astype(np.int64)
+        self.segment = np.repeat(np.arange(len(self.active)), segment_lengths)
+
+    def _batch(self, rng: np.random.Generator, samples: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Resample one batch; returns (log growth, log max drawdown), each (samples, active curves)."""
+        total = self.segment.size
+        lengths = self.lengths[self.active][self.segment]
+        draws = self.starts[self.segment] + (rng.random((samples, total)) * lengths).astype(np.int64)
+        values = self.log_returns[draws]
+
+        cumulative = np.cumsum(values, axis=1)
+        before_segment = np.hstack((np.zeros((samples, 1)), cumulative[:, self.starts[1:] - 1]))
+        cumulative -= before_segment[:, self.segment]
+
+        # Lift each segment above the previous one so a single running max resets per curve
+        lift = (np.abs(values).sum(axis=1, keepdims=True) + 1.0) * self.segment
+        lifted = cumulative + lift
+        peak = np.maximum(np.maximum.accumulate(lifted, axis=1), lift)
+        drawdown = np.minimum.reduceat(lifted - peak, self.starts, axis=1)
+        growth = np.add.reduceat(values, self.starts, axis=1)
+        return growth, np.minimum(drawdown, 0.0)
+
+    def run(self, samples: int = 1000, seed: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Resample all curves.
+
+        Args:
+            samples: Number of bootstrap samples per curve
+            seed: Random seed (reproducible scores when set)
+
+        Returns:
+            Tuple of (net profit %, max drawdown %) arrays of shape (samples, curves);
+            curves without trades stay at 0
+        """
+        profit = np.zeros((samples, len(self.curves.labels)))
+        drawdown = np.zeros((samples, len(self.curves.labels)))
+        if self.segment.size == 0:
+            return profit, drawdown
+        rng = np.random.default_rng(seed)
+        step = max(1, self.max_cells // self.segment.size)
+        for begin in range(0, samples, step):
+            count = min(step, samples - begin)
+            growth, mdd = self._batch(rng, count)
+            profit[begin:begin + count, self.active] = np.expm1(growth) * 100
+            drawdown[begin:begin + count, self.active] = np.expm1(mdd) * 100
+        return profit, drawdown
+
+    def summary(self, samples: int = 1000, percentile: float = 5, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Percentile scores of every curve, in ``curves.labels`` order.
+
+        Args:
+            samples: Number of bootstrap samples per curve
+            percentile: Pessimistic percentile to report (e.g. 5)
+            seed: Random seed
+
+        Returns:
+            List of dictionaries with percentile / median profit and drawdown
+            and the probability of ending at a loss
+        """
+        profit, drawdown = self.run(samples, seed)
+        low_profit, median_profit = np.percentile(profit, [percentile, 50], axis=0)
+        low_mdd, median_mdd = np.percentile(drawdown, [percentile, 50], axis=0)
+        loss = (profit < 0).mean(axis=0) * 100
+        tag = f"p{percentile:g}"
+        return [
+            {
+                "Samples": samples,
+                f"Net profit % {tag}": round(float(low_profit[i]), 4),
+                "Net profit % p50": round(float(median_profit[i]), 4),
+                f"Max drawdown % {tag}": round(float(low_mdd[i]), 4),
+                "Max drawdown % p50": round(float(median_mdd[i]), 4),
+                "Loss probability %": round(float(loss[i]), 4),
+            }
+            for i in range(len(self.curves.labels))
+        ]
+
+
+def bootstrap_robustness(
+    orders: Union[OrderTable, List[Dict[str, Any]], EquityCurves],
+    samples: int = 1000,
+    percentile: float = 5,
+    seed: Optional[int] = None,
+) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    """
+    Bootstrap robustness scores for the whole strategy and each condition.
+
+    Args:
+        orders: Rows of the "List of trades" sheet, or prebuilt EquityCurves
+        samples: Number of bootstrap samples per curve
+        percentile: Pessimistic percentile to report
+        seed: Random seed
+
+    Returns:
+        Tuple of (global scores, condition id -> scores)
+    """
+    curves = orders if isinstance(orders, EquityCurves) else EquityCurves.from_orders(orders)
+    results = TradeBootstrap(curves).summary(samples, percentile, seed)
+    return results[0], dict(zip(curves.labels[1:], results[1:]))
@@ -0,0 +1,69 @@
+"""
+Batch re-analysis of archived strategy sheets.
+
+Runs the current StrategyAnalyzer over sheets in the sheet archive on a
+process pool, so analyzer changes can be backfilled without new
+TradingView backtests.
+"""
+
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from analytics.strategy_analyzer import StrategyAnalyzer
+from utils.cache_shards import report_metrics
+from utils.sheet_archive import SheetArchive
+
+
+def analyze_archived(config: Dict[str, Any], archive_directory: str, digest: str) -> Tuple[Any, Optional[str]]:
+    """
+    Analyze one archived sheet (runs in a worker process).
+
+    Args:
+        config: Configuration dictionary for StrategyAnalyzer
+        archive_directory: Sheet archive root
+        digest: Workbook digest
+
+    Returns:
+        (report metrics without orders/positions, None) or (None, error message)
+    """
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = SheetArchive(archive_directory).extract(digest, os.path.join(tmp, f"{digest}.xlsx"))
+            return report_metrics(StrategyAnalyzer(config).analyze_file(path)), None
+    except Exception as e:
+        return None, str(e)
+
+
+def reanalyze(
+    config: Dict[str, Any],
+    archive_directory: str,
+    entries: List[Dict[str, Any]],
+    workers: Optional[int] = None,
+) -> Iterator[Tuple[Dict[str, Any], Any, Optional[str]]]:
+    """
+    Re-analyze archived sheets in parallel.
+
+    Each distinct workbook is analyzed once even if several manifest entries
+    refer to it.
+
+    Args:
+        config: Configuration dictionary for StrategyAnalyzer
+        archive_directory: Sheet archive root
+        entries: Manifest entries to re-analyze
+        workers: Worker processes (CPU count when None)
+
+    Yields:
+        (entry, report metrics or None, error message or None) in entry order
+    """
+    digests = list(dict.fromkeys(entry["digest"] for entry in entries))
+    if not digests:
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = dict(zip(digests, pool.map(
+            analyze_archived, [config] * len(digests), [archive_directory] * len(digests), digests,
+        )))
+    for entry in entries:
+        report, error = results[entry["digest"]]
+        yield entry, report, error
@@ -0,0 +1,140 @@
+"""
+Per-condition signal bitmaps and vectorized overlap analysis.
+"""
+
+import re
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+from bitarray import bitarray
+
+from utils.signal_processing import SIGNAL_PARSER
+
+
+def parse_condition_tokens(signal: Any) -> List[str]:
+    """
+    Extract condition ids from an entry order signal.
+
+    Args:
+        signal: Signal string from TradingView (e.g. " 4 10  | 6588.181 | 0.2")
+
+    Returns:
+        List of non-empty condition ids in signal order
+    """
+    return list(SIGNAL_PARSER.parse(signal).condition_ids)
+
+
+def condition_sort_key(name: str):
+    """Sort numeric condition ids first, then alpha groups (dca1, dca2, ...)."""
+    n = str(name).strip()
+    if n.isdigit():
+        return (0, int(n), "", -1)
+    m = re.match(r'^([A-Za-z]+)(\d+)?$', n)
+    if m:
+        return (1, m.group(1), int(m.group(2)) if m.group(2) else -1, -1)
+    return (2, n, -1, -1)
+
+
+class ConditionBitmaps:
+    """Compact trigger sets of every condition over the positions of a report."""
+
+    def __init__(self, position_keys: List[str]):
+        """
+        Initialize an empty bitmap store.
+
+        Args:
+            position_keys: Ordered position keys, one bit per position
+        """
+        self.position_keys = list(position_keys)
+        self.bitmaps: Dict[str, bitarray] = {}
+
+    @classmethod
+    def from_positions(cls, positions: Dict[str, Dict[str, Any]]) -> "ConditionBitmaps":
+        """
+        Build bitmaps from an analyzer ``positions`` dictionary.
+
+        Args:
+            positions: Positions keyed by "Position <Date/Time>" with entry orders
+
+        Returns:
+            ConditionBitmaps with bit i set when the condition fired in position i
+        """
+        store = cls(list(positions.keys()))
+        size = len(store.position_keys)
+        for index, position in enumerate(positions.values()):
+            for order in position.get("orders", []):
+                for token in parse_condition_tokens(order.get("Signal", "")):
+                    bitmap = store.bitmaps.get(token)
+                    if bitmap is None:
+                        bitmap = bitarray(size)
+                        bitmap.setall(0)
+                        store.bitmaps[token] = bitmap
+                    bitmap[index] = 1
+        return store
+
+    @property
+    def conditions(self) -> List[str]:
+        """Condition ids in report order (numeric first, then dca groups)."""
+        return sorted(self.bitmaps.keys(), key=condition_sort_key)
+
+    def counts(self) -> Dict[str, int]:
+        """Number of positions each condition participated in."""
+        return {k: self.bitmaps[k].count() for k in self.conditions}
+
+    def to_matrix(self) -> np.ndarray:
+        """
+        Stack all bitmaps into a boolean matrix.
+
+        Returns:
+            Array of shape (conditions, positions)
+        """
+        size = len(self.position_keys)
+        names = self.conditions
+        if not names or size == 0:
+            return np.zeros((len(names), size), dtype=bool)
+        packed = np.frombuffer(
+            b"".join(self.bitmaps[k].tobytes() for k in names), dtype=np.uint8
+        ).reshape(len(names), -1)
+        return np.unpackbits(packed, axis=1, bitorder="big")[:, :size].astype(bool)
+
+    def overlap_matrix(self) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """
+        Compute pairwise overlap counts and Jaccard similarity in one pass.
+
+        Returns:
+            Tuple of (condition ids, intersection counts, Jaccard matrix)
+        """
+        names = self.conditions
+        bits = self.to_matrix().astype(np.int32)
+        intersection = bits @ bits.T
+        counts = np.diag(intersection)
+        union = counts[:, None] + counts[None, :] - intersection
+        jaccard = np.divide(
+            intersection, union,
+            out=np.zeros(intersection.shape, dtype=float),
+            where=union > 0,
+        )
+        return names, intersection, jaccard
+
+    def redundant_pairs(self, threshold: float = 0.5) -> List[Dict[str, Any]]:
+        """
+        List condition pairs whose trigger sets overlap too much.
+
+        Args:
+            threshold: Minimum Jaccard similarity to report
+
+        Returns:
+            List of pair dictionaries sorted by similarity (highest first)
+        """
+        names, intersection, jaccard = self.overlap_matrix()
+        upper = np.triu(jaccard >= threshold, k=1)
+        pairs = [
+            {
+                "Conditions": [names[i], names[j]],
+                "Shared positions": int(intersection[i, j]),
+                "Jaccard": round(float(jaccard[i, j]), 4),
+            }
+            for i, j in zip(*np.nonzero(upper))
+        ]
+        pairs.sort(key=lambda p: p["Jaccard"], reverse=True)
+        return pairs
@@ -3,9 +3,16 @@ Strategy analysis and performance calculation module.
 """
 
 import os
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple, Union
+import numpy as np
+import pandas as pd
 from utils.excel_reader import ExcelReader
-from utils.signal_processing import encode_signals
+from utils.order_table import OrderTable
+from analytics.signal_bitmap import ConditionBitmaps
+from analytics.metrics import EquityCurves, compute_equity_metrics
+from analytics.robustness import bootstrap_robustness
+from analytics.walk_forward import walk_forward, profitable_share
+from analytics.tag_rules import TagRuleEngine
 from utils.file_operations import get_data_directory, get_file_path
 import json
 class StrategyAnalyzer:
@@ -34,82 +41,15 @@ class StrategyAnalyzer:
         target_filename = filename if len(filename) > 1 else "btc-long.xlsx"
         sheets_dir = get_data_directory("sheets")
         file_path = get_file_path(sheets_dir, target_filename)
-        orders = self.excel_reader.read_worksheet_as_json(file_path, 3)
-        summary = self.excel_reader.read_worksheet_as_json(file_path, 0)
-        perform = self.excel_reader.read_worksheet_as_json(file_path, 1)
-        ratio = self.excel_reader.read_worksheet_as_json(file_path, 2)
+        summary, perform, ratio, trades = self.excel_reader.read_workbook(
+            file_path, [0, 1, 2, 3]
+        ).values()
+        summary, perform, ratio = (self.excel_reader.to_records(df) for df in (summary, perform, ratio))
+        orders = OrderTable.from_frame(trades)
 
         # print(json.dumps(perform1, indent=4))
         strategy_report: Dict[str, Any] = {}
-        positions: Dict[str, Dict[str, Any]] = {}
-        conditions: Dict[str, Dict[str, Any]] = {}
-        
-        for i, order in enumerate(orders):
-            if order.get("Date/Time", "") == "":
-                continue
-            key = "Position " + order.get("Date/Time", "")
-            if "Exit" in order["Type"]:
-                if positions.get(key) is None:
-                    positions[key] = {
-                        "orders": [],
-                        "Position max drawdown %": 0.0
-                    }
-                entry_order = orders[min(i + 1, len(orders) - 1)]
-                exit_order = order
-                positions[key]["orders"] += [entry_order]
-                entry_order_signal = encode_signals(entry_order["Signal"])
-                order_size_percent = entry_order_signal["sizeEquity"]
-                order_mdd = float(entry_order["Drawdown %"])
-                positions[key]["Position max drawdown %"] = (
-                    0 if exit_order["Signal"] == "Open" 
-                    else -float(exit_order["Signal"]) * 100
-                )
-
-        for p in positions:
-            pos = positions[p]
-            for i, o in enumerate(pos["orders"]):
-                keys = str(o["Signal"]).split(" | ")[0]
-                for k in keys.split(" ")[:-1]:
-                    if conditions.get(k) is None:
-                        conditions[k] = {
-                            "Entry Triggers time": 0,
-                            "DCA Triggers time": 0,
-                            "Triggers time": 0,
-                            "Max drawdown %": pos["Position max drawdown %"],
-                            "Entry Trigger Max drawdown %": pos["Position max drawdown %"],
-                            "DCA Trigger Max drawdown %": pos["Position max drawdown %"],
-                            "Win orders": 0,
-                            "Lose orders": 0,
-                            "Win rate (%)": 0,
-                            "P&L USD": 0,
-                            "P&L (%)": 0
-                        }
-                    if i == 0:
-                        conditions[k]["Entry Triggers time"] += 1
-                        conditions[k]["Entry Trigger Max drawdown %"] = min(
-                            conditions[k]["Entry Trigger Max drawdown %"], 
-                            pos["Position max drawdown %"]
-                        )
-                    else:
-                        conditions[k]["DCA Triggers time"] += 1
-                        conditions[k]["DCA Trigger Max drawdown %"] = min(
-                            conditions[k]["DCA Trigger Max drawdown %"], 
-                            pos["Position max drawdown %"]
-                        )
-
-                    conditions[k]["Triggers time"] += 1
-                    conditions[k]["Max drawdown %"] = min(
-                        conditions[k]["Max drawdown %"], 
-                        pos["Position max drawdown %"]
-                    )
-                    if o["Net P&L USD"] > 0:
-                        conditions[k]["Win orders"] += 1
-                    else:
-                        conditions[k]["Lose orders"] += 1
-                    conditions[k]["Win rate (%)"] = (
-                        conditions[k]["Win orders"] / 
-                        (conditions[k]["Win orders"] + conditions[k]["Lose orders"]) * 100
-                    )
+        positions, conditions = self._aggregate_orders(orders)
         
         # Tag conditions based on config thresholds
         
@@ -121,6 +61,40 @@ class StrategyAnalyzer:
             "Net profit %": summary[1].get("All %", ""),
             "Max drawdown %": min(positions.values(), key=lambda x: x["Position max drawdown %"])["Position max drawdown %"] if positions else 0.0
         }
+        # Equity-curve risk metrics for the whole strategy and each condition
+        curves = EquityCurves.from_orders(orders)
+        equity_metrics, condition_metrics = compute_equity_metrics(curves)
+        strategy_report.update(equity_metrics)
+        for key, metrics in condition_metrics.items():
+            if key in conditions:
+                conditions[key].update(metrics)
+        walk_forward_config = self.config.get("WALK_FORWARD", {})
+        if walk_forward_config.get("MODE"):
+            periods, condition_periods = walk_forward(
+                curves,
+                walk_forward_config["MODE"],
+                **self._rolling_window_args(walk_forward_config),
+            )
+            strategy_report["Periods"] = periods
+            strategy_report["Profitable periods %"] = profitable_share(periods)
+            for key, values in condition_periods.items():
+                if key in conditions:
+                    conditions[key]["Periods"] = values
+                    conditions[key]["Profitable periods %"] = profitable_share(values)
+        robustness = self.config.get("ROBUSTNESS_CONDITIONS", {})
+        if robustness.get("SAMPLES"):
+            scores, condition_scores = bootstrap_robustness(
+                curves, robustness["SAMPLES"], robustness.get("PERCENTILE", 5), robustness.get("SEED")
+            )
+            strategy_report["Monte Carlo"] = scores
+            for key, values in condition_scores.items():
+                if key in conditions:
+                    conditions[key]["Monte Carlo"] = values
+        overlap_conditions = self.config.get("OVERLAP_CONDITIONS", {})
+        if "JACCARD_UPPER" in overlap_conditions:
+            strategy_report["Redundant conditions"] = self.build_condition_bitmaps(
+                strategy_report
+            ).redundant_pairs(overlap_conditions["JACCARD_UPPER"])
         analytic = perform + ratio + summary
         for data in analytic:
             key = data.get("Unnamed: 0", "")
@@ -131,43 +105,156 @@ class StrategyAnalyzer:
         strategy_report = self._tag_conditions(strategy_report)
         return strategy_report
     
+    def _aggregate_orders(self, orders: Union[OrderTable, List[Dict[str, Any]]]) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+        """
+        Group orders into positions and aggregate per-condition statistics.
+        
+        Each exit order opens/extends the position keyed by its Date/Time and
+        contributes every entry order joined on its Trade #, so DCA positions
+        made of several trades (or trades with several entries) keep all their
+        entries regardless of row adjacency. Signals are parsed once
+        per distinct string, exploded on condition id and aggregated with
+        NumPy group reductions.
+        
+        Args:
+            orders: Rows of the "List of trades" sheet (OrderTable or list of
+                dicts); position orders reference these rows
+            
+        Returns:
+            Tuple of (positions, conditions) dictionaries
+        """
+        table = orders if isinstance(orders, OrderTable) else OrderTable.from_records(orders)
+        if len(table) == 0:
+            return {}, {}
+        dates = pd.Series(table.column("Date/Time", ""), dtype=object)
+        types = pd.Series(table.column("Type", ""), dtype=object).astype(str)
+        is_exit = dates.ne("") & types.str.contains("Exit", regex=False)
+        exit_idx = np.flatnonzero(is_exit.to_numpy())
+        if exit_idx.size == 0:
+            return {}, {}
+        is_entry = types.str.contains("Entry", regex=False).to_numpy()
+        pair_exit, entry_idx = self.excel_reader.join_trades(
+            table.column("Trade #"), is_entry, exit_idx
+        )
+        keys = ("Position " + dates.iloc[exit_idx].astype(str)).to_numpy()
+        
+        # Position max drawdown % is carried by the exit signal (last exit wins)
+        exit_signal = np.asarray(table.column("Signal"), dtype=object)[exit_idx]
+        is_open = exit_signal == "Open"
+        exit_value = np.where(is_open, 0, exit_signal).astype(float)
+        exit_mdd = np.where(is_open, 0.0, -exit_value * 100)
+        codes, unique_keys = pd.factorize(keys)
+        last_idx = len(codes) - 1 - np.unique(codes[::-1], return_index=True)[1]
+        position_mdd = exit_mdd[last_idx]
+        position_mdd_values = [
+            0 if open_ else mdd
+            for open_, mdd in zip(is_open[last_idx], position_mdd.tolist())
+        ]
+        
+        positions: Dict[str, Dict[str, Any]] = {
+            key: {"orders": [], "Position max drawdown %": mdd}
+            for key, mdd in zip(unique_keys, position_mdd_values)
+        }
+        pair_codes = codes[pair_exit]
+        for key, i in zip(unique_keys[pair_codes], entry_idx):
+            positions[key]["orders"].append(orders[i])
+        
+        # One row per position order, in position order then step order
+        step = pd.Series(pair_codes).groupby(pair_codes).cumcount().to_numpy()
+        row_order = np.lexsort((step, pair_codes))
+        row_orders = entry_idx[row_order]
+        row_position = pair_codes[row_order]
+        row_entry = step[row_order] == 0
+        row_win = np.asarray(table.column("Net P&L USD")[row_orders], dtype=float) > 0
+        
+        # Signals are decoded once per table; ids follow first appearance
+        signals = table.signals()
+        signal_codes, distinct = pd.factorize(signals.codes[row_orders])
+        token_ids: Dict[str, int] = {}
+        parsed = [
+            [token_ids.setdefault(k, len(token_ids)) for k in signals.distinct[d].head.split(" ")[:-1]]
+            for d in distinct
+        ]
+        if not token_ids:
+            return positions, {}
+        lengths = np.array([len(p) for p in parsed])
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        all_tokens = np.fromiter((t for p in parsed for t in p), dtype=np.int64)
+        
+        # Explode rows on condition id
+        repeat = lengths[signal_codes]
+        flat_row = np.repeat(np.arange(len(row_orders)), repeat)
+        offset = np.arange(repeat.sum()) - np.repeat(np.cumsum(repeat) - repeat, repeat)
+        flat_token = all_tokens[np.repeat(starts[signal_codes], repeat) + offset]
+        flat_mdd = position_mdd[row_position[flat_row]]
+        flat_entry = row_entry[flat_row]
+        
+        size = len(token_ids)
+        triggers = np.bincount(flat_token, minlength=size)
+        entry = np.bincount(flat_token, weights=flat_entry, minlength=size).astype(int)
+        win = np.bincount(flat_token, weights=row_win[flat_row], minlength=size).astype(int)
+        mdd = np.full(size, np.inf)
+        np.minimum.at(mdd, flat_token, flat_mdd)
+        # Trigger MDDs start from the first position the condition appeared in
+        first_flat = np.unique(flat_token, return_index=True)[1]
+        first_position = row_position[flat_row[first_flat]]
+        entry_mdd = position_mdd[first_position].copy()
+        np.minimum.at(entry_mdd, flat_token[flat_entry], flat_mdd[flat_entry])
+        dca_mdd = position_mdd[first_position].copy()
+        np.minimum.at(dca_mdd, flat_token[~flat_entry], flat_mdd[~flat_entry])
+        win_rate = win / triggers * 100
+        
+        conditions: Dict[str, Dict[str, Any]] = {}
+        for k, t in token_ids.items():
+            # Ties keep the first position's value (e.g. int 0 of an open position)
+            first = position_mdd_values[first_position[t]]
+            conditions[k] = {
+                "Entry Triggers time": int(entry[t]),
+                "DCA Triggers time": int(triggers[t] - entry[t]),
+                "Triggers time": int(triggers[t]),
+                "Max drawdown %": first if mdd[t] == first else float(mdd[t]),
+                "Entry Trigger Max drawdown %": first if entry_mdd[t] == first else float(entry_mdd[t]),
+                "DCA Trigger Max drawdown %": first if dca_mdd[t] == first else float(dca_mdd[t]),
+                "Win orders": int(win[t]),
+                "Lose orders": int(triggers[t] - win[t]),
+                "Win rate (%)": float(win_rate[t]),
+                "P&L USD": 0,
+                "P&L (%)": 0
+            }
+        return positions, conditions
+    
+    @staticmethod
+    def _rolling_window_args(walk_forward_config: Dict[str, Any]) -> Dict[str, int]:
+        """Map WALK_FORWARD config keys to walk_forward window arguments."""
+        if walk_forward_config.get("MODE") != "rolling":
+            return {}
+        return {
+            "in_sample_days": walk_forward_config.get("IN_SAMPLE_DAYS", 730),
+            "out_of_sample_days": walk_forward_config.get("OUT_OF_SAMPLE_DAYS", 365),
+        }
+    
+    def build_condition_bitmaps(self, strategy_report: Dict[str, Any]) -> ConditionBitmaps:
+        """
+        Build per-condition trigger bitmaps over the report positions.
+        
+        Args:
+            strategy_report: Report returned by analyze_file (or loaded from cache)
+            
+        Returns:
+            ConditionBitmaps for overlap / redundancy checks
+        """
+        return ConditionBitmaps.from_positions(strategy_report.get("positions", {}) or {})
+    
     def _tag_conditions(self, strategy_report: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Tag conditions based on config thresholds.
+        Tag report with TAG_RULES (or the legacy threshold dictionaries).
         
         Args:
-            conditions: Conditions dictionary
+            strategy_report: Report dictionary
             
         Returns:
-            Conditions dictionary with tags added
+            Report dictionary with tags added
         """
-        overfit_conditions = self.config.get("OVERFIT_CONDITIONS", {})
-        risk_conditions = self.config.get("RISK_CONDITIONS", {})
-        good_conditions = self.config.get("GOOD_CONDITIONS", {})
-        
-        # for condition_key, condition_data in conditions.items():
-        tags = []
-        total_trades = strategy_report.get("Total trades", 0)
-        win_rate = strategy_report.get("Percent profitable", 0)
-        max_dd = strategy_report.get("Max drawdown %", 0)
-        # Check OVERFIT conditions
-        if "TOTAL_TRADES_LOWER" in overfit_conditions and "WIN_RATE_UPPER" in overfit_conditions:
-            if total_trades < overfit_conditions["TOTAL_TRADES_LOWER"] and win_rate > overfit_conditions["WIN_RATE_UPPER"]:
-                tags.append("OVERFIT")
-                # return strategy_report
-
-        # Check RISK conditions
-        if "MDD_LOWER" in risk_conditions:
-            if max_dd < risk_conditions["MDD_LOWER"]:
-                tags.append("RISK")
-                # return strategy_report
-        
-        if "TOTAL_TRADES_UPPER" in good_conditions and "WIN_RATE_UPPER" in good_conditions:
-            if total_trades > good_conditions["TOTAL_TRADES_UPPER"] and win_rate > good_conditions["WIN_RATE_UPPER"]:
-                tags.append("GOOD")
-
-        if len(tags) == 0:
-            tags.append("NORMAL")
-        strategy_report["tags"] = tags
+        strategy_report["tags"] = TagRuleEngine.from_config(self.config).evaluate([strategy_report])[0]
         
         return strategy_report
\ No newline at end of file
@@ -0,0 +1,220 @@
+"""
+Declarative tagging rules compiled to vectorized predicates.
+
+A rule is ``{"tag": "RISK", "when": <expr>}`` where ``<expr>`` is either a
+comparison ``[field, operator, value]`` or a combinator
+``{"all": [...]}`` / ``{"any": [...]}`` / ``{"not": <expr>}``. Fields are
+report keys; nested values use dots (``"Monte Carlo.Max drawdown % p5"``).
+"""
+
+from typing import Dict, Any, Callable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+OPERATORS: Dict[str, Callable[[np.ndarray, Any], np.ndarray]] = {
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+    "in": lambda values, options: np.isin(values, list(options)),
+}
+
+Predicate = Callable[["ReportTable"], np.ndarray]
+
+
+def lookup(report: Dict[str, Any], field: str) -> Any:
+    """Read a report field; dotted names descend into nested dictionaries."""
+    if field in report:
+        return report[field]
+    value: Any = report
+    for part in field.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+class ReportTable:
+    """Column view of many reports, built only for the fields rules reference."""
+
+    def __init__(self, reports: Sequence[Dict[str, Any]], fields: Sequence[str]):
+        """
+        Initialize table.
+
+        Args:
+            reports: Report dictionaries (one row each)
+            fields: Fields to extract
+        """
+        self.size = len(reports)
+        self.raw = {f: np.array([lookup(r, f) for r in reports], dtype=object) for f in fields}
+        self._numeric: Dict[str, np.ndarray] = {}
+
+    def column(self, field: str, numeric: bool) -> np.ndarray:
+        """Raw object column, or float column (non-numeric values -> NaN)."""
+        if not numeric:
+            return self.raw[field]
+        if field not in self._numeric:
+            self._numeric[field] = pd.to_numeric(pd.Series(self.raw[field]), errors="coerce").to_numpy(dtype=float)
+        return self._numeric[field]
+
+
+def compile_expression(expr: Any, fields: Optional[List[str]] = None) -> Predicate:
+    """
+    Compile one rule expression.
+
+    Args:
+        expr: Comparison list or combinator dictionary
+        fields: Collects referenced field names when given
+
+    Returns:
+        Function mapping a ReportTable to a boolean mask
+
+    Raises:
+        ValueError: If the expression is malformed
+    """
+    if isinstance(expr, dict):
+        if len(expr) != 1:
+            raise ValueError(f"Combinator must have exactly one key: {expr}")
+        (kind, operand), = expr.items()
+        if kind == "not":
+            inner = compile_expression(operand, fields)
+            return lambda table: ~inner(table)
+        if kind in ("all", "any"):
+            parts = [compile_expression(e, fields) for e in operand]
+            reduce = np.logical_and if kind == "all" else np.logical_or
+            start = np.ones if kind == "all" else np.zeros
+
+            def combined(table: ReportTable) -> np.ndarray:
+                mask = start(table.size, dtype=bool)
+                for part in parts:
+                    mask = reduce(mask, part(table))
+                return mask
+
+            return combined
+        raise ValueError(f"Unknown combinator: {kind}")
+
+    if not isinstance(expr, (list, tuple)) or len(expr) != 3:
+        raise ValueError(f"Comparison must be [field, operator, value]: {expr}")
+    field, op, threshold = expr
+    if op not in OPERATORS:
+        raise ValueError(f"Unknown operator: {op}")
+    if fields is not None and field not in fields:
+        fields.append(field)
+    compare = OPERATORS[op]
+    numeric = isinstance(threshold, (int, float)) and not isinstance(threshold, bool)
+    if op == "in":
+        numeric = all(isinstance(o, (int, float)) and not isinstance(o, bool) for o in threshold)
+    return lambda table: np.asarray(compare(table.column(field, numeric), threshold), dtype=bool)
+
+
+def legacy_rules(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Translate OVERFIT / RISK / GOOD / ROBUSTNESS threshold dictionaries into rules.
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        Rules reproducing the threshold checks, in their original order
+    """
+    overfit = config.get("OVERFIT_CONDITIONS", {})
+    risk = config.get("RISK_CONDITIONS", {})
+    good = config.get("GOOD_CONDITIONS", {})
+    robustness = config.get("ROBUSTNESS_CONDITIONS", {})
+    percentile = f"p{robustness.get('PERCENTILE', 5):g}"
+
+    rules: List[Dict[str, Any]] = []
+    if "TOTAL_TRADES_LOWER" in overfit and "WIN_RATE_UPPER" in overfit:
+        rules.append({"tag": "OVERFIT", "when": {"all": [
+            ["Total trades", "<", overfit["TOTAL_TRADES_LOWER"]],
+            ["Percent profitable", ">", overfit["WIN_RATE_UPPER"]],
+        ]}})
+    if "MDD_LOWER" in risk:
+        rules.append({"tag": "RISK", "when": ["Max drawdown %", "<", risk["MDD_LOWER"]]})
+    if "PROFIT_LOWER" in robustness:
+        rules.append({"tag": "OVERFIT", "when": [f"Monte Carlo.Net profit % {percentile}", "<", robustness["PROFIT_LOWER"]]})
+    if "MDD_LOWER" in robustness:
+        rules.append({"tag": "RISK", "when": [f"Monte Carlo.Max drawdown % {percentile}", "<", robustness["MDD_LOWER"]]})
+    if "TOTAL_TRADES_UPPER" in good and "WIN_RATE_UPPER" in good:
+        rules.append({"tag": "GOOD", "when": {"all": [
+            ["Total trades", ">", good["TOTAL_TRADES_UPPER"]],
+            ["Percent profitable", ">", good["WIN_RATE_UPPER"]],
+        ]}})
+    return rules
+
+
+class TagRuleEngine:
+    """Evaluates compiled tagging rules over many reports at once."""
+
+    def __init__(self, rules: Sequence[Dict[str, Any]], default_tag: str = "NORMAL"):
+        """
+        Compile rules.
+
+        Args:
+            rules: Rule dictionaries with "tag" and "when"
+            default_tag: Tag given to reports no rule matched
+        """
+        self.fields: List[str] = []
+        self.rules = [(rule["tag"], compile_expression(rule["when"], self.fields)) for rule in rules]
+        self.default_tag = default_tag
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "TagRuleEngine":
+        """Use TAG_RULES when configured, otherwise the legacy threshold dictionaries."""
+        rules = config.get("TAG_RULES")
+        if rules is None:
+            rules = legacy_rules(config)
+        return cls(rules, config.get("DEFAULT_TAG", "NORMAL"))
+
+    def evaluate(self, reports: Sequence[Dict[str, Any]]) -> List[List[str]]:
+        """
+        Tag reports.
+
+        Args:
+            reports: Report dictionaries
+
+        Returns:
+            Tags of each report (rule order, no duplicates)
+        """
+        table = ReportTable(reports, self.fields)
+        tags: List[List[str]] = [[] for _ in reports]
+        for tag, predicate in self.rules:
+            for row in np.flatnonzero(predicate(table)):
+                if tag not in tags[row]:
+                    tags[row].append(tag)
+        for row_tags in tags:
+            if not row_tags:
+                row_tags.append(self.default_tag)
+        return tags
+
+    def retag(self, caches: Sequence[Dict[str, Any]]) -> int:
+        """
+        Re-tag every global and single test report of loaded caches in place.
+
+        Args:
+            caches: Parsed cache files (any number of strategies)
+
+        Returns:
+            Number of reports whose tags changed
+        """
+        reports = [r for cache in caches for r in cache_reports(cache)]
+        changed = 0
+        for report, tags in zip(reports, self.evaluate(reports)):
+            if report.get("tags") != tags:
+                changed += 1
+            report["tags"] = tags
+        return changed
+
+
+def cache_reports(cache: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Global and single test reports of one cache file."""
+    reports = []
+    if isinstance(cache.get("global_test"), dict):
+        reports.append(cache["global_test"])
+    for report in (cache.get("single_test") or {}).values():
+        if isinstance(report, dict):
+            reports.append(report)
+    return reports
@@ -0,0 +1,168 @@
+"""
+Walk-forward period breakdown of equity curves.
+"""
+
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from analytics.metrics import EquityCurves
+
+Window = Tuple[str, np.datetime64, np.datetime64]
+
+
+def period_windows(
+    first: np.datetime64,
+    last: np.datetime64,
+    mode: str = "yearly",
+    in_sample_days: int = 730,
+    out_of_sample_days: int = 365,
+) -> List[Window]:
+    """
+    Build the periods to break results into.
+
+    Args:
+        first: Earliest trade time
+        last: Latest trade time
+        mode: "yearly" (calendar years) or "rolling" (in-sample / out-of-sample pairs)
+        in_sample_days: Rolling in-sample window length
+        out_of_sample_days: Rolling out-of-sample window length (also the roll step)
+
+    Returns:
+        List of (label, start, end) windows; ``end`` is exclusive
+    """
+    first = np.datetime64(first, "ns")
+    last = np.datetime64(last, "ns")
+    if mode == "rolling":
+        in_sample = np.timedelta64(int(in_sample_days), "D")
+        out_of_sample = np.timedelta64(int(out_of_sample_days), "D")
+        windows: List[Window] = []
+        start = first.astype("datetime64[D]").astype("datetime64[ns]")
+        while start + in_sample <= last:
+            split = start + in_sample
+            end = split + out_of_sample
+            windows.append((f"IS {_day(start)}..{_day(split)}", start, split))
+            windows.append((f"OOS {_day(split)}..{_day(end)}", split, end))
+            start += out_of_sample
+        return windows
+    if mode != "yearly":
+        raise ValueError(f"Unknown walk-forward mode: {mode}")
+    years = np.arange(
+        first.astype("datetime64[Y]"), last.astype("datetime64[Y]") + np.timedelta64(1, "Y")
+    )
+    return [
+        (str(year), year.astype("datetime64[ns]"), (year + np.timedelta64(1, "Y")).astype("datetime64[ns]"))
+        for year in years
+    ]
+
+
+def _day(value: np.datetime64) -> str:
+    return str(value.astype("datetime64[D]"))
+
+
+class PeriodBreakdown:
+    """
+    Per-period trades, net profit, drawdown and win rate of every curve.
+
+    Prefix sums of trade counts, wins and log growth are built once over the
+    exit-time-sorted trades; each period is then located with ``searchsorted``
+    and read as a difference of prefix sums (drawdown from the period slice),
+    for all curves at once.
+    """
+
+    def __init__(self, curves: EquityCurves):
+        """
+        Initialize breakdown from prepared curves.
+
+        Args:
+            curves: Curves built by EquityCurves.from_orders
+        """
+        self.curves = curves
+        member = curves.membership & curves.closed
+        zero = np.zeros((len(curves.labels), 1))
+        log_growth = np.where(member, np.log1p(np.maximum(curves.returns, -0.999999)), 0.0)
+        self.trades = np.hstack((zero, np.cumsum(member, axis=1)))
+        self.wins = np.hstack((zero, np.cumsum(member & (curves.pnl > 0), axis=1)))
+        self.log_equity = np.hstack((zero, np.cumsum(log_growth, axis=1)))
+
+    def windows(self, mode: str = "yearly", **kwargs) -> List[Window]:
+        """Periods spanning the curves' trades (see period_windows)."""
+        if self.curves.exit_time.size == 0:
+            return []
+        return period_windows(self.curves.entry_time.min(), self.curves.exit_time.max(), mode, **kwargs)
+
+    def stats(self, windows: List[Window]) -> List[List[Dict[str, Any]]]:
+        """
+        Statistics of every curve in every window.
+
+        Args:
+            windows: (label, start, end) periods; trades are assigned by exit time
+
+        Returns:
+            One list of period dictionaries per curve, in ``curves.labels`` order
+        """
+        results: List[List[Dict[str, Any]]] = [[] for _ in self.curves.labels]
+        if not windows:
+            return results
+        starts = np.array([w[1] for w in windows], dtype="datetime64[ns]")
+        ends = np.array([w[2] for w in windows], dtype="datetime64[ns]")
+        lo = np.searchsorted(self.curves.exit_time, starts, side="left")
+        hi = np.searchsorted(self.curves.exit_time, ends, side="left")
+
+        trades = self.trades[:, hi] - self.trades[:, lo]
+        wins = self.wins[:, hi] - self.wins[:, lo]
+        profit = np.expm1(self.log_equity[:, hi] - self.log_equity[:, lo]) * 100
+        win_rate = np.divide(wins * 100, trades, out=np.zeros_like(trades), where=trades > 0)
+        drawdown = np.zeros_like(trades)
+        for p in range(len(windows)):
+            segment = self.log_equity[:, lo[p]:hi[p] + 1]
+            drawdown[:, p] = np.expm1((segment - np.maximum.accumulate(segment, axis=1)).min(axis=1)) * 100
+
+        for i in range(len(self.curves.labels)):
+            for p, (label, start, end) in enumerate(windows):
+                results[i].append({
+                    "Period": label,
+                    "Start": _day(start),
+                    "End": _day(end),
+                    "Trades": int(trades[i, p]),
+                    "Net profit %": round(float(profit[i, p]), 4),
+                    "Max drawdown %": round(float(drawdown[i, p]), 4),
+                    "Win rate (%)": round(float(win_rate[i, p]), 4),
+                })
+        return results
+
+
+def profitable_share(periods: List[Dict[str, Any]]) -> Optional[float]:
+    """
+    Share (%) of traded periods that ended in profit.
+
+    Out-of-sample windows are used when present (rolling mode).
+
+    Args:
+        periods: Period dictionaries of one curve
+
+    Returns:
+        Percentage, or None when no period has trades
+    """
+    scored = [p for p in periods if p["Period"].startswith("OOS")] or periods
+    traded = [p for p in scored if p["Trades"] > 0]
+    if not traded:
+        return None
+    return round(sum(p["Net profit %"] > 0 for p in traded) / len(traded) * 100, 4)
+
+
+def walk_forward(curves: EquityCurves, mode: str = "yearly", **kwargs) -> Tuple[List[Dict[str, Any]], Dict[str, List[Dict[str, Any]]]]:
+    """
+    Break the whole strategy and each condition into periods.
+
+    Args:
+        curves: Curves built by EquityCurves.from_orders
+        mode: "yearly" or "rolling"
+        **kwargs: Rolling window lengths (in_sample_days, out_of_sample_days)
+
+    Returns:
+        Tuple of (global periods, condition id -> periods)
+    """
+    breakdown = PeriodBreakdown(curves)
+    results = breakdown.stats(breakdown.windows(mode, **kwargs))
+    return results[0], dict(zip(curves.labels[1:], results[1:]))
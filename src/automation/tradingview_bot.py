@@ -11,7 +11,9 @@ import json
 import os
 from pathlib import Path
 
-from src.utils.report_exporter import ReportExporter
+from utils.report_exporter import ReportExporter
+from utils.results_db import code_hash
+from utils.sheet_archive import SheetArchive
 
 class TradingViewBot:
     """Automated TradingView strategy report downloader."""
@@ -29,6 +31,7 @@ class TradingViewBot:
         self.secret_2fa = config.get(
             "TRADINGVIEW_2FA_SECRET", config.get("_2fa_secret", ""))
         self.strategy_name = config.get("STRATEGY_NAME", "btc-long")
+        self.code = None  # Last Pine code written to the editor (recorded with results)
         self.total_conditions = config.get("TOTAL_CONDITIONS", ["1", "2", "3"])
         self.chart_url = config.get(
             "CHART_URL", "https://www.tradingview.com/chart/bQN4MJLY/")
@@ -186,6 +189,7 @@ class TradingViewBot:
         await page.get_by_role("textbox", name="Editor content;Press Alt+F1").press("ControlOrMeta+a")
         await page.get_by_role("textbox", name="Editor content;Press Alt+F1").fill("\n\n\n")
         await page.get_by_role("textbox", name="Editor content;Press Alt+F1").fill(code)
+        self.code = code
 
     async def action_add_or_update_script(self, page):
         try:
@@ -215,13 +219,14 @@ class TradingViewBot:
         filename = await self.action_download_report(page, self.strategy_name)
 
         analyzer = StrategyAnalyzer(self.config)
-        exporter = ReportExporter()
+        exporter = ReportExporter(self.config, code=self.code, strategy=self.strategy_name)
         g_results = analyzer.analyze_file(filename)
         self.reports["global_test"] = g_results
         exporter.exports(self.reports, filename)
 
     async def action_analytics_strategy_single_test(self, page, override_name: any = None):
         self.reports["single_test"] = {}
+        exporter = ReportExporter(self.config, code=self.code, strategy=self.strategy_name)
 
         for condition_num in self.total_conditions:
             try:
@@ -234,11 +239,10 @@ class TradingViewBot:
             await self.action_set_date_range_entire(page)
             await self.action_wait_for_backtest(page)
 
-            filename = await self.action_download_report(page, override_name if override_name else f"{self.strategy_name}")
+            filename = await self.action_download_report(page, override_name if override_name else f"{self.strategy_name}", condition_num)
 
             analyzer = StrategyAnalyzer(self.config)
             s_results = analyzer.analyze_file(filename)
-            exporter = ReportExporter()
             # Check if condition data is empty/empty string
             if not s_results or s_results == "":
                 #print(
@@ -249,10 +253,14 @@ class TradingViewBot:
                 #print(
                     # f"✅ Condition {condition_num}: Data collected successfully")
 
-            # Export cache after each condition is completed
+            # Journal this condition's report after it is completed
             #print(f"💾 Exporting cache after condition {condition_num}...")
-            exporter.exports(self.reports, filename)
+            exporter.exports(self.reports, filename, condition=condition_num)
 
+        if self.total_conditions:
+            exporter.compact_cache(filename)
+            # Render the TXT/XLSX reports once for the whole sweep
+            exporter.flush_reports()
         return self.reports
     async def action_set_single_test_condition(self, page, condition: str):
         """Set single test condition."""
@@ -325,8 +333,8 @@ class TradingViewBot:
             await self.action_set_date_range_entire(page)
             await wait(page)
 
-    async def action_download_report(self, page, report_name: str):
-        """Download strategy report."""
+    async def action_download_report(self, page, report_name: str, condition: str = None):
+        """Download strategy report (and archive it when SHEET_ARCHIVE is set)."""
         #print(f"[INFO] Downloading {report_name} report...")
 
         try:
@@ -343,12 +351,23 @@ class TradingViewBot:
         filename = f"{report_name}.xlsx"
 
         # Save to data/sheets directory
-        from utils.file_operations import get_data_directory, ensure_directory
+        from utils.file_operations import get_data_directory, ensure_directory, atomic_path
         sheets_dir = get_data_directory("sheets")
         ensure_directory(sheets_dir)
         save_path = os.path.join(sheets_dir, filename)
 
-        await download.save_as(save_path)
+        # Readers of the sheet never see a partially saved download
+        with atomic_path(save_path) as tmp_path:
+            await download.save_as(tmp_path)
+
+        if self.config.get("SHEET_ARCHIVE"):
+            try:
+                # Optimizer sheets are named after the worker; archive them under the strategy
+                SheetArchive(self.config["SHEET_ARCHIVE"]).store(
+                    save_path, self.strategy_name, condition, code_hash(self.code) if self.code else None,
+                    worker=report_name if report_name != self.strategy_name else None)
+            except Exception as e:
+                print(f"❌ Sheet archive failed: {e}")
         #print(f"[INFO] Saved as {filename}")
 
         await asyncio.sleep(1)
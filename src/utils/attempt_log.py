@@ -0,0 +1,196 @@
+"""
+Append-only JSONL log of optimizer attempts.
+
+Each attempt is one line ``{"time": <ISO timestamp>, "attempt": {...}}``
+written with a single ``O_APPEND`` write under an exclusive ``flock``, so
+concurrent workers never interleave or overwrite each other and an append
+costs O(1) regardless of the log size. Readers skip a torn last line left
+by a crashed writer. Offline compaction drops such lines, merges legacy
+JSON dictionaries and rewrites the log atomically:
+
+    python -m src.utils.attempt_log compact data/prompts/potential_conditions.jsonl \
+        --legacy data/prompts/potential_conditions.json
+"""
+
+import argparse
+import fcntl
+import json
+import os
+from datetime import datetime
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from .file_operations import atomic_write
+
+
+class AttemptLog:
+    """JSONL attempt log at a file path with a lazily built in-memory index."""
+
+    def __init__(self, path: str):
+        """
+        Initialize log (the file is created on the first append).
+
+        Args:
+            path: JSONL file path
+        """
+        self.path = path
+        # (time, offset, length) of every complete record read so far, and time -> first record
+        self._index: List[Tuple[str, int, int]] = []
+        self._by_time: Dict[str, Tuple[int, int]] = {}
+        self._indexed_size = 0
+        self._identity: Optional[Tuple[int, int]] = None
+
+    def append(self, attempt: Dict[str, Any], time: Optional[str] = None) -> str:
+        """
+        Append one attempt.
+
+        Args:
+            attempt: JSON-serializable attempt data
+            time: ISO timestamp (now when None)
+
+        Returns:
+            Record timestamp
+        """
+        time = time or datetime.now().isoformat()
+        line = json.dumps({"time": time, "attempt": attempt}, ensure_ascii=False) + "\n"
+        fd = self._lock()
+        try:
+            size = os.fstat(fd).st_size
+            # Terminate a torn line left by a crashed writer so this record stays readable
+            if size and os.pread(fd, 1, size - 1) != b"\n":
+                line = "\n" + line
+            os.write(fd, line.encode("utf-8"))
+        finally:
+            os.close(fd)
+        return time
+
+    def _lock(self) -> int:
+        """
+        Open the log for appending and take its exclusive lock.
+
+        A compaction may replace the file while we wait for the lock; the
+        lock is then retaken on the new file so no append goes to the old one.
+
+        Returns:
+            Locked file descriptor (released by closing it)
+        """
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        while True:
+            fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(fd).st_ino == os.stat(self.path).st_ino:
+                    return fd
+            except FileNotFoundError:
+                pass
+            os.close(fd)
+
+    def _refresh(self):
+        """Index records appended since the last read (all of them after compaction)."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._index, self._by_time, self._indexed_size, self._identity = [], {}, 0, None
+            return
+        identity = (stat.st_ino, stat.st_dev)
+        if identity != self._identity or stat.st_size < self._indexed_size:
+            self._index, self._by_time, self._indexed_size, self._identity = [], {}, 0, identity
+        if stat.st_size == self._indexed_size:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._indexed_size)
+            offset = self._indexed_size
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # Torn or in-flight last line; picked up on a later refresh
+                try:
+                    time = json.loads(raw)["time"]
+                    self._index.append((time, offset, len(raw)))
+                    self._by_time.setdefault(time, (offset, len(raw)))
+                except (ValueError, KeyError, TypeError):
+                    pass
+                offset += len(raw)
+        self._indexed_size = offset
+
+    def __len__(self) -> int:
+        self._refresh()
+        return len(self._index)
+
+    def times(self) -> List[str]:
+        """Timestamps of all attempts in append order."""
+        self._refresh()
+        return [time for time, _, _ in self._index]
+
+    def get(self, time: str) -> Optional[Dict[str, Any]]:
+        """Attempt recorded at a timestamp (the first one on a tie), or None."""
+        self._refresh()
+        if time not in self._by_time:
+            return None
+        offset, length = self._by_time[time]
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.read(length))["attempt"]
+
+    def __iter__(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """(time, attempt) pairs in append order."""
+        self._refresh()
+        if not self._index:
+            return
+        with open(self.path, "rb") as f:
+            for time, offset, length in self._index:
+                f.seek(offset)
+                yield time, json.loads(f.read(length))["attempt"]
+
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        """All attempts keyed by timestamp (the layout of the former JSON cache)."""
+        return dict(self)
+
+    def compact(self, legacy_paths: Optional[List[str]] = None) -> int:
+        """
+        Rewrite the log without unreadable lines, merged with legacy JSON caches and sorted by time.
+
+        Appends wait on the log lock while the compacted file replaces it.
+
+        Args:
+            legacy_paths: JSON files holding a {timestamp: attempt} dictionary
+
+        Returns:
+            Number of records in the compacted log
+        """
+        fd = self._lock()
+        try:
+            records = list(self)
+            for legacy_path in legacy_paths or []:
+                with open(legacy_path, "r", encoding="utf-8") as f:
+                    records.extend(json.load(f).items())
+            seen = set()
+            unique = []
+            for time, attempt in sorted(records, key=lambda r: r[0]):
+                key = (time, json.dumps(attempt, sort_keys=True))
+                if key not in seen:
+                    seen.add(key)
+                    unique.append((time, attempt))
+            with atomic_write(self.path) as f:
+                for time, attempt in unique:
+                    f.write(json.dumps({"time": time, "attempt": attempt}, ensure_ascii=False) + "\n")
+        finally:
+            os.close(fd)
+        self._refresh()
+        return len(unique)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Attempt log maintenance")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    compact = subparsers.add_parser("compact", help="Drop torn lines, merge legacy JSON and sort by time")
+    compact.add_argument("paths", nargs="+", help="JSONL attempt logs")
+    compact.add_argument("--legacy", action="append", default=[], help="Legacy {timestamp: attempt} JSON file to merge")
+    args = parser.parse_args()
+
+    for path in args.paths:
+        count = AttemptLog(path).compact(args.legacy)
+        print(f"Compacted {path}: {count} attempt(s)")
+
+
+if __name__ == "__main__":
+    main()
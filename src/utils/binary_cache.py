@@ -0,0 +1,516 @@
+"""
+Binary columnar cache files with lazily loaded sections.
+
+Layout::
+
+    MAGIC | uint32 header length | header (msgpack) | section payloads (msgpack)
+
+The header lists every report ("global_test", "single_test/<condition>")
+and the byte range of each of its sections: ``metrics`` (scalar results and
+tags), ``conditions``, ``orders`` and ``positions`` (order references as
+row numbers of the report's orders). Orders of all reports live once in a
+content-addressed store (``store#orders``; columnar, numeric columns stored
+as raw NumPy buffers, string columns sharing one cache-wide dictionary) and
+each report's ``orders`` section holds row references into it. Readers load
+the header only and decode sections on demand.
+
+Reports finished between full writes go to an append-only journal
+(``x.journal``, length-prefixed records of the same sections) that readers
+replay over the cache file until it is compacted.
+"""
+
+import hashlib
+import os
+import struct
+from typing import Dict, Any, List, Optional, Tuple
+
+import msgpack
+import numpy as np
+
+from .file_operations import atomic_write
+from .order_table import OrderRow, OrderTable
+
+MAGIC = b"NLQC\x01"
+CACHE_SUFFIX = ".msgpack"
+JOURNAL_SUFFIX = ".journal"
+BULK_KEYS = ("orders", "positions", "conditions")
+STORE_ID = "store"
+_LENGTH = struct.Struct("<I")
+
+
+def binary_cache_path(json_path: str) -> str:
+    """Binary cache path next to a JSON cache path (``x.json`` -> ``x.msgpack``)."""
+    return os.path.splitext(json_path)[0] + CACHE_SUFFIX
+
+
+def cache_journal_path(json_path: str) -> str:
+    """Journal path next to a JSON cache path (``x.json`` -> ``x.journal``)."""
+    return os.path.splitext(json_path)[0] + JOURNAL_SUFFIX
+
+
+def report_key(condition: Optional[str] = None) -> str:
+    """Report id of the global test (None) or of a single test condition."""
+    return "global_test" if condition is None else f"single_test/{condition}"
+
+
+def _default(obj: Any) -> Any:
+    """msgpack hook for NumPy scalars and columnar rows."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, OrderRow):
+        return obj.to_dict()
+    if isinstance(obj, OrderTable):
+        return obj.to_records()
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+def _pack(value: Any) -> bytes:
+    return msgpack.packb(value, use_bin_type=True, default=_default)
+
+
+def _unpack(data: bytes) -> Any:
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+def _encode_orders(table: OrderTable) -> Dict[str, Any]:
+    columns = []
+    for name in table.columns:
+        values = table._columns[name]
+        uniques = table._dictionaries.get(name)
+        if uniques is not None:
+            columns.append({"name": name, "kind": "dict", "data": values.astype("<i4").tobytes(), "uniques": list(uniques)})
+        elif values.dtype == np.int64 or values.dtype == np.float64:
+            columns.append({"name": name, "kind": values.dtype.str, "data": values.astype(values.dtype.newbyteorder("<")).tobytes()})
+        else:
+            columns.append({"name": name, "kind": "object", "data": values.tolist()})
+    return {"length": len(table), "columns": columns}
+
+
+def _object_array(values: List[Any]) -> np.ndarray:
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+def _decode_orders(payload: Dict[str, Any]) -> OrderTable:
+    columns: Dict[str, np.ndarray] = {}
+    dictionaries: Dict[str, np.ndarray] = {}
+    for column in payload["columns"]:
+        name, kind = column["name"], column["kind"]
+        if kind == "dict":
+            columns[name] = np.frombuffer(column["data"], dtype="<i4")
+            dictionaries[name] = _object_array(column["uniques"])
+        elif kind == "object":
+            columns[name] = _object_array(column["data"])
+        else:
+            columns[name] = np.frombuffer(column["data"], dtype=kind)
+    return OrderTable(columns, dictionaries, payload["length"])
+
+
+class OrderStore:
+    """
+    Content-addressed order records shared by every report of a cache.
+
+    Identical records (same columns, values and value types) get one row;
+    reports keep int32 row references.
+    """
+
+    def __init__(self):
+        self._index: Dict[tuple, int] = {}
+        self._records: List[Dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def add(self, table: OrderTable) -> Dict[str, Any]:
+        """
+        Add a report's orders.
+
+        Args:
+            table: Orders of one report
+
+        Returns:
+            Reference payload (row numbers into the store and column names)
+        """
+        names = table.columns
+        lists = [table.column(n).tolist() for n in names]
+        rows = np.empty(len(table), dtype="<i4")
+        for i, values in enumerate(zip(*lists)):
+            key = (tuple(names), tuple((type(v), v) for v in values))
+            row = self._index.get(key)
+            if row is None:
+                row = self._index[key] = len(self._records)
+                self._records.append(dict(zip(names, values)))
+            rows[i] = row
+        return {"rows": rows.tobytes(), "columns": names}
+
+    def table(self) -> OrderTable:
+        return OrderTable.from_records(self._records)
+
+
+def _resolve_orders(payload: Any, store: Optional[OrderTable]) -> OrderTable:
+    """Orders section payload (columnar or store references) as an OrderTable."""
+    if isinstance(payload, OrderTable):
+        return payload
+    if "rows" not in payload:
+        return _decode_orders(payload)
+    rows = store.take(np.frombuffer(payload["rows"], dtype="<i4"))
+    return OrderTable(
+        {name: rows._columns[name] for name in payload["columns"]},
+        {name: rows._dictionaries[name] for name in payload["columns"] if name in rows._dictionaries},
+        len(rows),
+    )
+
+
+def _encode_positions(positions: Dict[str, Any], table: OrderTable) -> Dict[str, Any]:
+    lookup = table.row_lookup()
+    encoded = {}
+    for key, position in positions.items():
+        entry = {k: v for k, v in position.items() if k != "orders"}
+        rows, inline = [], []
+        for order in position.get("orders", []):
+            if getattr(order, "_table", None) is table:
+                rows.append(order._index)
+                continue
+            row = lookup.get(table.row_key(order))
+            if row is None:
+                inline.append(dict(order))
+            else:
+                rows.append(row)
+        entry["rows"] = rows
+        if inline:
+            entry["orders"] = inline
+        encoded[key] = entry
+    return encoded
+
+
+def _decode_positions(payload: Dict[str, Any], table: OrderTable) -> Dict[str, Any]:
+    positions = {}
+    for key, entry in payload.items():
+        position = {"orders": [OrderRow(table, i) for i in entry["rows"]] + [dict(o) for o in entry.get("orders", [])]}
+        position.update((k, v) for k, v in entry.items() if k not in ("rows", "orders"))
+        positions[key] = position
+    return positions
+
+
+def _report_sections(report: Dict[str, Any], store: Optional[OrderStore] = None) -> Dict[str, Any]:
+    """Split one report into its section payloads (orders as store references when a store is given)."""
+    sections: Dict[str, Any] = {"metrics": {k: v for k, v in report.items() if k not in BULK_KEYS}}
+    if "conditions" in report:
+        sections["conditions"] = report["conditions"]
+    if "orders" in report:
+        orders = report["orders"]
+        table = orders if isinstance(orders, OrderTable) else OrderTable.from_records(orders)
+        sections["orders"] = store.add(table) if store is not None else _encode_orders(table)
+        if "positions" in report:
+            sections["positions"] = _encode_positions(report["positions"] or {}, table)
+    elif "positions" in report:
+        sections["metrics"]["positions"] = report["positions"]
+    return sections
+
+
+def _assemble_report(sections: Dict[str, Any], store: Optional[OrderTable] = None) -> Dict[str, Any]:
+    """Rebuild one report from its decoded section payloads."""
+    report = sections["metrics"]
+    if sections.get("orders") is not None:
+        table = _resolve_orders(sections["orders"], store)
+        report["orders"] = table
+        if sections.get("positions") is not None:
+            report["positions"] = _decode_positions(sections["positions"], table)
+    if sections.get("conditions") is not None:
+        report["conditions"] = sections["conditions"]
+    return report
+
+
+def _report_ids(cache: Dict[str, Any]) -> List[Tuple[str, Any]]:
+    if "global_test" not in cache and "single_test" not in cache:
+        return [("report", cache)]
+    ids = []
+    if "global_test" in cache:
+        ids.append(("global_test", cache["global_test"]))
+    for condition, report in (cache.get("single_test") or {}).items():
+        ids.append((f"single_test/{condition}", report))
+    return ids
+
+
+def write_cache(path: str, cache: Dict[str, Any]):
+    """
+    Write a cache dictionary (or single report) to a binary cache file.
+
+    Args:
+        path: Output file path
+        cache: Dictionary with ``global_test`` / ``single_test`` reports, or one report
+    """
+    payloads: List[bytes] = []
+    sections: Dict[str, List[int]] = {}
+    reports: Dict[str, Any] = {}
+    store = OrderStore()
+    spans: Dict[bytes, List[int]] = {}
+    offset = 0
+
+    def append(section_id: str, value: Any):
+        # Byte-identical sections (e.g. a condition that reuses the global test) are stored once
+        nonlocal offset
+        data = _pack(value)
+        digest = hashlib.sha1(data).digest()
+        if digest not in spans:
+            spans[digest] = [offset, len(data)]
+            payloads.append(data)
+            offset += len(data)
+        sections[section_id] = spans[digest]
+
+    for report_id, report in _report_ids(cache):
+        if not isinstance(report, dict):
+            # Failed single tests are cached as "" and kept verbatim
+            reports[report_id] = report
+            continue
+        reports[report_id] = None
+        for part, value in _report_sections(report, store).items():
+            append(f"{report_id}#{part}", value)
+    if len(store):
+        append(f"{STORE_ID}#orders", _encode_orders(store.table()))
+    extra = {k: v for k, v in cache.items() if k not in ("global_test", "single_test")} if "report" not in reports else {}
+    header = _pack({
+        "version": 2,
+        "reports": reports,
+        "sections": sections,
+        "single_test": "single_test" in cache,
+        "extra": extra,
+    })
+    with atomic_write(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(_LENGTH.pack(len(header)))
+        f.write(header)
+        for data in payloads:
+            f.write(data)
+
+
+class CacheFile:
+    """Lazy reader of a binary cache file; only the header is read up front."""
+
+    def __init__(self, path: str):
+        """
+        Open cache file and read its header.
+
+        Args:
+            path: Binary cache file path
+
+        Raises:
+            ValueError: If the file is not a binary cache
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a binary cache file: {path}")
+            (length,) = _LENGTH.unpack(f.read(_LENGTH.size))
+            self.header = _unpack(f.read(length))
+        self._data_start = len(MAGIC) + _LENGTH.size + length
+        self._tables: Dict[tuple, OrderTable] = {}
+        self._store: Optional[OrderTable] = None
+        self._buffer: Optional[memoryview] = None
+        self._positions: Dict[tuple, Any] = {}
+
+    def _order_store(self) -> Optional[OrderTable]:
+        if self._store is None:
+            payload = self._section(STORE_ID, "orders")
+            self._store = _decode_orders(payload) if payload is not None else None
+        return self._store
+
+    def _section(self, report_id: str, part: str) -> Any:
+        span = self.header["sections"].get(f"{report_id}#{part}")
+        if span is None:
+            return None
+        if self._buffer is not None:
+            return _unpack(self._buffer[span[0]:span[0] + span[1]])
+        with open(self.path, "rb") as f:
+            f.seek(self._data_start + span[0])
+            return _unpack(f.read(span[1]))
+
+    @property
+    def conditions(self) -> List[str]:
+        """Condition ids with a single test report."""
+        prefix = "single_test/"
+        return [r[len(prefix):] for r in self.header["reports"] if r.startswith(prefix)]
+
+    def has(self, condition: Optional[str] = None) -> bool:
+        return report_key(condition) in self.header["reports"]
+
+    def metrics(self, condition: Optional[str] = None) -> Any:
+        """
+        Scalar results and tags of one report, without orders or positions.
+
+        Args:
+            condition: Single test condition id; global test when None
+
+        Returns:
+            Metrics dictionary, the cached placeholder ("") of a failed test,
+            or None when the report is absent
+        """
+        report_id = report_key(condition)
+        if report_id not in self.header["reports"]:
+            return None
+        placeholder = self.header["reports"][report_id]
+        if placeholder is not None:
+            return placeholder
+        return self._section(report_id, "metrics")
+
+    def orders(self, condition: Optional[str] = None, raw_id: Optional[str] = None) -> Optional[OrderTable]:
+        """Columnar orders of one report (decoded once per reader)."""
+        span = self.header["sections"].get(f"{raw_id or report_key(condition)}#orders")
+        if span is None:
+            return None
+        # Reports sharing an orders section share one (read-only) table
+        key = tuple(span)
+        if key not in self._tables:
+            payload = self._section(raw_id or report_key(condition), "orders")
+            self._tables[key] = _resolve_orders(payload, self._order_store())
+        return self._tables[key]
+
+    def report(self, condition: Optional[str] = None, raw_id: Optional[str] = None) -> Any:
+        """
+        Full report with OrderTable orders and OrderRow position orders.
+
+        Args:
+            condition: Single test condition id; global test when None
+            raw_id: Report id (overrides ``condition``)
+
+        Returns:
+            Report dictionary (or cached placeholder / None)
+        """
+        report_id = raw_id or report_key(condition)
+        if report_id not in self.header["reports"]:
+            return None
+        if self.header["reports"][report_id] is not None:
+            return self.header["reports"][report_id]
+        sections = {part: self._section(report_id, part) for part in ("metrics", "conditions")}
+        sections["orders"] = self.orders(raw_id=report_id)
+        span = self.header["sections"].get(f"{report_id}#positions")
+        if span is not None:
+            # Position payloads are only read, so reports sharing a section decode it once
+            key = tuple(span)
+            if key not in self._positions:
+                self._positions[key] = self._section(report_id, "positions")
+            sections["positions"] = self._positions[key]
+        return _assemble_report(sections)
+
+    def load(self) -> Dict[str, Any]:
+        """Decode the whole cache (columnar orders)."""
+        with open(self.path, "rb") as f:
+            f.seek(self._data_start)
+            self._buffer = memoryview(f.read())
+        reports = self.header["reports"]
+        if "report" in reports:
+            return self.report(raw_id="report")
+        cache: Dict[str, Any] = {}
+        if "global_test" in reports:
+            cache["global_test"] = self.report()
+        if self.header.get("single_test"):
+            cache["single_test"] = {c: self.report(c) for c in self.conditions}
+        cache.update(self.header.get("extra") or {})
+        return cache
+
+
+def read_cache(path: str) -> Dict[str, Any]:
+    """Load a whole binary cache file."""
+    return CacheFile(path).load()
+
+
+class CacheJournal:
+    """
+    Append-only log of reports finished since the cache file was last written.
+
+    Each record is a uint32 length followed by one msgpack map holding a
+    report id and that report's sections, so finishing a condition writes
+    only that condition. A torn final record (interrupted write) is ignored.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize journal.
+
+        Args:
+            path: Journal file path (created on first append)
+        """
+        self.path = path
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._payloads())
+
+    def _payloads(self):
+        """Yield (end offset, payload) of each complete record."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            while True:
+                prefix = f.read(_LENGTH.size)
+                if len(prefix) < _LENGTH.size:
+                    return
+                (length,) = _LENGTH.unpack(prefix)
+                data = f.read(length)
+                if len(data) < length:
+                    return
+                yield f.tell(), data
+
+    def append(self, report_id: str, report: Any) -> int:
+        """
+        Append one report.
+
+        Args:
+            report_id: "global_test" or "single_test/<condition>"
+            report: Report dictionary or failed-test placeholder
+
+        Returns:
+            Number of records in the journal
+        """
+        record = {"id": report_id}
+        if isinstance(report, dict):
+            record["sections"] = _report_sections(report)
+        else:
+            record["value"] = report
+        data = _pack(record)
+        count, end = 0, 0
+        for end, _ in self._payloads():
+            count += 1
+        with open(self.path, "ab") as f:
+            if f.tell() != end:
+                # Drop a torn record so the new one stays aligned
+                f.truncate(end)
+            f.write(_LENGTH.pack(len(data)))
+            f.write(data)
+        return count + 1
+
+    def records(self) -> List[Tuple[str, Any]]:
+        """Decoded (report id, report) pairs in append order."""
+        records = []
+        for _, data in self._payloads():
+            record = _unpack(data)
+            if "sections" in record:
+                records.append((record["id"], _assemble_report(record["sections"])))
+            else:
+                records.append((record["id"], record.get("value")))
+        return records
+
+    def apply(self, cache: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Replay the journal over a loaded cache (later records win).
+
+        Args:
+            cache: Cache dictionary, updated in place
+
+        Returns:
+            The same dictionary
+        """
+        prefix = "single_test/"
+        for record_id, report in self.records():
+            if record_id.startswith(prefix):
+                if not isinstance(cache.get("single_test"), dict):
+                    cache["single_test"] = {}
+                cache["single_test"][record_id[len(prefix):]] = report
+            else:
+                cache[record_id] = report
+        return cache
+
+    def clear(self):
+        """Delete the journal (after its records were compacted into the cache)."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,142 @@
+"""
+Git-friendly metrics-only cache shards.
+
+A strategy's shards live in ``data/cache/<strategy>/``: ``global_test.json``
+and ``single_test/<condition>.json``, one small file per report with its
+scalar metrics and tags in stable key order. Orders, positions and per
+condition statistics stay in the full cache files, so re-testing one
+condition changes exactly one shard and unchanged shards are never
+rewritten.
+"""
+
+import json
+import os
+from typing import Dict, Any, List, Optional
+
+from .binary_cache import report_key
+from .file_operations import atomic_write
+from .order_table import json_default
+
+SHARD_SUFFIX = ".json"
+
+# Report sections kept out of the shards (and out of metrics-only loads)
+BULK_SECTIONS = ("orders", "positions", "conditions")
+
+
+def shard_directory(cache_file: str) -> str:
+    """Shard directory next to a strategy's cache file (cache path without extension)."""
+    return os.path.splitext(cache_file)[0]
+
+
+def shard_path(directory: str, condition: Optional[str] = None) -> str:
+    """Shard file of the global test (None) or of a single test condition."""
+    return os.path.join(directory, *report_key(condition).split("/")) + SHARD_SUFFIX
+
+
+def _single_directory(directory: str) -> str:
+    return os.path.dirname(shard_path(directory, "_"))
+
+
+def _condition_sort_key(condition: str):
+    return (not condition.isdigit(), int(condition) if condition.isdigit() else 0, condition)
+
+
+def report_metrics(report: Any) -> Any:
+    """Report without its bulk sections; failed tests ("") are returned as is."""
+    if not isinstance(report, dict):
+        return report
+    return {k: v for k, v in report.items() if k not in BULK_SECTIONS}
+
+
+def shard_text(report: Any) -> str:
+    """Stable JSON text of a report's metrics."""
+    return json.dumps(report_metrics(report), indent=2, sort_keys=True, default=json_default) + "\n"
+
+
+def write_shard(directory: str, condition: Optional[str], report: Any) -> Optional[str]:
+    """
+    Write one report's shard if its content changed.
+
+    Args:
+        directory: Strategy shard directory
+        condition: Single test condition; global test when None
+        report: Analysis results ("" for a failed test)
+
+    Returns:
+        Shard path when the file was written, None when it was already up to date
+    """
+    path = shard_path(directory, condition)
+    text = shard_text(report)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            if f.read() == text:
+                return None
+    except FileNotFoundError:
+        pass
+    with atomic_write(path) as f:
+        f.write(text)
+    return path
+
+
+def write_shards(directory: str, cache: Dict[str, Any]) -> List[str]:
+    """
+    Mirror a cache into its shard directory, touching only changed shards.
+
+    Shards of conditions no longer in the cache are removed.
+
+    Args:
+        directory: Strategy shard directory
+        cache: Cache dictionary ("global_test" / "single_test")
+
+    Returns:
+        Paths written or removed
+    """
+    changed = []
+    expected = set()
+    reports = [(None, cache["global_test"])] if "global_test" in cache else []
+    reports.extend((str(c), r) for c, r in (cache.get("single_test") or {}).items())
+    for condition, report in reports:
+        expected.add(shard_path(directory, condition))
+        path = write_shard(directory, condition, report)
+        if path:
+            changed.append(path)
+
+    single_dir = _single_directory(directory)
+    if os.path.isdir(single_dir):
+        for name in os.listdir(single_dir):
+            path = os.path.join(single_dir, name)
+            if name.endswith(SHARD_SUFFIX) and path not in expected:
+                os.remove(path)
+                changed.append(path)
+    return changed
+
+
+def read_shard(directory: str, condition: Optional[str] = None) -> Any:
+    """Metrics of one report, or None when its shard is missing."""
+    try:
+        with open(shard_path(directory, condition), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def read_shards(directory: str) -> Optional[Dict[str, Any]]:
+    """
+    Metrics-only cache assembled from a shard directory.
+
+    Args:
+        directory: Strategy shard directory
+
+    Returns:
+        Cache dictionary, or None when the directory has no shards
+    """
+    cache: Dict[str, Any] = {}
+    global_report = read_shard(directory)
+    if global_report is not None:
+        cache["global_test"] = global_report
+    single_dir = _single_directory(directory)
+    if os.path.isdir(single_dir):
+        names = sorted((n[:-len(SHARD_SUFFIX)] for n in os.listdir(single_dir) if n.endswith(SHARD_SUFFIX)),
+                       key=_condition_sort_key)
+        cache["single_test"] = {name: read_shard(directory, name) for name in names}
+    return cache or None
@@ -1,6 +1,7 @@
 """Configuration management with runtime parameter overrides."""
 
 import os
+import re
 from typing import Dict, Any, List
 
 
@@ -48,6 +49,18 @@ class ConfigManager:
         """Override any config parameter."""
         self._config[key] = value
     
+    def persist_param(self, key: str, value: Any):
+        """Override parameter and rewrite its single-line assignment in the config file."""
+        with open(self.config_path, 'r') as f:
+            source = f.read()
+        pattern = re.compile(rf"^{re.escape(key)}\s*=.*$", re.MULTILINE)
+        if not pattern.search(source):
+            raise ValueError(f"'{key}' assignment not found in {self.config_path}")
+        source = pattern.sub(lambda _: f"{key} = {value!r}", source, count=1)
+        with open(self.config_path, 'w') as f:
+            f.write(source)
+        self._config[key] = value
+    
     def get_config(self) -> Dict[str, Any]:
         return self._config.copy()
     
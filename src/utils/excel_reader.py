@@ -2,13 +2,111 @@
 Excel data reading and processing utilities.
 """
 
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+# Column dtypes of TradingView strategy report sheets; skips per-column inference
+SUMMARY_DTYPES = {
+    "All USD": "float64",
+    "All %": "float64",
+    "Long USD": "float64",
+    "Long %": "float64",
+    "Short USD": "float64",
+    "Short %": "float64",
+}
+
+TRADES_DTYPES = {
+    "Type": str,
+    "Signal": str,
+    "Price USDT": "float64",
+    "Position size (qty)": "float64",
+    "Position size (value)": "float64",
+    "Net P&L USD": "float64",
+    "Net P&L %": "float64",
+    "Run-up USD": "float64",
+    "Run-up %": "float64",
+    "Drawdown USD": "float64",
+    "Drawdown %": "float64",
+    "Cumulative P&L USD": "float64",
+    "Cumulative P&L %": "float64",
+}
+
+SHEET_DTYPES = {
+    "Performance": SUMMARY_DTYPES,
+    "Trades analysis": SUMMARY_DTYPES,
+    "Risk performance ratios": SUMMARY_DTYPES,
+    "List of trades": TRADES_DTYPES,
+}
 
 
 class ExcelReader:
     """Excel file reader and processor."""
     
+    @staticmethod
+    def to_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Convert parsed sheet to JSON-serializable records."""
+        # Convert datetime columns to strings for JSON serialization
+        for col in df.select_dtypes(include=["datetime64[ns]"]).columns:
+            df[col] = df[col].astype(str)
+        
+        return df.to_dict(orient="records")
+    
+    @staticmethod
+    def read_workbook(file_path: str, sheet_indexes: Optional[List[int]] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Read all (or selected) worksheets with a single workbook open.
+        
+        The workbook is opened once in openpyxl read-only mode and every sheet
+        is parsed from that handle, with dtype hints for known TradingView
+        columns.
+        
+        Args:
+            file_path: Path to Excel file
+            sheet_indexes: Indexes of sheets to read (0-based); all sheets when None
+            
+        Returns:
+            Dictionary of sheet name -> DataFrame, in workbook order
+            
+        Raises:
+            FileNotFoundError: If Excel file doesn't exist
+            IndexError: If a sheet index is invalid
+        """
+        try:
+            with pd.ExcelFile(file_path, engine="openpyxl") as excel_file:
+                sheet_names = excel_file.sheet_names
+                indexes = range(len(sheet_names)) if sheet_indexes is None else sheet_indexes
+                
+                sheets: Dict[str, pd.DataFrame] = {}
+                for index in indexes:
+                    if index >= len(sheet_names):
+                        raise IndexError(f"Sheet index {index} out of range. Available sheets: {sheet_names}")
+                    name = sheet_names[index]
+                    sheets[name] = excel_file.parse(name, dtype=SHEET_DTYPES.get(name))
+                return sheets
+            
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Excel file not found: {file_path}")
+        except Exception as e:
+            raise Exception(f"Error reading Excel file: {e}")
+    
+    @staticmethod
+    def read_workbook_as_json(file_path: str, sheet_indexes: Optional[List[int]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Read all (or selected) worksheets as row dictionaries.
+        
+        Args:
+            file_path: Path to Excel file
+            sheet_indexes: Indexes of sheets to read (0-based); all sheets when None
+            
+        Returns:
+            Dictionary of sheet name -> list of row dictionaries, in workbook order
+        """
+        return {
+            name: ExcelReader.to_records(df)
+            for name, df in ExcelReader.read_workbook(file_path, sheet_indexes).items()
+        }
+    
     @staticmethod
     def read_worksheet_as_json(file_path: str, sheet_index: int = 0) -> List[Dict[str, Any]]:
         """
@@ -26,21 +124,17 @@ class ExcelReader:
             IndexError: If sheet index is invalid
         """
         try:
-            # Get sheet names
-            excel_file = pd.ExcelFile(file_path)
-            sheet_names = excel_file.sheet_names
-            
-            if sheet_index >= len(sheet_names):
-                raise IndexError(f"Sheet index {sheet_index} out of range. Available sheets: {sheet_names}")
-            
-            # Read the specified sheet
-            df = pd.read_excel(file_path, sheet_name=sheet_names[sheet_index])
-            
-            # Convert datetime columns to strings for JSON serialization
-            for col in df.select_dtypes(include=["datetime64[ns]"]).columns:
-                df[col] = df[col].astype(str)
+            # Get sheet names and parse from the same open workbook
+            with pd.ExcelFile(file_path) as excel_file:
+                sheet_names = excel_file.sheet_names
+                
+                if sheet_index >= len(sheet_names):
+                    raise IndexError(f"Sheet index {sheet_index} out of range. Available sheets: {sheet_names}")
+                
+                # Read the specified sheet
+                df = excel_file.parse(sheet_names[sheet_index])
             
-            return df.to_dict(orient="records")
+            return ExcelReader.to_records(df)
             
         except FileNotFoundError:
             raise FileNotFoundError(f"Excel file not found: {file_path}")
@@ -64,6 +158,41 @@ class ExcelReader:
         except Exception as e:
             raise Exception(f"Error getting sheet names: {e}")
     
+    @staticmethod
+    def join_trades(trade_numbers: Sequence[Any], is_entry: np.ndarray, exit_rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Hash-join exit rows to every entry row that shares their Trade #.
+        
+        Trade numbers are hashed once; entry rows are bucketed per trade so
+        a trade with several entries (pyramiding / DCA) yields one pair per
+        entry. Each trade's entries are claimed by its first exit row only.
+        
+        Args:
+            trade_numbers: "Trade #" value of every order row
+            is_entry: Boolean mask of entry rows
+            exit_rows: Row indexes of exit orders, in the order to emit pairs
+            
+        Returns:
+            Tuple of (index into exit_rows, entry row index) arrays, grouped by
+            exit and in row order within each exit
+        """
+        codes, uniques = pd.factorize(pd.Series(trade_numbers, dtype=object))
+        entry_rows = np.flatnonzero(np.asarray(is_entry) & (codes >= 0))
+        entry_rows = entry_rows[np.argsort(codes[entry_rows], kind="stable")]
+        counts = np.bincount(codes[entry_rows], minlength=len(uniques))
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        
+        exit_codes = codes[exit_rows]
+        claimed = np.zeros(len(exit_rows), dtype=bool)
+        valid = np.flatnonzero(exit_codes >= 0)
+        claimed[valid[np.unique(exit_codes[valid], return_index=True)[1]]] = True
+        
+        repeat = np.where(claimed, counts[np.maximum(exit_codes, 0)], 0)
+        pair_exit = np.repeat(np.arange(len(exit_rows)), repeat)
+        offset = np.arange(repeat.sum()) - np.repeat(np.cumsum(repeat) - repeat, repeat)
+        pair_entry = entry_rows[np.repeat(starts[np.maximum(exit_codes, 0)], repeat) + offset]
+        return pair_exit, pair_entry
+    
     @staticmethod
     def merge_orders_to_positions(orders_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -73,52 +202,48 @@ class ExcelReader:
             orders_data: List of order dictionaries
             
         Returns:
-            List of position dictionaries with merged data
+            List of position dictionaries with merged data (one per exit; DCA
+            entries of the same trade are listed under 'Entries')
         """
-        positions = {}
+        types = [str(order.get('Type', '')) for order in orders_data]
+        exit_rows = np.array([i for i, t in enumerate(types) if 'Exit' in t], dtype=int)
+        is_entry = np.array(['Entry' in t for t in types], dtype=bool)
+        pair_exit, pair_entry = ExcelReader.join_trades(
+            [order.get('Trade #') for order in orders_data], is_entry, exit_rows
+        )
         
-        for order in orders_data:
-            trade_num = order.get('Trade #')
-            order_type = order.get('Type', '')
-            
-            if trade_num not in positions:
-                positions[trade_num] = {
-                    'Trade #': trade_num,
-                    'Entry': None,
-                    'Exit': None
-                }
-            
-            if 'Entry' in order_type:
-                positions[trade_num]['Entry'] = order
-            elif 'Exit' in order_type:
-                positions[trade_num]['Exit'] = order
+        entries_by_exit: Dict[int, List[Dict[str, Any]]] = {}
+        for e, i in zip(pair_exit.tolist(), pair_entry.tolist()):
+            entries_by_exit.setdefault(e, []).append(orders_data[i])
         
-        # Convert to list and create merged positions
         positions_list = []
-        for trade_num, position in positions.items():
-            if position['Entry'] and position['Exit']:
-                entry = position['Entry']
-                exit_order = position['Exit']
-                
-                merged_position = {
-                    'Trade #': trade_num,
-                    'Entry Date/Time': entry.get('Date/Time'),
-                    'Exit Date/Time': exit_order.get('Date/Time'),
-                    'Entry Price USDT': entry.get('Price USDT'),
-                    'Exit Price USDT': exit_order.get('Price USDT'),
-                    'Entry Signal': entry.get('Signal'),
-                    'Exit Signal': exit_order.get('Signal'),
-                    'Position size (qty)': exit_order.get('Position size (qty)'),
-                    'Position size (value)': exit_order.get('Position size (value)'),
-                    'P&L USD': exit_order.get('P&L USD'),
-                    'P&L %': exit_order.get('P&L %'),
-                    'Run-up USD': exit_order.get('Run-up USD'),
-                    'Run-up %': exit_order.get('Run-up %'),
-                    'Drawdown USD': exit_order.get('Drawdown USD'),
-                    'Drawdown %': exit_order.get('Drawdown %'),
-                    'Cumulative P&L USD': exit_order.get('Cumulative P&L USD'),
-                    'Cumulative P&L %': exit_order.get('Cumulative P&L %')
-                }
-                positions_list.append(merged_position)
+        for e, row in enumerate(exit_rows.tolist()):
+            entries = entries_by_exit.get(e)
+            if not entries:
+                continue
+            entry = entries[0]
+            exit_order = orders_data[row]
+            
+            merged_position = {
+                'Trade #': exit_order.get('Trade #'),
+                'Entry Date/Time': entry.get('Date/Time'),
+                'Exit Date/Time': exit_order.get('Date/Time'),
+                'Entry Price USDT': entry.get('Price USDT'),
+                'Exit Price USDT': exit_order.get('Price USDT'),
+                'Entry Signal': entry.get('Signal'),
+                'Exit Signal': exit_order.get('Signal'),
+                'Entries': entries,
+                'Position size (qty)': exit_order.get('Position size (qty)'),
+                'Position size (value)': exit_order.get('Position size (value)'),
+                'P&L USD': exit_order.get('P&L USD'),
+                'P&L %': exit_order.get('P&L %'),
+                'Run-up USD': exit_order.get('Run-up USD'),
+                'Run-up %': exit_order.get('Run-up %'),
+                'Drawdown USD': exit_order.get('Drawdown USD'),
+                'Drawdown %': exit_order.get('Drawdown %'),
+                'Cumulative P&L USD': exit_order.get('Cumulative P&L USD'),
+                'Cumulative P&L %': exit_order.get('Cumulative P&L %')
+            }
+            positions_list.append(merged_position)
         
         return positions_list
@@ -1,9 +1,21 @@
 """
 Utility functions for file operations.
+
+Shared data files are written atomically (temp file in the same directory,
+fsync, rename), so readers only ever see a complete old or new version.
+Read-modify-write sequences on a file (journal append + compaction,
+concurrent workers) are serialized with an advisory fcntl lock on a
+``<path>.lock`` sidecar that survives the renames.
 """
 
+import fcntl
 import os
-from typing import List, Optional
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import IO, Iterator, List, Optional
+
+LOCK_SUFFIX = ".lock"
 
 
 def get_data_directory(subdirectory: str = "sheets") -> str:
@@ -62,3 +74,86 @@ def ensure_directory(directory_path: str):
         directory_path: Directory path to ensure
     """
     os.makedirs(directory_path, exist_ok=True)
+
+
+@contextmanager
+def file_lock(path: str, shared: bool = False) -> Iterator[None]:
+    """
+    Hold an advisory lock on a file for the duration of the block.
+
+    Locks are per open file, so a process must not nest locks on the same path.
+
+    Args:
+        path: Guarded file path (the lock lives in ``<path>.lock``)
+        shared: Shared (reader) lock instead of an exclusive one
+    """
+    ensure_directory(os.path.dirname(os.path.abspath(path)))
+    fd = os.open(path + LOCK_SUFFIX, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_path(path: str) -> Iterator[str]:
+    """
+    Temporary path that replaces ``path`` when the block completes.
+
+    The temp file is created next to the target so the final rename is
+    atomic; it is removed if the block raises.
+
+    Args:
+        path: Target file path
+
+    Yields:
+        Temporary file path to write
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    ensure_directory(directory)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    os.close(fd)
+    try:
+        yield tmp_path
+        os.chmod(tmp_path, 0o644)
+        fd = os.open(tmp_path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+@contextmanager
+def atomic_write(path: str, mode: str = "w", encoding: Optional[str] = "utf-8") -> Iterator[IO]:
+    """
+    File object whose content replaces ``path`` atomically when the block completes.
+
+    Args:
+        path: Target file path
+        mode: "w" (text) or "wb" (binary)
+        encoding: Text encoding (ignored in binary mode)
+
+    Yields:
+        Open file object
+    """
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, mode, encoding=None if "b" in mode else encoding) as f:
+            yield f
+
+
+def atomic_copy(source: str, destination: str):
+    """
+    Copy a file so readers of the destination never see a partial copy.
+
+    Args:
+        source: Source file path
+        destination: Destination file path
+    """
+    with atomic_path(destination) as tmp_path:
+        shutil.copyfile(source, tmp_path)
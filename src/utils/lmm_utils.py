@@ -1,10 +1,19 @@
 
-import json
 import os
 from typing import Any
-from datetime import datetime
 
-CACHE_PATH = os.environ.get("CACHE_PATH", "data/prompts/potential_conditions.json")
+from .attempt_log import AttemptLog
+
+CACHE_PATH = os.environ.get("CACHE_PATH", "data/prompts/potential_conditions.jsonl")
+
+# One log per path, so its index is built once and then only extended
+_LOGS: dict[str, AttemptLog] = {}
+
+
+def _attempt_log(cache_path: str) -> AttemptLog:
+    if cache_path not in _LOGS:
+        _LOGS[cache_path] = AttemptLog(cache_path)
+    return _LOGS[cache_path]
 
 
 def decode_LMM_output(output: str) -> dict[str, Any]:
@@ -50,39 +59,21 @@ def decode_LMM_output(output: str) -> dict[str, Any]:
     # }
 
 
-def ensure_cache_file(cache_path: str = CACHE_PATH) -> None:
-    """Make sure the cache file exists and is a valid JSON dict."""
-    if not os.path.exists(cache_path):
-        print(cache_path)
-        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
-        with open(cache_path, "w", encoding="utf-8") as f:
-            json.dump({}, f)  # empty dict, not list
-
-
 def get_cache(cache_path: str = CACHE_PATH) -> dict[str, Any]:
-    """Get cache as a dict."""
-    ensure_cache_file(cache_path)
-    with open(cache_path, "r", encoding="utf-8") as f:
-        try:
-            return json.load(f)
-        except json.JSONDecodeError:
-            return {}
+    """Get all logged attempts keyed by timestamp."""
+    return _attempt_log(cache_path).entries()
 
 
 def add_to_cache(change: dict[str, Any], cache_path: str = CACHE_PATH) -> None:
-    """Add to cache with timestamp as key."""
-    cache = get_cache(cache_path)
-    now = datetime.now().isoformat()
-    cache[now] = change
-    with open(cache_path, "w", encoding="utf-8") as f:
-        json.dump(cache, f, ensure_ascii=False, indent=2)
+    """Append an attempt to the JSONL attempt log (one atomic line, timestamped)."""
+    _attempt_log(cache_path).append(change)
 
 
 if __name__ == "__main__":
     with open("data/prompts/BTC (Bitoin)-2025-09-26 17:48:15.300003.txt", "r", encoding="utf-8") as f:
         output = f.read()
     res = decode_LMM_output(output)
-    add_to_cache({"change": res["change"], "last_code": res["last_code"]}, "data/prompts/abc.json")
+    add_to_cache({"change": res["change"], "last_code": res["last_code"]}, "data/prompts/abc.jsonl")
 
 
 __all__ = ["decode_LMM_output", "add_to_cache"]
\ No newline at end of file
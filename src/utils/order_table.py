@@ -0,0 +1,359 @@
+"""
+Columnar container for TradingView order rows.
+"""
+
+from typing import Dict, Any, List, Iterator, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from .signal_processing import SIGNAL_PARSER, ParsedSignal, SignalColumn
+
+
+class OrderRow:
+    """Read-only, dict-like view of one row of an OrderTable."""
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: "OrderTable", index: int):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._table._columns:
+            raise KeyError(key)
+        return self._table.value(key, self._index)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._table._columns
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._table.columns)
+
+    def __len__(self) -> int:
+        return len(self._table.columns)
+
+    def __repr__(self) -> str:
+        return f"OrderRow({self.to_dict()!r})"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Column value of this row, or default when the column is missing."""
+        if key not in self._table._columns:
+            return default
+        return self._table.value(key, self._index)
+
+    def keys(self) -> List[str]:
+        return self._table.columns
+
+    def items(self):
+        return ((k, self._table.value(k, self._index)) for k in self._table.columns)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Materialize the row as a plain dict (JSON/API boundary only)."""
+        return dict(self.items())
+
+    def signal(self) -> ParsedSignal:
+        """Decoded Signal of this row, from the table's shared parse."""
+        return self._table.signals()[self._index]
+
+
+class OrderTable:
+    """
+    Orders stored column by column.
+
+    Numeric columns are NumPy arrays. String columns are dictionary-encoded
+    (int32 codes + array of distinct values), so repeated values such as
+    "Entry long" or a condition Signal are stored once. Columns mixing
+    numeric types keep a plain object array so values round-trip exactly.
+    Rows are exposed as lightweight OrderRow views; dicts are built only by
+    ``to_records`` / ``OrderRow.to_dict``.
+    """
+
+    __slots__ = ("_columns", "_dictionaries", "_length", "_signals")
+
+    def __init__(self, columns: Dict[str, np.ndarray], dictionaries: Dict[str, np.ndarray], length: int):
+        """
+        Initialize table from prepared column arrays.
+
+        Args:
+            columns: Column name -> values array (or codes for encoded columns)
+            dictionaries: Column name -> distinct values for encoded columns
+            length: Number of rows
+        """
+        self._columns = columns
+        self._dictionaries = dictionaries
+        self._length = length
+        self._signals: Optional[SignalColumn] = None
+
+    @staticmethod
+    def _encode(values: Sequence[Any]):
+        """Pick the storage for one column: int64, float64, dictionary codes or objects."""
+        kinds = {type(v) for v in values}
+        if kinds == {int}:
+            return np.asarray(values, dtype=np.int64), None
+        if kinds == {float}:
+            return np.asarray(values, dtype=np.float64), None
+        if len(kinds & {int, float, bool}) > 1:
+            # 1 / 1.0 / True hash equal; keep them apart
+            column = np.empty(len(values), dtype=object)
+            column[:] = values
+            return column, None
+        codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=False)
+        return codes.astype(np.int32), np.asarray(uniques, dtype=object)
+
+    @classmethod
+    def from_records(cls, records: Sequence[Dict[str, Any]]) -> "OrderTable":
+        """
+        Build table from a list of order dicts (e.g. a loaded JSON cache).
+
+        Args:
+            records: Order dictionaries; missing keys become None
+
+        Returns:
+            OrderTable with one column per key (first-seen order)
+        """
+        names: Dict[str, None] = {}
+        for record in records:
+            for key in record:
+                names.setdefault(key, None)
+        columns: Dict[str, np.ndarray] = {}
+        dictionaries: Dict[str, np.ndarray] = {}
+        for name in names:
+            values, uniques = cls._encode([r.get(name) for r in records])
+            columns[name] = values
+            if uniques is not None:
+                dictionaries[name] = uniques
+        return cls(columns, dictionaries, len(records))
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "OrderTable":
+        """
+        Build table straight from a parsed "List of trades" sheet.
+
+        Args:
+            df: DataFrame returned by the Excel reader
+
+        Returns:
+            OrderTable holding the same values ``df.to_dict("records")`` would
+        """
+        columns: Dict[str, np.ndarray] = {}
+        dictionaries: Dict[str, np.ndarray] = {}
+        for name in df.columns:
+            series = df[name]
+            if pd.api.types.is_datetime64_any_dtype(series.dtype):
+                series = series.astype(str)
+            if series.dtype == np.int64 or series.dtype == np.float64:
+                columns[name] = series.to_numpy(copy=True)
+            else:
+                values, uniques = cls._encode(series.tolist())
+                columns[name] = values
+                if uniques is not None:
+                    dictionaries[name] = uniques
+        return cls(columns, dictionaries, len(df))
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: int) -> OrderRow:
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(f"Order index {index} out of range")
+        return OrderRow(self, index)
+
+    def __iter__(self) -> Iterator[OrderRow]:
+        return (OrderRow(self, i) for i in range(self._length))
+
+    def __repr__(self) -> str:
+        return f"OrderTable(rows={self._length}, columns={self.columns})"
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns.keys())
+
+    def value(self, name: str, index: int) -> Any:
+        """Single cell as a Python value."""
+        values = self._columns[name]
+        uniques = self._dictionaries.get(name)
+        if uniques is not None:
+            return uniques[values[index]]
+        value = values[index]
+        return value.item() if isinstance(value, np.generic) else value
+
+    def column(self, name: str, default: Any = None) -> np.ndarray:
+        """
+        Decoded column values.
+
+        Args:
+            name: Column name
+            default: Fill value when the column does not exist
+
+        Returns:
+            NumPy array (object dtype for dictionary-encoded columns)
+        """
+        values = self._columns.get(name)
+        if values is None:
+            return np.full(self._length, default, dtype=object)
+        uniques = self._dictionaries.get(name)
+        if uniques is not None:
+            return uniques[values]
+        return values
+
+    def codes(self, name: str):
+        """
+        Dictionary codes and distinct values of an encoded column.
+
+        Returns:
+            Tuple of (codes, distinct values), or None for numeric columns
+        """
+        uniques = self._dictionaries.get(name)
+        if uniques is None:
+            return None
+        return self._columns[name], uniques
+
+    def signals(self) -> SignalColumn:
+        """
+        Decoded Signal column, parsed once per distinct value and cached.
+
+        Returns:
+            SignalColumn aligned with the table rows
+        """
+        if self._signals is None:
+            encoded = self.codes("Signal")
+            if encoded is not None:
+                self._signals = SIGNAL_PARSER.parse_column(encoded[1], encoded[0])
+            else:
+                self._signals = SIGNAL_PARSER.parse_column(self.column("Signal", ""))
+        return self._signals
+
+    def take(self, indexes: Union[Sequence[int], np.ndarray]) -> "OrderTable":
+        """Subset of rows; dictionaries are shared with this table."""
+        indexes = np.asarray(indexes, dtype=np.int64)
+        return OrderTable(
+            {k: v[indexes] for k, v in self._columns.items()},
+            self._dictionaries,
+            len(indexes),
+        )
+
+    @staticmethod
+    def _key_value(value: Any) -> Any:
+        # 1 / 1.0 / True compare equal and NaN never does; neither may join rows
+        if isinstance(value, float) and value != value:
+            return (float, "nan")
+        return (type(value), value)
+
+    def row_key(self, record: Any) -> tuple:
+        """Content key of an order (dict or OrderRow) over this table's columns."""
+        return tuple(self._key_value(record.get(name)) for name in self._columns)
+
+    def row_lookup(self) -> Dict[tuple, int]:
+        """
+        Row content -> row number, used to match position orders to rows.
+
+        Orders are matched on every column, not just Trade # and Type, so the
+        several entries of one DCA trade keep their own rows. Identical rows
+        map to the first of them.
+        """
+        names = self.columns
+        lookup: Dict[tuple, int] = {}
+        for i, values in enumerate(zip(*(self.column(n).tolist() for n in names))):
+            lookup.setdefault(tuple(self._key_value(v) for v in values), i)
+        return lookup
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Materialize all rows as dicts (JSON/API boundary only)."""
+        names = self.columns
+        lists = [self.column(n).tolist() for n in names]
+        return [dict(zip(names, row)) for row in zip(*lists)]
+
+    def nbytes(self) -> int:
+        """Approximate memory held by column buffers and dictionaries."""
+        size = sum(v.nbytes for v in self._columns.values())
+        size += sum(
+            sum(len(u) + 49 if isinstance(u, str) else 24 for u in v)
+            for name, v in self._columns.items()
+            if v.dtype == object and name not in self._dictionaries
+        )
+        for uniques in self._dictionaries.values():
+            size += uniques.nbytes + sum(
+                len(u) + 49 if isinstance(u, str) else 24 for u in uniques
+            )
+        return size
+
+
+def json_default(obj: Any) -> Any:
+    """``json.dump`` hook turning columnar orders back into plain records."""
+    if isinstance(obj, OrderTable):
+        return obj.to_records()
+    if isinstance(obj, OrderRow):
+        return obj.to_dict()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def to_columnar(report: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Convert the order lists of a loaded report (or cache) to columnar storage.
+
+    Each report's ``orders`` becomes an OrderTable and every position's
+    ``orders`` becomes a list of OrderRow views into that table (matched on
+    the full row), so each order is held once. Nested ``global_test`` /
+    ``single_test`` sections are converted in place.
+
+    Args:
+        report: Report dictionary or full cache dictionary
+
+    Returns:
+        The same dictionary, converted
+    """
+    if not isinstance(report, dict):
+        return report
+    if isinstance(report.get("global_test"), dict):
+        to_columnar(report["global_test"])
+    if isinstance(report.get("single_test"), dict):
+        for value in report["single_test"].values():
+            to_columnar(value)
+    if not isinstance(report.get("orders"), list):
+        return report
+
+    table = OrderTable.from_records(report["orders"])
+    report["orders"] = table
+    row_index = table.row_lookup()
+    for position in (report.get("positions") or {}).values():
+        if not isinstance(position, dict) or not isinstance(position.get("orders"), list):
+            continue
+        position["orders"] = [
+            OrderRow(table, row_index[key]) if key in row_index else order
+            for order, key in ((o, table.row_key(o)) for o in position["orders"])
+        ]
+    return report
+
+
+def from_columnar(report: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Turn the columnar orders of a report (or cache) back into plain records.
+
+    Inverse of ``to_columnar``: OrderTables become lists of dicts and position
+    OrderRows become dicts. Nested ``global_test`` / ``single_test`` sections
+    are converted in place.
+
+    Args:
+        report: Report dictionary or full cache dictionary
+
+    Returns:
+        The same dictionary, converted
+    """
+    if not isinstance(report, dict):
+        return report
+    if isinstance(report.get("global_test"), dict):
+        from_columnar(report["global_test"])
+    if isinstance(report.get("single_test"), dict):
+        for value in report["single_test"].values():
+            from_columnar(value)
+    if isinstance(report.get("orders"), OrderTable):
+        report["orders"] = report["orders"].to_records()
+    for position in (report.get("positions") or {}).values():
+        if isinstance(position, dict) and isinstance(position.get("orders"), list):
+            position["orders"] = [o.to_dict() if isinstance(o, OrderRow) else o for o in position["orders"]]
+    return report
@@ -4,50 +4,407 @@ Report export utilities for trading analytics.
 
 import os
 import re
-from typing import Dict, Any, List, Tuple
-import pandas as pd
-from .file_operations import get_data_directory, ensure_directory
-from .signal_processing import encode_signals
+from concurrent.futures import ThreadPoolExecutor
+import math
+from typing import Dict, Any, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, Side
+from .file_operations import atomic_write, ensure_directory, file_lock, get_data_directory
+from .signal_processing import SIGNAL_PARSER
+from .order_table import OrderRow, from_columnar, json_default, to_columnar
+from .binary_cache import CacheFile, CacheJournal, binary_cache_path, cache_journal_path, report_key, write_cache
+from .cache_shards import read_shard, report_metrics, shard_directory, write_shard, write_shards
+from .report_renderer import CoalescingRenderer
+from .results_db import ResultsDB
 
 import json
+
+# Header style pandas.DataFrame.to_excel applies
+EXCEL_HEADER_FONT = Font(bold=True)
+EXCEL_HEADER_BORDER = Border(*(Side(style="thin") for _ in range(4)))
+EXCEL_HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="top")
+
+
+def _excel_value(value: Any) -> Any:
+    """Cell value as DataFrame.to_excel would write it (NaN blank, inf as text)."""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float):
+        if math.isnan(value):
+            return None
+        if math.isinf(value):
+            return "inf" if value > 0 else "-inf"
+    return value
+
+
+class ReportModel(NamedTuple):
+    """Rows and summaries rendered by both the TXT and Excel reports."""
+    file_name: str
+    total_positions: Any
+    single_rows: Optional[List[Dict[str, Any]]]
+    single_summary: Optional[Dict[str, Any]]
+    conditions: List[Tuple[str, Dict[str, Any]]]
+    positions: List[Tuple[str, int, Any, str, str, str]]
+    performance_metrics: Dict[str, Any]
+
+
 class ReportExporter:
     """Exports trading analysis results to formatted reports."""
     
+    def __init__(self, config: Optional[Dict[str, Any]] = None, code: Optional[str] = None,
+                 strategy: Optional[str] = None):
+        """
+        Initialize exporter.
+        
+        Args:
+            config: Configuration dictionary (TOTAL_CONDITIONS, CACHE_FORMATS,
+                RENDER_INTERVAL_SECONDS, RESULTS_DB)
+            code: Strategy code the exported results were produced with
+            strategy: Strategy name results are recorded under; a sheet named
+                otherwise (e.g. optimizer worker "pc_0") is recorded as its
+                worker. Defaults to the sheet name
+        """
+        self.config = config or {}
+        self.code = code
+        self.strategy = strategy
+        self._pending_results: List[Tuple[str, Optional[str], Any]] = []
+        self._run_ids: Dict[str, int] = {}
+        self._renderer = CoalescingRenderer(self.render_reports, self.config.get("RENDER_INTERVAL_SECONDS"))
+    
+    def _cache_file(self, file_name: str) -> str:
+        """JSON cache path of a strategy (sheet or strategy file name)."""
+        strategy_name = os.path.splitext(file_name)[0]
+        return os.path.join(get_data_directory("cache"), f"{strategy_name}.json")
+    
     def save_cache(self, strategy_report: Dict[str, Any], file_name: str):
-        """Save report to JSON cache file."""
+        """Save report to the cache formats in CACHE_FORMATS ("msgpack", "json" and/or "shards")."""
         try:
             cache_dir = get_data_directory("cache")
             ensure_directory(cache_dir)
             
-            strategy_name = os.path.splitext(file_name)[0]
-            cache_file = os.path.join(cache_dir, f"{strategy_name}.json")
-            
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(strategy_report, f, indent=2)
+            cache_file = self._cache_file(file_name)
+            with file_lock(cache_file):
+                self._write_cache(strategy_report, cache_file)
             
             print(f"💾 Cached to: {cache_file}")
         except Exception as e:
             print(f"❌ Cache save failed: {e}")
     
-    def load_cache(self, file_path: str) -> Dict[str, Any]:
-        """Load report from JSON cache file."""
+    def _write_cache(self, strategy_report: Dict[str, Any], cache_file: str):
+        """Atomically replace every cache format of a strategy (caller holds the cache lock)."""
+        formats = self.config.get("CACHE_FORMATS", ["msgpack", "json"])
+        # JSON first: the binary cache is only read while it is at least as new
+        if "json" in formats:
+            with atomic_write(cache_file) as f:
+                json.dump(strategy_report, f, indent=2, default=json_default)
+        if "msgpack" in formats:
+            write_cache(binary_cache_path(cache_file), strategy_report)
+        if "shards" in formats:
+            write_shards(shard_directory(cache_file), strategy_report)
+        # The full write supersedes any journaled reports
+        CacheJournal(cache_journal_path(cache_file)).clear()
+    
+    def save_condition(self, condition_report: Any, file_name: str, condition: str):
+        """
+        Persist one finished single test condition without rewriting the cache.
+        
+        The report is appended to the strategy's cache journal; every
+        CACHE_COMPACT_EVERY records the journal is compacted into the cache.
+        
+        Args:
+            condition_report: Condition analysis results ("" for a failed test)
+            file_name: Source Excel filename
+            condition: Condition id
+        """
+        try:
+            cache_file = self._cache_file(file_name)
+            with file_lock(cache_file):
+                records = CacheJournal(cache_journal_path(cache_file)).append(report_key(condition), condition_report)
+                if "shards" in self.config.get("CACHE_FORMATS", ["msgpack", "json"]):
+                    write_shard(shard_directory(cache_file), condition, condition_report)
+            print(f"💾 Journaled condition {condition} to: {cache_journal_path(cache_file)}")
+        except Exception as e:
+            print(f"❌ Cache save failed: {e}")
+            return
+        
+        if records >= self.config.get("CACHE_COMPACT_EVERY", 8):
+            self.compact_cache(file_name)
+    
+    def compact_cache(self, file_name: str):
+        """
+        Fold the strategy's cache journal into its cache files.
+        
+        Args:
+            file_name: Source Excel filename
+        """
+        self.record_results()
+        cache_file = self._cache_file(file_name)
+        if not len(CacheJournal(cache_journal_path(cache_file))):
+            return
+        try:
+            with file_lock(cache_file):
+                cache = self._read_cache(cache_file, columnar=True)
+                if cache:
+                    self._write_cache(cache, cache_file)
+            print(f"💾 Compacted cache: {cache_file}")
+        except Exception as e:
+            print(f"❌ Cache compaction failed: {e}")
+    
+    def load_cache(self, file_path: str, columnar: bool = False) -> Dict[str, Any]:
+        """
+        Load report from cache, preferring the binary file next to a JSON path
+        unless the JSON file is newer.
+        
+        Reports in the cache journal are replayed over the loaded cache. The
+        files are read under a shared lock, so a concurrent compaction never
+        yields a cache without the journaled reports.
+        
+        Args:
+            file_path: Cache file path (".json" or ".msgpack")
+            columnar: Return orders as OrderTable instead of lists of dicts
+            
+        Returns:
+            Cache dictionary, or None when missing or unreadable
+        """
+        try:
+            paths = (file_path, binary_cache_path(file_path), cache_journal_path(file_path))
+            if not any(os.path.exists(path) for path in paths):
+                return None
+            with file_lock(file_path, shared=True):
+                return self._read_cache(file_path, columnar)
+        except Exception as e:
+            print(f"❌ Cache load failed: {e}")
+        
+        return None
+    
+    @staticmethod
+    def _binary_is_current(file_path: str) -> bool:
+        """
+        Whether the binary cache next to a JSON path may be read.
+        
+        The binary cache is local (not in git); a JSON cache that is newer,
+        e.g. after a pull or a hand edit, wins over it.
+        """
+        binary_file = binary_cache_path(file_path)
+        if not os.path.exists(binary_file):
+            return False
+        return not os.path.exists(file_path) or os.path.getmtime(binary_file) >= os.path.getmtime(file_path)
+    
+    def _read_cache(self, file_path: str, columnar: bool = False) -> Optional[Dict[str, Any]]:
+        """Read a cache and replay its journal (caller holds the cache lock)."""
+        binary_file = binary_cache_path(file_path)
+        journal = CacheJournal(cache_journal_path(file_path))
+        journaled = os.path.exists(journal.path)
+        data = None
+        if self._binary_is_current(file_path):
+            data = CacheFile(binary_file).load()
+        elif os.path.exists(file_path):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if columnar:
+                to_columnar(data)
+            elif not journaled:
+                return data
+        if journaled:
+            data = journal.apply(data or {})
+        if data is None:
+            return None
+        return data if columnar else from_columnar(data)
+    
+    def load_cache_metrics(self, file_path: str, condition: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Load the metrics of one report without its orders and positions.
+        
+        Only the header and the metrics section are read from a binary cache;
+        without cache files (e.g. a clone holding only the git shards) the
+        report's shard is read, and a JSON-only cache is parsed in full.
+        
+        Args:
+            file_path: Cache file path (".json" or ".msgpack")
+            condition: Single test condition; global test when None
+            
+        Returns:
+            Metrics dictionary, or None when missing or unreadable
+        """
         try:
-            cache_file = os.path.join(file_path)
-            if os.path.exists(cache_file):
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+            binary_file = binary_cache_path(file_path)
+            journal = CacheJournal(cache_journal_path(file_path))
+            if not any(os.path.exists(path) for path in (file_path, binary_file, journal.path)):
+                report = read_shard(shard_directory(file_path), condition)
+            else:
+                with file_lock(file_path, shared=True):
+                    journaled = dict(journal.records())
+                    if report_key(condition) in journaled:
+                        report = journaled[report_key(condition)]
+                    elif self._binary_is_current(file_path):
+                        return CacheFile(binary_file).metrics(condition) or None
+                    else:
+                        data = self._read_cache(file_path) or {}
+                        report = data.get("global_test") if condition is None else (data.get("single_test") or {}).get(condition)
+            if isinstance(report, dict):
+                return report_metrics(report)
         except Exception as e:
             print(f"❌ Cache load failed: {e}")
         
         return None
     
-    def export_txt(self, strategy_report: Dict[str, Any], file_name: str) -> Tuple[bool, str]:
+    def build_report_model(self, strategy_report: Dict[str, Any], file_name: str) -> ReportModel:
+        """
+        Compute the rows and summaries shared by the TXT and Excel reports.
+        
+        Args:
+            strategy_report: Analysis results dictionary
+            file_name: Source Excel filename
+            
+        Returns:
+            ReportModel with sorted single test, condition and position rows
+        """
+        # Handle both single report and multi-test report structures
+        if "global_test" in strategy_report and "single_test" in strategy_report:
+            # Multi-test structure
+            global_data = strategy_report["global_test"]
+            single_data = strategy_report["single_test"]
+            positions = global_data.get("positions", {}) or {}
+            conditions = global_data.get("conditions", {}) or {}
+            total_positions = global_data.get("totalPositions", len(positions))
+        else:
+            # Single report structure
+            positions = strategy_report.get("positions", {}) or {}
+            conditions = strategy_report.get("conditions", {}) or {}
+            total_positions = strategy_report.get("totalPositions", len(positions))
+            single_data = None
+        
+        # Single test rows and summary
+        single_rows = None
+        single_summary = None
+        if single_data and isinstance(single_data, dict):
+            single_rows = []
+            for condition_key, condition_data in single_data.items():
+                # Skip empty condition names
+                if not condition_key or str(condition_key).strip() == "":
+                    continue
+                if isinstance(condition_data, dict):
+                    single_rows.append({
+                        "condition": condition_key,
+                        "total_trades": condition_data.get("Total trades", 0),
+                        "max_drawdown": condition_data.get("Max drawdown %", 0),
+                        "profit_factor": condition_data.get("Profit factor", 0),
+                        "win_rate": condition_data.get("Percent profitable", 0),
+                        "net_profit_pct": condition_data.get("Net profit %", 0),
+                        "sharpe_ratio": condition_data.get("Sharpe ratio", 0),
+                        "sortino_ratio": condition_data.get("Sortino ratio", 0),
+                        "tags": condition_data.get("tags", [])
+                    })
+            
+            if single_rows:
+                # Sort conditions numerically if possible
+                def _single_test_sort_key(item):
+                    condition = str(item["condition"]).strip()
+                    if condition.isdigit():
+                        return (0, int(condition))
+                    return (1, condition)
+                
+                single_rows.sort(key=_single_test_sort_key)
+                
+                # Collect valid numeric values (skip NaN/None/empty strings)
+                def _valid(key):
+                    return [
+                        item[key] for item in single_rows
+                        if isinstance(item[key], (int, float)) and not (item[key] != item[key])
+                    ]
+                
+                def _mean(values):
+                    return sum(values) / len(values) if values else 0
+                
+                max_drawdown_values = _valid("max_drawdown")
+                net_profit_values = _valid("net_profit_pct")
+                single_summary = {
+                    "total_trades": sum(item["total_trades"] for item in single_rows),
+                    "max_drawdown": min(max_drawdown_values) if max_drawdown_values else 0,  # Most negative (worst)
+                    "profit_factor": _mean(_valid("profit_factor")),
+                    "win_rate": _mean(_valid("win_rate")),
+                    "net_profit_pct": sum(net_profit_values) if net_profit_values else 0,
+                    "sharpe_ratio": _mean(_valid("sharpe_ratio")),
+                    "sortino_ratio": _mean(_valid("sortino_ratio")),
+                }
+        
+        # Custom sort: numeric names first (1, 2, 10, ...), then alpha groups (e.g., dca1, dca2, ...)
+        def _cond_sort_key(name: str):
+            n = str(name).strip()
+            if n.isdigit():
+                return (0, int(n), "", -1)
+            m = re.match(r'^([A-Za-z]+)(\d+)?$', n)
+            if m:
+                prefix = m.group(1)
+                num = int(m.group(2)) if m.group(2) else -1
+                return (1, prefix, num, -1)
+            return (2, n, -1, -1)
+        
+        condition_items = sorted(conditions.items(), key=lambda kv: _cond_sort_key(kv[0]))
+        
+        # Position rows: step conditions, sizes and trade numbers from ALL orders
+        position_rows = []
+        for pos_key, info in positions.items():
+            dt = pos_key.replace("Position ", "", 1)
+            orders = info.get("orders", [])
+            dd_value = info.get("Position max drawdown %", 0)
+            
+            step_conditions = []
+            size_percents = []
+            trade_numbers = []
+            for order in orders:
+                step_condition, size_percent = self._decode_order_signal(order)
+                step_conditions.append(step_condition)
+                size_percents.append(size_percent)
+                
+                # Collect trade numbers
+                trade_num = order.get("Trade #", "")
+                if trade_num:
+                    trade_numbers.append(str(trade_num))
+            
+            # Join with dashes
+            position_rows.append((
+                dt,
+                len(orders),
+                dd_value,
+                " - ".join(step_conditions),
+                " - ".join(size_percents),
+                " - ".join(trade_numbers),
+            ))
+        
+        # Sort positions by drawdown percentage (worst first)
+        position_rows.sort(key=lambda x: float(x[2]) if isinstance(x[2], (int, float)) else 0, reverse=False)
+        
+        # Performance metrics (if available)
+        performance_metrics = {}
+        for key, value in strategy_report.items():
+            if key not in ['orders', 'positions', 'totalPositions', 'conditions', 'Max drawdown %', 'Net profit %']:
+                if isinstance(value, (int, float)) or (isinstance(value, str) and value.replace('.', '').replace('-', '').isdigit()):
+                    try:
+                        performance_metrics[key] = float(value)
+                    except:
+                        performance_metrics[key] = value
+        
+        return ReportModel(
+            file_name=file_name,
+            total_positions=total_positions,
+            single_rows=single_rows,
+            single_summary=single_summary,
+            conditions=condition_items,
+            positions=position_rows,
+            performance_metrics=performance_metrics,
+        )
+    
+    def export_txt(self, strategy_report: Dict[str, Any], file_name: str, model: Optional[ReportModel] = None) -> Tuple[bool, str]:
         """
         Export analysis results to text report.
         
         Args:
             strategy_report: Analysis results dictionary
             file_name: Source Excel filename
+            model: Precomputed report model (built from strategy_report when None)
             
         Returns:
             Tuple of (success, output_path or error_message)
@@ -59,20 +416,8 @@ class ReportExporter:
             
             output_filename = os.path.splitext(file_name)[0] + ".txt"
             output_path = os.path.join(reports_dir, output_filename)
-            # Handle both single report and multi-test report structures
-            if "global_test" in strategy_report and "single_test" in strategy_report:
-                # Multi-test structure
-                global_data = strategy_report["global_test"]
-                single_data = strategy_report["single_test"]
-                positions = global_data.get("positions", {}) or {}
-                conditions = global_data.get("conditions", {}) or {}
-                total_positions = global_data.get("totalPositions", len(positions))
-            else:
-                # Single report structure
-                positions = strategy_report.get("positions", {}) or {}
-                conditions = strategy_report.get("conditions", {}) or {}
-                total_positions = strategy_report.get("totalPositions", len(positions))
-                single_data = None
+            if model is None:
+                model = self.build_report_model(strategy_report, file_name)
 
             lines: List[str] = []
 
@@ -82,57 +427,16 @@ class ReportExporter:
             lines.append("=" * len(title))
             lines.append("")
             lines.append(f"Source sheet: {file_name}")
-            lines.append(f"Total positions: {total_positions}")
+            lines.append(f"Total positions: {model.total_positions}")
             lines.append("")
 
             # Single Test section (if available)
-            if single_data and isinstance(single_data, dict):
+            if model.single_rows is not None:
                 lines.append("Single Test Performance")
                 lines.append("-" * len("Single Test Performance"))
                 
-                # Extract condition data from single_test
-                single_test_conditions = []
-                for condition_key, condition_data in single_data.items():
-                    # Skip empty condition names
-                    if not condition_key or str(condition_key).strip() == "":
-                        continue
-                        
-                    if isinstance(condition_data, dict):
-                        # Extract performance metrics
-                        total_trades = condition_data.get("Total trades", 0)
-                        max_drawdown = condition_data.get("Max drawdown %", 0)
-                        profit_factor = condition_data.get("Profit factor", 0)
-                        win_rate = condition_data.get("Percent profitable", 0)
-                        net_profit_pct = condition_data.get("Net profit %", 0)
-                        sharpe_ratio = condition_data.get("Sharpe ratio", 0)
-                        sortino_ratio = condition_data.get("Sortino ratio", 0)
-                        
-                        # Get tags from strategy report level (for single test conditions)
-                        tags = condition_data.get("tags", [])
-                        # print(f"DEBUG: Tags for condition {condition_key}: {tags} (type: {type(tags)})")
-                        
-                        single_test_conditions.append({
-                            "condition": condition_key,
-                            "total_trades": total_trades,
-                            "max_drawdown": max_drawdown,
-                            "profit_factor": profit_factor,
-                            "win_rate": win_rate,
-                            "net_profit_pct": net_profit_pct,
-                            "sharpe_ratio": sharpe_ratio,
-                            "sortino_ratio": sortino_ratio,
-                            "tags": tags
-                        })
-                
+                single_test_conditions = model.single_rows
                 if single_test_conditions:
-                    # Sort conditions numerically if possible
-                    def _single_test_sort_key(item):
-                        condition = str(item["condition"]).strip()
-                        if condition.isdigit():
-                            return (0, int(condition))
-                        return (1, condition)
-                    
-                    single_test_conditions.sort(key=_single_test_sort_key)
-                    
                     # Calculate column widths
                     cond_w = max(len("Condition"), max(len(str(item["condition"])) for item in single_test_conditions))
                     trades_w = max(len("Total Trades"), max(len(str(int(item["total_trades"]))) for item in single_test_conditions))
@@ -171,18 +475,8 @@ class ReportExporter:
                     lines.append(header)
                     lines.append(sep)
                     
-                    # Add data rows and calculate summary metrics
-                    total_trades_sum = 0
-                    max_drawdown_values = []
-                    profit_factor_values = []
-                    win_rate_values = []
-                    net_profit_values = []
-                    sharpe_ratio_values = []
-                    sortino_ratio_values = []
-                    
                     for item in single_test_conditions:
                         tag_display = ', '.join(item['tags']) if item['tags'] else ''
-                        # print(f"DEBUG: Tag display for condition {item['condition']}: '{tag_display}' (tags: {item['tags']})")
                         
                         line = (
                             f"{str(item['condition']).ljust(cond_w)}  "
@@ -196,48 +490,19 @@ class ReportExporter:
                             f"{tag_display.ljust(tags_w)}"
                         )
                         lines.append(line)
-                        
-                        # Accumulate values for summary
-                        total_trades_sum += int(item['total_trades'])
-                        
-                        # Collect valid numeric values (skip NaN/None)
-                        if isinstance(item['max_drawdown'], (int, float)) and not (item['max_drawdown'] != item['max_drawdown']):  # not NaN
-                            max_drawdown_values.append(item['max_drawdown'])
-                        
-                        if isinstance(item['profit_factor'], (int, float)) and not (item['profit_factor'] != item['profit_factor']):  # not NaN
-                            profit_factor_values.append(item['profit_factor'])
-                        
-                        if isinstance(item['win_rate'], (int, float)) and not (item['win_rate'] != item['win_rate']):  # not NaN
-                            win_rate_values.append(item['win_rate'])
-                        
-                        if isinstance(item['net_profit_pct'], (int, float)) and not (item['net_profit_pct'] != item['net_profit_pct']):  # not NaN
-                            net_profit_values.append(item['net_profit_pct'])
-                        
-                        if isinstance(item['sharpe_ratio'], (int, float)) and not (item['sharpe_ratio'] != item['sharpe_ratio']):  # not NaN
-                            sharpe_ratio_values.append(item['sharpe_ratio'])
-                        
-                        if isinstance(item['sortino_ratio'], (int, float)) and not (item['sortino_ratio'] != item['sortino_ratio']):  # not NaN
-                            sortino_ratio_values.append(item['sortino_ratio'])
-                    
-                    # Calculate summary values
-                    summary_max_drawdown = min(max_drawdown_values) if max_drawdown_values else 0  # Most negative (worst)
-                    summary_profit_factor = sum(profit_factor_values) / len(profit_factor_values) if profit_factor_values else 0
-                    summary_win_rate = sum(win_rate_values) / len(win_rate_values) if win_rate_values else 0
-                    summary_net_profit = sum(net_profit_values) if net_profit_values else 0
-                    summary_sharpe = sum(sharpe_ratio_values) / len(sharpe_ratio_values) if sharpe_ratio_values else 0
-                    summary_sortino = sum(sortino_ratio_values) / len(sortino_ratio_values) if sortino_ratio_values else 0
                     
                     # Add summary row
+                    summary = model.single_summary
                     lines.append(sep)
                     summary_line = (
                         f"{'TOTAL'.ljust(cond_w)}  "
-                        f"{str(total_trades_sum).rjust(trades_w)}  "
-                        f"{self._format_drawdown_percent(summary_max_drawdown).rjust(drawdown_w)}  "
-                        f"{self._format_number(summary_profit_factor).rjust(profit_w)}  "
-                        f"{self._format_percent(summary_win_rate).rjust(winrate_w)}  "
-                        f"{self._format_percent(summary_net_profit).rjust(netprofit_w)}  "
-                        f"{self._format_number(summary_sharpe).rjust(sharpe_w)}  "
-                        f"{self._format_number(summary_sortino).rjust(sortino_w)}  "
+                        f"{str(int(summary['total_trades'])).rjust(trades_w)}  "
+                        f"{self._format_drawdown_percent(summary['max_drawdown']).rjust(drawdown_w)}  "
+                        f"{self._format_number(summary['profit_factor']).rjust(profit_w)}  "
+                        f"{self._format_percent(summary['win_rate']).rjust(winrate_w)}  "
+                        f"{self._format_percent(summary['net_profit_pct']).rjust(netprofit_w)}  "
+                        f"{self._format_number(summary['sharpe_ratio']).rjust(sharpe_w)}  "
+                        f"{self._format_number(summary['sortino_ratio']).rjust(sortino_w)}  "
                         f"{' '.ljust(tags_w)}"
                     )
                     lines.append(summary_line)
@@ -248,21 +513,9 @@ class ReportExporter:
             # Conditions section
             lines.append("Conditions")
             lines.append("-" * len("Conditions"))
-            if conditions:
-                # Custom sort: numeric names first (1, 2, 10, ...), then alpha groups (e.g., dca1, dca2, ...)
-                def _cond_sort_key(name: str):
-                    n = str(name).strip()
-                    if n.isdigit():
-                        return (0, int(n), "", -1)
-                    m = re.match(r'^([A-Za-z]+)(\d+)?$', n)
-                    if m:
-                        prefix = m.group(1)
-                        num = int(m.group(2)) if m.group(2) else -1
-                        return (1, prefix, num, -1)
-                    return (2, n, -1, -1)
-
+            if model.conditions:
                 # Prepare column widths
-                cond_items = sorted(conditions.items(), key=lambda kv: _cond_sort_key(kv[0]))
+                cond_items = model.conditions
                 cond_col_w = max(len("Condition"), max(len(str(k)) for k, _ in cond_items))
                 trig_col_w = max(len("Triggers"), max(len(str(v.get("Triggers time", ""))) for _, v in cond_items))
                 entry_trig_w = max(
@@ -338,40 +591,8 @@ class ReportExporter:
             # Positions section
             lines.append("Positions")
             lines.append("-" * len("Positions"))
-            if positions:
-                # Extract fields for table
-                pos_rows = []
-                for pos_key, info in positions.items():
-                    dt = pos_key.replace("Position ", "", 1)
-                    orders = info.get("orders", [])
-                    orders_count = len(orders)
-                    dd_value = info.get("Position max drawdown %", 0)
-                    
-                    # Get step conditions and sizes from ALL orders
-                    step_conditions = []
-                    size_percents = []
-                    trade_numbers = []
-                    
-                    for order in orders:
-                        signal = str(order.get("Signal", ""))
-                        step_condition, size_percent = self._decode_signal(signal)
-                        step_conditions.append(step_condition)
-                        size_percents.append(size_percent)
-                        
-                        # Collect trade numbers
-                        trade_num = order.get("Trade #", "")
-                        if trade_num:
-                            trade_numbers.append(str(trade_num))
-                    
-                    # Join with dashes
-                    step_str = " - ".join(step_conditions)
-                    size_str = " - ".join(size_percents)
-                    trade_str = " - ".join(trade_numbers)
-                    
-                    pos_rows.append((dt, orders_count, dd_value, step_str, size_str, trade_str))
-                
-                # Sort positions by drawdown percentage (worst first)
-                pos_rows.sort(key=lambda x: float(x[2]) if isinstance(x[2], (int, float)) else 0, reverse=False)
+            if model.positions:
+                pos_rows = model.positions
 
                 # Column widths
                 dt_w = max(len("Date/Time"), max(len(r[0]) for r in pos_rows))
@@ -394,253 +615,195 @@ class ReportExporter:
             lines.append("")
 
             content = "\n".join(lines)
-            with open(output_path, "w", encoding="utf-8") as f:
+            with atomic_write(output_path) as f:
                 f.write(content)
 
             return True, output_path
         except Exception as e:
             return False, str(e)
 
-    def export_excel(self, strategy_report: Dict[str, Any], file_name: str) -> Tuple[bool, str]:
+    def export_excel(self, strategy_report: Dict[str, Any], file_name: str, model: Optional[ReportModel] = None) -> Tuple[bool, str]:
         """
         Export analysis results to Excel report.
         
+        Rows are streamed from the report model into a write-only workbook,
+        so memory stays flat regardless of the number of positions.
+        
         Args:
             strategy_report: Analysis results dictionary
             file_name: Source Excel filename
+            model: Precomputed report model (built from strategy_report when None)
             
         Returns:
             Tuple of (success, output_path or error_message)
         """
         try:
-            # Save to cache
-            self.save_cache(strategy_report, file_name)
-            
             # Prepare output directory and filename
             reports_dir = get_data_directory("reports")
             ensure_directory(reports_dir)
             
             output_filename = os.path.splitext(file_name)[0] + ".xlsx"
             output_path = os.path.join(reports_dir, output_filename)
-            
-            # Handle both single report and multi-test report structures
-            if "global_test" in strategy_report and "single_test" in strategy_report:
-                # Multi-test structure
-                global_data = strategy_report["global_test"]
-                single_data = strategy_report["single_test"]
-                positions = global_data.get("positions", {}) or {}
-                conditions = global_data.get("conditions", {}) or {}
-                total_positions = global_data.get("totalPositions", len(positions))
-            else:
-                # Single report structure
-                positions = strategy_report.get("positions", {}) or {}
-                conditions = strategy_report.get("conditions", {}) or {}
-                total_positions = strategy_report.get("totalPositions", len(positions))
-                single_data = None
-
-            # Create Excel writer
-            with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-                
-                # Summary sheet
-                summary_data = {
-                    'Metric': ['Source Sheet', 'Total Positions'],
-                    'Value': [file_name, total_positions]
-                }
-                summary_df = pd.DataFrame(summary_data)
-                summary_df.to_excel(writer, sheet_name='Summary', index=False)
-                
-                # Single Test Performance sheet
-                if single_data and isinstance(single_data, dict):
-                    single_test_conditions = []
-                    for condition_key, condition_data in single_data.items():
-                        # Skip empty condition names
-                        if not condition_key or str(condition_key).strip() == "":
-                            continue
-                            
-                        if isinstance(condition_data, dict):
-                            single_test_conditions.append({
-                                'Condition': condition_key,
-                                'Total Trades': condition_data.get("Total trades", 0),
-                                'Max Drawdown %': condition_data.get("Max drawdown %", 0),
-                                'Profit Factor': condition_data.get("Profit factor", 0),
-                                'Win Rate %': condition_data.get("Percent profitable", 0),
-                                'Net Profit %': condition_data.get("Net profit %", 0),
-                                'Sharpe Ratio': condition_data.get("Sharpe ratio", 0),
-                                'Sortino Ratio': condition_data.get("Sortino ratio", 0),
-                                'Tags': ', '.join(condition_data.get("tags", [])) if condition_data.get("tags") else ''
-                            })
-                    
-                    if single_test_conditions:
-                        # Sort conditions numerically
-                        def _single_test_sort_key(item):
-                            condition = str(item["Condition"]).strip()
-                            if condition.isdigit():
-                                return (0, int(condition))
-                            return (1, condition)
-                        
-                        single_test_conditions.sort(key=_single_test_sort_key)
-                        
-                        # Calculate summary metrics
-                        total_trades_sum = sum(item['Total Trades'] for item in single_test_conditions)
-                        
-                        # Collect valid numeric values (skip NaN/None/empty strings)
-                        max_drawdown_values = []
-                        profit_factor_values = []
-                        win_rate_values = []
-                        net_profit_values = []
-                        sharpe_ratio_values = []
-                        sortino_ratio_values = []
-                        
-                        for item in single_test_conditions:
-                            # Max Drawdown (most negative/worst)
-                            if isinstance(item['Max Drawdown %'], (int, float)) and not (item['Max Drawdown %'] != item['Max Drawdown %']):
-                                max_drawdown_values.append(item['Max Drawdown %'])
-                            
-                            # Profit Factor (average)
-                            if isinstance(item['Profit Factor'], (int, float)) and not (item['Profit Factor'] != item['Profit Factor']):
-                                profit_factor_values.append(item['Profit Factor'])
-                            
-                            # Win Rate (average)
-                            if isinstance(item['Win Rate %'], (int, float)) and not (item['Win Rate %'] != item['Win Rate %']):
-                                win_rate_values.append(item['Win Rate %'])
-                            
-                            # Net Profit (sum)
-                            if isinstance(item['Net Profit %'], (int, float)) and not (item['Net Profit %'] != item['Net Profit %']):
-                                net_profit_values.append(item['Net Profit %'])
-                            
-                            # Sharpe Ratio (average)
-                            if isinstance(item['Sharpe Ratio'], (int, float)) and not (item['Sharpe Ratio'] != item['Sharpe Ratio']):
-                                sharpe_ratio_values.append(item['Sharpe Ratio'])
-                            
-                            # Sortino Ratio (average)
-                            if isinstance(item['Sortino Ratio'], (int, float)) and not (item['Sortino Ratio'] != item['Sortino Ratio']):
-                                sortino_ratio_values.append(item['Sortino Ratio'])
-                        
-                        # Calculate summary values
-                        summary_max_drawdown = min(max_drawdown_values) if max_drawdown_values else 0
-                        summary_profit_factor = sum(profit_factor_values) / len(profit_factor_values) if profit_factor_values else 0
-                        summary_win_rate = sum(win_rate_values) / len(win_rate_values) if win_rate_values else 0
-                        summary_net_profit = sum(net_profit_values) if net_profit_values else 0
-                        summary_sharpe = sum(sharpe_ratio_values) / len(sharpe_ratio_values) if sharpe_ratio_values else 0
-                        summary_sortino = sum(sortino_ratio_values) / len(sortino_ratio_values) if sortino_ratio_values else 0
-                        
-                        # Add summary row
-                        summary_row = {
-                            'Condition': 'TOTAL',
-                            'Total Trades': total_trades_sum,
-                            'Max Drawdown %': summary_max_drawdown,
-                            'Profit Factor': summary_profit_factor,
-                            'Win Rate %': summary_win_rate,
-                            'Net Profit %': summary_net_profit,
-                            'Sharpe Ratio': summary_sharpe,
-                            'Sortino Ratio': summary_sortino,
-                            'Tags': ''
-                        }
-                        single_test_conditions.append(summary_row)
-                        
-                        single_df = pd.DataFrame(single_test_conditions)
-                        single_df.to_excel(writer, sheet_name='Single Test Performance', index=False)
-                
-                # Conditions sheet
-                if conditions:
-                    conditions_data = []
-                    for key, stats in conditions.items():
-                        conditions_data.append({
-                            'Condition': key,
-                            'Triggers': stats.get("Triggers time", 0),
-                            'Entry Triggers': stats.get("Entry Triggers time", 0),
-                            'DCA Triggers': stats.get("DCA Triggers time", 0),
-                            'Entry Trigger MDD %': stats.get("Entry Trigger Max drawdown %", 0),
-                            'DCA Trigger MDD %': stats.get("DCA Trigger Max drawdown %", 0),
-                            'Max Drawdown %': stats.get("Max drawdown %", 0),
-                            'Win Rate (%)': stats.get("Win rate (%)", 0)
-                        })
-                    
-                    # Sort conditions
-                    def _cond_sort_key(item):
-                        name = str(item['Condition']).strip()
-                        if name.isdigit():
-                            return (0, int(name), "", -1)
-                        m = re.match(r'^([A-Za-z]+)(\d+)?$', name)
-                        if m:
-                            prefix = m.group(1)
-                            num = int(m.group(2)) if m.group(2) else -1
-                            return (1, prefix, num, -1)
-                        return (2, name, -1, -1)
-                    
-                    conditions_data.sort(key=_cond_sort_key)
-                    conditions_df = pd.DataFrame(conditions_data)
-                    conditions_df.to_excel(writer, sheet_name='Conditions', index=False)
-                
-                # Positions sheet
-                if positions:
-                    positions_data = []
-                    for pos_key, info in positions.items():
-                        dt = pos_key.replace("Position ", "", 1)
-                        orders = info.get("orders", [])
-                        orders_count = len(orders)
-                        dd_value = info.get("Position max drawdown %", 0)
-                        
-                        # Get step conditions and sizes from ALL orders
-                        step_conditions = []
-                        size_percents = []
-                        trade_numbers = []
-                        
-                        for order in orders:
-                            signal = str(order.get("Signal", ""))
-                            step_condition, size_percent = self._decode_signal(signal)
-                            step_conditions.append(step_condition)
-                            size_percents.append(size_percent)
-                            
-                            # Collect trade numbers
-                            trade_num = order.get("Trade #", "")
-                            if trade_num:
-                                trade_numbers.append(str(trade_num))
-                        
-                        # Join with dashes
-                        step_str = " - ".join(step_conditions)
-                        size_str = " - ".join(size_percents)
-                        trade_str = " - ".join(trade_numbers)
-                        
-                        positions_data.append({
-                            'Date/Time': dt,
-                            'Orders': orders_count,
-                            'DD %': dd_value,
-                            'Step': step_str,
-                            'Size %': size_str,
-                            'Trade #': trade_str
-                        })
-                    
-                    # Sort positions by drawdown percentage (worst first)
-                    positions_data.sort(key=lambda x: float(x['DD %']) if isinstance(x['DD %'], (int, float)) else 0, reverse=False)
-                    positions_df = pd.DataFrame(positions_data)
-                    positions_df.to_excel(writer, sheet_name='Positions', index=False)
-                
-                # Performance Metrics sheet (if available)
-                performance_metrics = {}
-                for key, value in strategy_report.items():
-                    if key not in ['orders', 'positions', 'totalPositions', 'conditions', 'Max drawdown %', 'Net profit %']:
-                        if isinstance(value, (int, float)) or (isinstance(value, str) and value.replace('.', '').replace('-', '').isdigit()):
-                            try:
-                                performance_metrics[key] = float(value)
-                            except:
-                                performance_metrics[key] = value
-                
-                if performance_metrics:
-                    perf_df = pd.DataFrame(list(performance_metrics.items()), columns=['Metric', 'Value'])
-                    perf_df.to_excel(writer, sheet_name='Performance Metrics', index=False)
+            if model is None:
+                model = self.build_report_model(strategy_report, file_name)
 
+            workbook = Workbook(write_only=True)
+            
+            # Summary sheet
+            self._write_sheet(workbook, 'Summary', ['Metric', 'Value'], [
+                ('Source Sheet', file_name),
+                ('Total Positions', model.total_positions),
+            ])
+            
+            # Single Test Performance sheet
+            if model.single_rows:
+                summary = model.single_summary
+                rows = (
+                    (
+                        item["condition"],
+                        item["total_trades"],
+                        item["max_drawdown"],
+                        item["profit_factor"],
+                        item["win_rate"],
+                        item["net_profit_pct"],
+                        item["sharpe_ratio"],
+                        item["sortino_ratio"],
+                        ', '.join(item["tags"]) if item["tags"] else '',
+                    )
+                    for item in model.single_rows + [dict(summary, condition='TOTAL', tags=[])]
+                )
+                self._write_sheet(workbook, 'Single Test Performance', [
+                    'Condition', 'Total Trades', 'Max Drawdown %', 'Profit Factor', 'Win Rate %',
+                    'Net Profit %', 'Sharpe Ratio', 'Sortino Ratio', 'Tags',
+                ], rows)
+            
+            # Conditions sheet
+            if model.conditions:
+                rows = (
+                    (
+                        key,
+                        stats.get("Triggers time", 0),
+                        stats.get("Entry Triggers time", 0),
+                        stats.get("DCA Triggers time", 0),
+                        stats.get("Entry Trigger Max drawdown %", 0),
+                        stats.get("DCA Trigger Max drawdown %", 0),
+                        stats.get("Max drawdown %", 0),
+                        stats.get("Win rate (%)", 0),
+                    )
+                    for key, stats in model.conditions
+                )
+                self._write_sheet(workbook, 'Conditions', [
+                    'Condition', 'Triggers', 'Entry Triggers', 'DCA Triggers', 'Entry Trigger MDD %',
+                    'DCA Trigger MDD %', 'Max Drawdown %', 'Win Rate (%)',
+                ], rows)
+            
+            # Positions sheet
+            if model.positions:
+                self._write_sheet(workbook, 'Positions', ['Date/Time', 'Orders', 'DD %', 'Step', 'Size %', 'Trade #'], model.positions)
+            
+            # Performance Metrics sheet (if available)
+            if model.performance_metrics:
+                self._write_sheet(workbook, 'Performance Metrics', ['Metric', 'Value'], model.performance_metrics.items())
+            
+            with atomic_write(output_path, "wb") as f:
+                workbook.save(f)
             return True, output_path
         except Exception as e:
             return False, str(e)
 
-    def exports(self, results: Dict[str, Any], filename: str):
+    def _write_sheet(self, workbook: Workbook, title: str, columns: List[str], rows: Iterable[Sequence[Any]]):
+        """Append a sheet with a pandas-style header row and stream its rows."""
+        sheet = workbook.create_sheet(title)
+        header = []
+        for name in columns:
+            cell = WriteOnlyCell(sheet, value=name)
+            cell.font = EXCEL_HEADER_FONT
+            cell.border = EXCEL_HEADER_BORDER
+            cell.alignment = EXCEL_HEADER_ALIGNMENT
+            header.append(cell)
+        sheet.append(header)
+        for row in rows:
+            sheet.append([_excel_value(value) for value in row])
+
+    def render_reports(self, results: Dict[str, Any], filename: str):
+        """
+        Render the TXT and Excel reports in parallel from one report model.
+        
+        Args:
+            results: Analysis results dictionary
+            filename: Original Excel filename
+        """
+        model = self.build_report_model(results, filename)
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            txt_future = pool.submit(self.export_txt, results, filename, model)
+            excel_future = pool.submit(self.export_excel, results, filename, model)
+            txt_success, txt_path = txt_future.result()
+            excel_success, excel_path = excel_future.result()
+        
+        if txt_success:
+            print(f"📄 TXT report saved to: {txt_path}")
+        else:
+            print(f"❌ TXT report export failed: {txt_path}")
+        
+        if excel_success:
+            print(f"📊 Excel report saved to: {excel_path}")
+        else:
+            print(f"❌ Excel report export failed: {excel_path}")
+    
+    def flush_reports(self) -> bool:
+        """
+        Record queued results and render reports queued by intermediate ``exports`` calls, if any.
+        
+        Returns:
+            True if reports were rendered
+        """
+        self.record_results()
+        return self._renderer.flush()
+    
+    def record_results(self):
+        """
+        Write queued reports to the RESULTS_DB database, one transaction per strategy.
+        
+        All reports written by this exporter for a sheet belong to one run.
+        """
+        pending, self._pending_results = self._pending_results, []
+        path = self.config.get("RESULTS_DB")
+        if not pending or not path:
+            return
+        try:
+            db = ResultsDB(path)
+            digest = None
+            by_sheet: Dict[str, List[Tuple[Optional[str], Any]]] = {}
+            for sheet, condition, report in pending:
+                by_sheet.setdefault(sheet, []).append((condition, report))
+            for sheet, reports in by_sheet.items():
+                strategy = self.strategy or sheet
+                if self.code and digest is None:
+                    digest = db.record_candidate(strategy, self.code)
+                self._run_ids[sheet] = db.record_run(
+                    strategy, reports, code_hash=digest, run_id=self._run_ids.get(sheet),
+                    worker=sheet if sheet != strategy else None,
+                )
+            print(f"🗃️  Recorded {len(pending)} result(s) to: {path}")
+        except Exception as e:
+            print(f"❌ Results DB write failed: {e}")
+
+    def exports(self, results: Dict[str, Any], filename: str, condition: Optional[str] = None, record: bool = True):
         """
-        Export analysis results to report files (TXT and Excel).
+        Cache analysis results and export them to report files (TXT and Excel).
+        
+        A final update (no condition) renders immediately. Intermediate
+        updates for a finished condition only touch the cache; their reports
+        are coalesced and rendered by ``flush_reports``, or in the background
+        at most every RENDER_INTERVAL_SECONDS when that is set.
         
         Args:
             results: Analysis results dictionary
             filename: Original Excel filename
+            condition: Single test condition just finished; only its report is
+                appended to the cache journal instead of rewriting the cache
+            record: Queue the new report (global test, or the finished
+                condition) for the RESULTS_DB database
         """
         print(f"🔄 Merging with cached data for: {filename}")
         cached_data = self.load_cache(filename)
@@ -653,19 +816,20 @@ class ReportExporter:
         else:
             print(f"⚠️  No cache found, using fresh data")
         
-        # Export to TXT format
-        txt_success, txt_path = self.export_txt(results, filename)
-        if txt_success:
-            print(f"📄 TXT report saved to: {txt_path}")
-        else:
-            print(f"❌ TXT report export failed: {txt_path}")
-        
-        # Export to Excel format
-        excel_success, excel_path = self.export_excel(results, filename)
-        if excel_success:
-            print(f"📊 Excel report saved to: {excel_path}")
+        sheet = os.path.splitext(filename)[0]
+        if condition is None:
+            if record:
+                self._pending_results.append((sheet, None, results.get("global_test", results)))
+            self.save_cache(results, filename)
+            self.record_results()
+            self._renderer.discard()
+            self.render_reports(results, filename)
         else:
-            print(f"❌ Excel report export failed: {excel_path}")
+            condition_report = results.get("single_test", {}).get(condition, "")
+            if record:
+                self._pending_results.append((sheet, condition, condition_report))
+            self.save_condition(condition_report, filename, condition)
+            self._renderer.submit(results, filename)
     
     def _merge_with_cache(self, new_results: Dict[str, Any], cached_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -750,27 +914,7 @@ class ReportExporter:
         except Exception:
             return str(value)
 
-    def _format_size_equity(self, value: float) -> str:
-        """Format size equity as percentage string."""
-        try:
-            pct = float(value) * 100.0
-            if abs(pct - round(pct)) < 1e-9:
-                return str(int(round(pct)))
-            # Trim trailing zeros
-            s = f"{pct:.2f}"
-            return s.rstrip('0').rstrip('.')
-        except Exception:
-            return str(value)
-
-    def _decode_signal(self, signal: str) -> Tuple[str, str]:
-        """Decode signal into condition and size components."""
-        try:
-            data = encode_signals(signal)
-            step_condition = str(data.get("conditions", "")).strip()
-            size_equity = data.get("sizeEquity", "")
-            size_str = ""
-            if size_equity != "":
-                size_str = self._format_size_equity(size_equity)
-            return step_condition, size_str
-        except Exception:
-            return signal.strip(), ""
+    def _decode_order_signal(self, order: Dict[str, Any]) -> Tuple[str, str]:
+        """Decode an order's signal, reusing its table's parse for columnar orders."""
+        parsed = order.signal() if isinstance(order, OrderRow) else SIGNAL_PARSER.parse(order.get("Signal", ""))
+        return parsed.conditions, parsed.size_text
@@ -0,0 +1,122 @@
+"""
+Coalescing background rendering of TXT/XLSX reports.
+"""
+
+import threading
+import time
+from typing import Dict, Any, Callable, Optional, Tuple
+
+
+def snapshot(results: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Shallow copy of a results dictionary safe to render while the caller keeps adding conditions.
+
+    Reports themselves are not modified after analysis, so only the top-level
+    and ``single_test`` dictionaries are copied.
+    """
+    copied = dict(results)
+    if isinstance(copied.get("single_test"), dict):
+        copied["single_test"] = dict(copied["single_test"])
+    return copied
+
+
+class CoalescingRenderer:
+    """
+    Renders only the latest submitted results, at most once per interval.
+
+    Intermediate submissions replace each other. With an interval the latest
+    one is rendered on a daemon worker thread no more than every ``interval``
+    seconds; without one nothing is rendered until ``flush``. ``flush`` and
+    ``discard`` stop the worker thread; the next submission starts a new one.
+    """
+
+    def __init__(self, render: Callable[[Dict[str, Any], str], Any], interval: Optional[float] = None):
+        """
+        Initialize renderer.
+
+        Args:
+            render: Function rendering (results, filename)
+            interval: Minimum seconds between background renders; None or 0
+                renders on flush only
+        """
+        self._render = render
+        self.interval = interval
+        self._cond = threading.Condition()
+        self._pending: Optional[Tuple[Dict[str, Any], str]] = None
+        self._rendering = False
+        self._last = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self._stop = False
+        self.renders = 0
+
+    @property
+    def pending(self) -> bool:
+        with self._cond:
+            return self._pending is not None
+
+    def submit(self, results: Dict[str, Any], filename: str):
+        """Queue results for rendering, replacing any not yet rendered."""
+        with self._cond:
+            self._pending = (snapshot(results), filename)
+            self._stop = False
+            if self.interval and self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="report-renderer", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def discard(self):
+        """Drop queued results and wait for an in-flight render to finish."""
+        with self._cond:
+            self._pending = None
+            self._stop = True
+            self._cond.notify_all()
+            while self._rendering:
+                self._cond.wait()
+
+    def flush(self) -> bool:
+        """
+        Render queued results now, on the calling thread.
+
+        Returns:
+            True if anything was rendered
+        """
+        with self._cond:
+            while self._rendering:
+                self._cond.wait()
+            job, self._pending = self._pending, None
+            self._stop = True
+            self._cond.notify_all()
+            if job is None:
+                return False
+            self._rendering = True
+        self._execute(job)
+        return True
+
+    def _execute(self, job: Tuple[Dict[str, Any], str]):
+        try:
+            self._render(*job)
+        finally:
+            with self._cond:
+                self._rendering = False
+                self._last = time.monotonic()
+                self.renders += 1
+                self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None or self._rendering:
+                    if self._stop and not self._rendering:
+                        self._thread = None
+                        return
+                    self._cond.wait()
+                wait = self._last + self.interval - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                job, self._pending = self._pending, None
+                self._rendering = True
+            try:
+                self._execute(job)
+            except Exception as e:
+                print(f"❌ Background report render failed: {e}")
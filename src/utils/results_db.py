@@ -0,0 +1,325 @@
+"""
+SQLite store of backtest results across runs.
+
+Tables: ``candidates`` (strategy code by hash), ``runs`` (one per exporter
+session or optimizer iteration), ``condition_metrics`` (headline metrics of
+the global test and each single test condition, plus all scalar metrics as
+JSON) and ``tags``. Writes are grouped into one transaction per call.
+"""
+
+import hashlib
+import json
+import math
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+GLOBAL_CONDITION = "global"
+
+# Indexed metric columns and the report keys they are read from
+METRIC_COLUMNS = {
+    "net_profit": "Net profit %",
+    "max_drawdown": "Max drawdown %",
+    "total_trades": "Total trades",
+    "percent_profitable": "Percent profitable",
+    "profit_factor": "Profit factor",
+    "sharpe_ratio": "Sharpe ratio",
+    "sortino_ratio": "Sortino ratio",
+}
+
+# Query sort keys -> (column, descending); drawdowns are negative, so the best is the largest
+ORDERS = {
+    "mdd": ("max_drawdown", True),
+    "profit": ("net_profit", True),
+    "trades": ("total_trades", True),
+    "win-rate": ("percent_profitable", True),
+    "recent": ("created_at", True),
+}
+
+# A condition that never traded has no drawdown; it ranks with the unknowns, not first
+NO_TRADES = "m.total_trades IS 0"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidates (
+    code_hash TEXT PRIMARY KEY,
+    strategy TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    verdict TEXT,
+    assistant TEXT,
+    code TEXT
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    strategy TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    source TEXT NOT NULL,
+    code_hash TEXT REFERENCES candidates(code_hash),
+    worker TEXT
+);
+CREATE TABLE IF NOT EXISTS condition_metrics (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    condition TEXT NOT NULL,
+    net_profit REAL,
+    max_drawdown REAL,
+    total_trades REAL,
+    percent_profitable REAL,
+    profit_factor REAL,
+    sharpe_ratio REAL,
+    sortino_ratio REAL,
+    metrics TEXT NOT NULL,
+    PRIMARY KEY (run_id, condition)
+);
+CREATE TABLE IF NOT EXISTS tags (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    condition TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (run_id, condition, tag)
+);
+CREATE INDEX IF NOT EXISTS runs_strategy ON runs (strategy, created_at);
+CREATE INDEX IF NOT EXISTS runs_code ON runs (code_hash);
+CREATE INDEX IF NOT EXISTS metrics_drawdown ON condition_metrics (condition, max_drawdown);
+CREATE INDEX IF NOT EXISTS metrics_profit ON condition_metrics (condition, net_profit);
+CREATE INDEX IF NOT EXISTS tags_tag ON tags (tag, condition);
+"""
+
+
+def code_hash(code: str) -> str:
+    """Content hash identifying a strategy candidate."""
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()[:16]
+
+
+def parse_since(value: Optional[str], now: Optional[datetime] = None) -> Optional[str]:
+    """
+    Turn "7d" / "12h" or an ISO date into an ISO timestamp lower bound.
+
+    Args:
+        value: Relative age or ISO date/time
+        now: Reference time (current time when None)
+
+    Returns:
+        ISO timestamp, or None when value is empty
+
+    Raises:
+        ValueError: If value is neither form
+    """
+    if not value:
+        return None
+    now = now or datetime.now()
+    units = {"d": "days", "h": "hours", "w": "weeks"}
+    if value[-1:] in units and value[:-1].isdigit():
+        return (now - timedelta(**{units[value[-1]]: int(value[:-1])})).isoformat(timespec="seconds")
+    return datetime.fromisoformat(value).isoformat(timespec="seconds")
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(number) else number
+
+
+def _scalars(report: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON-safe scalar metrics of a report (no orders, positions or conditions)."""
+    return {
+        k: v for k, v in report.items()
+        if isinstance(v, (str, int, float, bool, type(None))) and not (isinstance(v, float) and math.isnan(v))
+    }
+
+
+class ResultsDB:
+    """Results database at a file path (created on first use)."""
+
+    def __init__(self, path: str):
+        """
+        Initialize database.
+
+        Args:
+            path: SQLite file path
+        """
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            # Databases created before runs kept the optimizer worker
+            if "worker" not in {row["name"] for row in conn.execute("PRAGMA table_info(runs)")}:
+                conn.execute("ALTER TABLE runs ADD COLUMN worker TEXT")
+
+    @contextmanager
+    def _connect(self):
+        """Connection whose statements commit together (or roll back) and which is closed afterwards."""
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def record_candidate(self, strategy: str, code: str, assistant: str = "", verdict: Optional[str] = None) -> str:
+        """
+        Store a strategy candidate (later non-empty verdict / assistant text win).
+
+        Args:
+            strategy: Strategy / process name
+            code: Pine Script source
+            assistant: Model output that produced the code
+            verdict: e.g. "potential" or "another"
+
+        Returns:
+            Code hash
+        """
+        digest = code_hash(code)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO candidates (code_hash, strategy, created_at, verdict, assistant, code) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(code_hash) DO UPDATE SET verdict = coalesce(excluded.verdict, verdict), "
+                "assistant = CASE WHEN excluded.assistant != '' THEN excluded.assistant ELSE assistant END",
+                (digest, strategy, datetime.now().isoformat(timespec="seconds"), verdict, assistant, code),
+            )
+        return digest
+
+    def record_run(
+        self,
+        strategy: str,
+        reports: Iterable[Tuple[Optional[str], Any]],
+        source: str = "backtest",
+        code_hash: Optional[str] = None,
+        run_id: Optional[int] = None,
+        created_at: Optional[str] = None,
+        worker: Optional[str] = None,
+    ) -> int:
+        """
+        Store condition reports of one run in a single transaction.
+
+        Args:
+            strategy: Strategy name (STRATEGY_NAME)
+            reports: (condition, report) pairs; condition None is the global test.
+                Failed tests ("") are skipped
+            source: Writer, e.g. "backtest", "optimize" or "import"
+            code_hash: Candidate the run tested
+            run_id: Existing run to add reports to (new run when None)
+            created_at: Run timestamp (now when None)
+            worker: Optimizer process (e.g. "pc_0") that produced the run
+
+        Returns:
+            Run id
+        """
+        metric_rows = []
+        tag_rows = []
+        for condition, report in reports:
+            if not isinstance(report, dict):
+                continue
+            condition = GLOBAL_CONDITION if condition is None else str(condition)
+            metric_rows.append((condition, *(_number(report.get(key)) for key in METRIC_COLUMNS.values()),
+                                json.dumps(_scalars(report))))
+            tag_rows.extend((condition, tag) for tag in report.get("tags") or [])
+
+        with self._connect() as conn:
+            if run_id is None:
+                run_id = conn.execute(
+                    "INSERT INTO runs (strategy, created_at, source, code_hash, worker) VALUES (?, ?, ?, ?, ?)",
+                    (strategy, created_at or datetime.now().isoformat(timespec="seconds"), source, code_hash, worker),
+                ).lastrowid
+            conn.executemany(
+                f"INSERT OR REPLACE INTO condition_metrics (run_id, condition, {', '.join(METRIC_COLUMNS)}, metrics) "
+                f"VALUES ({', '.join('?' * (len(METRIC_COLUMNS) + 3))})",
+                [(run_id, *row) for row in metric_rows],
+            )
+            conn.executemany(
+                "DELETE FROM tags WHERE run_id = ? AND condition = ?",
+                {(run_id, condition) for condition, *_ in metric_rows},
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO tags (run_id, condition, tag) VALUES (?, ?, ?)",
+                [(run_id, condition, tag) for condition, tag in tag_rows],
+            )
+        return run_id
+
+    def import_cache(self, strategy: str, cache: Dict[str, Any], created_at: Optional[str] = None) -> int:
+        """
+        Store every report of a cache file as one run (source "import").
+
+        Args:
+            strategy: Strategy name (cache file stem)
+            cache: Loaded cache dictionary
+            created_at: Run timestamp (e.g. the cache file's modification time)
+
+        Returns:
+            Run id
+        """
+        reports = [(None, cache.get("global_test"))]
+        reports.extend((cond, report) for cond, report in (cache.get("single_test") or {}).items() if str(cond).strip())
+        return self.record_run(strategy, reports, source="import", created_at=created_at)
+
+    def query(
+        self,
+        strategy: Optional[str] = None,
+        condition: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        tag: Optional[str] = None,
+        source: Optional[str] = None,
+        order: str = "mdd",
+        limit: Optional[int] = 20,
+    ) -> List[Dict[str, Any]]:
+        """
+        Best condition results matching the filters.
+
+        Args:
+            strategy: Strategy name (STRATEGY_NAME)
+            condition: Condition id ("global" for the global test)
+            since: ISO lower bound on run time (inclusive)
+            until: ISO upper bound on run time (exclusive)
+            tag: Only results carrying this tag
+            source: Only runs from this writer
+            order: Sort key, one of ORDERS
+            limit: Maximum rows (all when None)
+
+        Returns:
+            Row dictionaries with run, condition, metric and tag fields
+
+        Raises:
+            ValueError: If order is unknown
+        """
+        if order not in ORDERS:
+            raise ValueError(f"Unknown order: {order} (expected one of {', '.join(ORDERS)})")
+        column, descending = ORDERS[order]
+        unranked = f"{column} IS NULL" + (f" OR {NO_TRADES}" if column == "max_drawdown" else "")
+        filters, params = [], []
+        for clause, value in (
+            ("r.strategy = ?", strategy),
+            ("m.condition = ?", condition),
+            ("r.created_at >= ?", since),
+            ("r.created_at < ?", until),
+            ("r.source = ?", source),
+            ("EXISTS (SELECT 1 FROM tags t WHERE t.run_id = m.run_id AND t.condition = m.condition AND t.tag = ?)", tag),
+        ):
+            if value is not None:
+                filters.append(clause)
+                params.append(value)
+        sql = (
+            f"SELECT r.id AS run_id, r.strategy, r.worker, r.created_at, r.source, r.code_hash, m.condition, "
+            f"{', '.join('m.' + c for c in METRIC_COLUMNS)}, "
+            f"(SELECT group_concat(tag, ', ') FROM tags t WHERE t.run_id = m.run_id AND t.condition = m.condition) AS tags "
+            f"FROM condition_metrics m JOIN runs r ON r.id = m.run_id"
+            + (f" WHERE {' AND '.join(filters)}" if filters else "")
+            + f" ORDER BY {unranked}, {column} {'DESC' if descending else 'ASC'}, r.created_at DESC"
+        )
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute(sql, params)]
+
+    def metrics(self, run_id: int, condition: str) -> Optional[Dict[str, Any]]:
+        """All stored scalar metrics of one condition result."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT metrics FROM condition_metrics WHERE run_id = ? AND condition = ?", (run_id, condition)
+            ).fetchone()
+        return json.loads(row["metrics"]) if row else None
@@ -0,0 +1,163 @@
+"""
+Content-addressed archive of downloaded strategy sheets.
+
+Every downloaded workbook is stored once under the SHA-256 of its bytes in
+``<archive>/objects/<aa>/<digest>.xz``. TradingView workbooks are
+deterministic zip files whose members compress poorly one by one, so the
+members are stored uncompressed in a single msgpack list and the list is
+compressed with LZMA (about 3.5x smaller than the .xlsx). ``manifest.jsonl``
+links each download to its strategy, worker, condition, code hash and
+time.
+"""
+
+import hashlib
+import io
+import json
+import lzma
+import os
+import zipfile
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+import msgpack
+
+from .file_operations import atomic_write, file_lock
+
+MANIFEST_FILE = "manifest.jsonl"
+OBJECT_SUFFIX = ".xz"
+
+
+def pack_workbook(data: bytes) -> bytes:
+    """LZMA-compressed [[member name, member bytes], ...] of an .xlsx file."""
+    with zipfile.ZipFile(io.BytesIO(data)) as workbook:
+        members = [[info.filename, workbook.read(info)] for info in workbook.infolist()]
+    return lzma.compress(msgpack.packb(members, use_bin_type=True))
+
+
+def unpack_workbook(blob: bytes) -> bytes:
+    """Rebuild an .xlsx file (same members and order, deflated) from pack_workbook output."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as workbook:
+        for name, data in msgpack.unpackb(lzma.decompress(blob), raw=False):
+            workbook.writestr(zipfile.ZipInfo(name), data, zipfile.ZIP_DEFLATED)
+    return buffer.getvalue()
+
+
+class SheetArchive:
+    """Sheet archive rooted at a directory (created on first store)."""
+
+    def __init__(self, directory: str):
+        """
+        Initialize archive.
+
+        Args:
+            directory: Archive root, e.g. "data/archive"
+        """
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, MANIFEST_FILE)
+
+    def object_path(self, digest: str) -> str:
+        """Stored object of a workbook digest."""
+        return os.path.join(self.directory, "objects", digest[:2], digest + OBJECT_SUFFIX)
+
+    def store(
+        self,
+        sheet_path: str,
+        strategy: str,
+        condition: Optional[str] = None,
+        code_hash: Optional[str] = None,
+        created_at: Optional[str] = None,
+        worker: Optional[str] = None,
+    ) -> str:
+        """
+        Archive a downloaded workbook and record it in the manifest.
+
+        Args:
+            sheet_path: Downloaded .xlsx path
+            strategy: Strategy name (STRATEGY_NAME)
+            condition: Single test condition; global test when None
+            code_hash: Hash of the strategy code that produced the sheet
+            created_at: ISO timestamp (now when None)
+            worker: Optimizer process (e.g. "pc_0") that downloaded the sheet
+
+        Returns:
+            Workbook digest
+        """
+        with open(sheet_path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        object_path = self.object_path(digest)
+        # Identical downloads share one object
+        if not os.path.exists(object_path):
+            with atomic_write(object_path, "wb") as f:
+                f.write(pack_workbook(data))
+
+        entry = {
+            "digest": digest,
+            "strategy": strategy,
+            "worker": worker,
+            "condition": None if condition is None else str(condition),
+            "code_hash": code_hash,
+            "created_at": created_at or datetime.now().isoformat(timespec="seconds"),
+            "size": len(data),
+        }
+        line = json.dumps(entry) + "\n"
+        with file_lock(self.manifest_path):
+            fd = os.open(self.manifest_path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                size = os.fstat(fd).st_size
+                # Terminate a torn line left by an interrupted append so this entry stays readable
+                if size and os.pread(fd, 1, size - 1) != b"\n":
+                    line = "\n" + line
+                os.write(fd, line.encode("utf-8"))
+            finally:
+                os.close(fd)
+        return digest
+
+    def entries(self, strategy: Optional[str] = None, condition: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Manifest entries in archive order.
+
+        Args:
+            strategy: Only this strategy
+            condition: Only this condition ("global" for global tests)
+
+        Returns:
+            Entry dictionaries (digest, strategy, condition, code_hash, created_at, size)
+        """
+        if not os.path.exists(self.manifest_path):
+            return []
+        entries = []
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Torn line of an interrupted append
+                if strategy is not None and entry["strategy"] != strategy:
+                    continue
+                if condition is not None and (entry["condition"] or "global") != condition:
+                    continue
+                entries.append(entry)
+        return entries
+
+    def read(self, digest: str) -> bytes:
+        """Workbook bytes of an archived digest."""
+        with open(self.object_path(digest), "rb") as f:
+            return unpack_workbook(f.read())
+
+    def extract(self, digest: str, path: str) -> str:
+        """
+        Write an archived workbook to a path.
+
+        Args:
+            digest: Workbook digest
+            path: Destination .xlsx path
+
+        Returns:
+            The destination path
+        """
+        data = self.read(digest)
+        with atomic_write(path, "wb") as f:
+            f.write(data)
+        return path
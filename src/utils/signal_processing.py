@@ -2,7 +2,11 @@
 Signal encoding and decoding utilities.
 """
 
-from typing import Dict, Any
+import sys
+from typing import Dict, Any, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
 
 
 def encode_signals(signal: str) -> Dict[str, Any]:
@@ -59,3 +63,153 @@ def decode_signal(signal: str) -> tuple[str, str]:
         return conditions, size_str
     except Exception:
         return signal.strip(), ""
+
+
+def format_size_percent(value: Any) -> str:
+    """Format a sizeEquity fraction as a percentage string (0.25 -> "25")."""
+    try:
+        pct = float(value) * 100.0
+        if abs(pct - round(pct)) < 1e-9:
+            return str(int(round(pct)))
+        # Trim trailing zeros
+        s = f"{pct:.2f}"
+        return s.rstrip('0').rstrip('.')
+    except Exception:
+        return str(value)
+
+
+class ParsedSignal(NamedTuple):
+    """One decoded signal; strings and id tuples are interned and shared."""
+
+    head: str
+    conditions: str
+    condition_ids: Tuple[str, ...]
+    limit: float
+    size_equity: float
+    size_text: str
+
+
+class SignalColumn:
+    """Decoded Signal column: per-row codes into distinct parsed signals."""
+
+    def __init__(self, codes: np.ndarray, distinct: List[ParsedSignal]):
+        """
+        Initialize column.
+
+        Args:
+            codes: Row -> index into ``distinct``
+            distinct: Parsed distinct signals
+        """
+        self.codes = codes
+        self.distinct = distinct
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, row: int) -> ParsedSignal:
+        return self.distinct[self.codes[row]]
+
+    def _field(self, name: str, dtype: Any) -> np.ndarray:
+        return np.array([getattr(p, name) for p in self.distinct], dtype=dtype)[self.codes]
+
+    @property
+    def limit(self) -> np.ndarray:
+        """Limit price per row (0.0 when empty)."""
+        return self._field("limit", float)
+
+    @property
+    def size_equity(self) -> np.ndarray:
+        """sizeEquity fraction per row (0.0 when empty)."""
+        return self._field("size_equity", float)
+
+    @property
+    def condition_ids(self) -> List[Tuple[str, ...]]:
+        """Condition id tuple per row (shared tuple objects)."""
+        ids = [p.condition_ids for p in self.distinct]
+        return [ids[c] for c in self.codes.tolist()]
+
+
+class SignalParser:
+    """
+    Batch signal parser with interning and memoization.
+
+    Each distinct signal string is decoded once; the condition part
+    (e.g. " 4 ") is memoized separately, so "4 | 58182.8 | 0.2" and
+    "4 | 63151.0 | 0.2" share one interned id tuple.
+    """
+
+    def __init__(self, max_entries: int = 100000):
+        """
+        Initialize parser.
+
+        Args:
+            max_entries: Memo size; the memo is cleared when exceeded
+        """
+        self.max_entries = max_entries
+        self._signals: Dict[str, ParsedSignal] = {}
+        self._heads: Dict[str, Tuple[str, str, Tuple[str, ...]]] = {}
+
+    def _head(self, head: str) -> Tuple[str, str, Tuple[str, ...]]:
+        cached = self._heads.get(head)
+        if cached is None:
+            conditions = head.strip()
+            cached = (
+                sys.intern(head),
+                sys.intern(conditions),
+                tuple(sys.intern(t) for t in conditions.split()),
+            )
+            self._heads[head] = cached
+        return cached
+
+    def parse(self, signal: Any) -> ParsedSignal:
+        """
+        Decode one signal (memoized).
+
+        Args:
+            signal: Signal value from TradingView
+
+        Returns:
+            ParsedSignal; malformed numbers give the stripped signal as
+            conditions and empty size text, as the report exporter did
+        """
+        signal = str(signal)
+        parsed = self._signals.get(signal)
+        if parsed is not None:
+            return parsed
+        if len(self._signals) >= self.max_entries:
+            self._signals.clear()
+            self._heads.clear()
+
+        parts = signal.split(" | ")
+        head, conditions, ids = self._head(parts[0])
+        try:
+            if len(parts) < 3:
+                conditions = sys.intern(signal.strip())
+                limit, size_equity = 0.0, 0.0
+            else:
+                limit = float(parts[1]) if parts[1].strip() else 0.0
+                size_equity = float(parts[2]) if parts[2].strip() else 0.0
+            parsed = ParsedSignal(head, conditions, ids, limit, size_equity, format_size_percent(size_equity))
+        except ValueError:
+            parsed = ParsedSignal(head, sys.intern(signal.strip()), ids, float("nan"), float("nan"), "")
+        self._signals[signal] = parsed
+        return parsed
+
+    def parse_column(self, signals: Sequence[Any], codes: Optional[np.ndarray] = None) -> SignalColumn:
+        """
+        Decode a whole Signal column.
+
+        Args:
+            signals: Signal values per row, or distinct values when ``codes`` is given
+            codes: Row -> index into ``signals`` (e.g. OrderTable dictionary codes)
+
+        Returns:
+            SignalColumn
+        """
+        if codes is None:
+            codes, signals = pd.factorize(pd.Series(signals, dtype=object).astype(str))
+        return SignalColumn(np.asarray(codes), [self.parse(s) for s in signals])
+
+
+# Shared by analyzer, metrics and exporter so repeated signals are decoded once
+SIGNAL_PARSER = SignalParser()
@@ -0,0 +1,57 @@
+"""
+Microbenchmark: per-sheet ExcelReader calls vs single-pass workbook load.
+
+Usage:
+    python test/bench_excel_reader.py [repeats]
+"""
+
+import glob
+import os
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from utils.excel_reader import ExcelReader
+
+
+def read_per_sheet_legacy(file_path: str):
+    """Previous access pattern: open + list sheets + re-read path, once per sheet."""
+    result = []
+    for index in (3, 0, 1, 2):
+        sheet_names = pd.ExcelFile(file_path).sheet_names
+        df = pd.read_excel(file_path, sheet_name=sheet_names[index])
+        for col in df.select_dtypes(include=["datetime64[ns]"]).columns:
+            df[col] = df[col].astype(str)
+        result.append(df.to_dict(orient="records"))
+    return result
+
+
+def read_bulk(file_path: str):
+    return ExcelReader.read_workbook_as_json(file_path, [0, 1, 2, 3])
+
+
+def bench(fn, file_path: str, repeats: int) -> float:
+    fn(file_path)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(file_path)
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    files = sorted(glob.glob(str(ROOT / "data" / "sheets" / "*.xlsx")))
+    print(f"{'Sheet':<24}{'Per-sheet ms':>14}{'Bulk ms':>10}{'Speed-up':>10}")
+    for file_path in files:
+        legacy = bench(read_per_sheet_legacy, file_path, repeats)
+        bulk = bench(read_bulk, file_path, repeats)
+        print(f"{os.path.basename(file_path):<24}{legacy:>14.1f}{bulk:>10.1f}{legacy / bulk:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
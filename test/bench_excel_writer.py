@@ -0,0 +1,101 @@
+"""
+Benchmark: DataFrame + pd.ExcelWriter export vs streaming write-only export.
+
+Each (writer, positions) case runs in its own process so peak RSS is
+measured independently.
+
+Usage:
+    python test/bench_excel_writer.py [positions ...]    (default: 1000 10000 100000 1000000)
+"""
+
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from utils.report_exporter import ReportExporter, ReportModel
+
+
+def synthetic_model(positions: int) -> ReportModel:
+    """Report model with 28 single test conditions and the given number of positions."""
+    single_rows = [
+        {
+            "condition": str(i), "total_trades": 40 + i, "max_drawdown": -10.0 - i, "profit_factor": 1.5,
+            "win_rate": 62.5, "net_profit_pct": 12.25 * i, "sharpe_ratio": 0.8, "sortino_ratio": 1.9, "tags": ["NORMAL"],
+        }
+        for i in range(1, 29)
+    ]
+    summary = {k: single_rows[0][k] for k in single_rows[0] if k not in ("condition", "tags")}
+    conditions = [(str(i), {"Triggers time": 100 + i, "Entry Triggers time": 60, "DCA Triggers time": 40 + i,
+                            "Entry Trigger Max drawdown %": -8.5, "DCA Trigger Max drawdown %": -12.0,
+                            "Max drawdown %": -15.0, "Win rate (%)": 71.4}) for i in range(1, 29)]
+    rows = [
+        (f"2020-01-01 00:00 #{i}", 3, -(i % 997) / 10, "4 - dca1 - dca2", "20.00% - 25.00% - 25.00%",
+         f"{3 * i + 1} - {3 * i + 2} - {3 * i + 3}")
+        for i in range(positions)
+    ]
+    return ReportModel("bench.xlsx", positions, single_rows, summary, conditions, rows,
+                       {"Net profit": 1234.5, "Total trades": 3 * positions})
+
+
+def write_dataframes(model: ReportModel, output_path: str):
+    """Previous export: one DataFrame per sheet written through pd.ExcelWriter."""
+    with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
+        pd.DataFrame({"Metric": ["Source Sheet", "Total Positions"], "Value": [model.file_name, model.total_positions]}) \
+            .to_excel(writer, sheet_name="Summary", index=False)
+        single = [dict(r, tags=", ".join(r["tags"])) for r in model.single_rows]
+        single.append(dict(model.single_summary, condition="TOTAL", tags=""))
+        pd.DataFrame(single).to_excel(writer, sheet_name="Single Test Performance", index=False)
+        pd.DataFrame([dict(stats, Condition=key) for key, stats in model.conditions]) \
+            .to_excel(writer, sheet_name="Conditions", index=False)
+        pd.DataFrame([
+            {"Date/Time": r[0], "Orders": r[1], "DD %": r[2], "Step": r[3], "Size %": r[4], "Trade #": r[5]}
+            for r in model.positions
+        ]).to_excel(writer, sheet_name="Positions", index=False)
+        pd.DataFrame(list(model.performance_metrics.items()), columns=["Metric", "Value"]) \
+            .to_excel(writer, sheet_name="Performance Metrics", index=False)
+
+
+def run_case(writer: str, positions: int):
+    """Child process: build the model, write once, print seconds and RSS (MB)."""
+    model = synthetic_model(positions)
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        start = time.perf_counter()
+        if writer == "dataframe":
+            write_dataframes(model, os.path.join(tmp, "bench.xlsx"))
+        else:
+            success, message = ReportExporter().export_excel({}, "bench.xlsx", model)
+            assert success, message
+        elapsed = time.perf_counter() - start
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{elapsed:.3f} {base_rss:.1f} {peak_rss:.1f}")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--case":
+        run_case(sys.argv[2], int(sys.argv[3]))
+        return
+    sizes = [int(n) for n in sys.argv[1:]] or [1_000, 10_000, 100_000, 1_000_000]
+    print(f"{'Positions':>10}{'Writer':>11}{'Seconds':>10}{'Model MB':>10}{'Peak MB':>10}{'Write MB':>10}")
+    for positions in sizes:
+        for writer in ("dataframe", "streaming"):
+            output = subprocess.run(
+                [sys.executable, __file__, "--case", writer, str(positions)],
+                check=True, capture_output=True, text=True,
+            ).stdout.split()
+            elapsed, base_rss, peak_rss = (float(v) for v in output[-3:])
+            print(f"{positions:>10}{writer:>11}{elapsed:>10.2f}{base_rss:>10.1f}{peak_rss:>10.1f}{peak_rss - base_rss:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
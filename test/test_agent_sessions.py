@@ -0,0 +1,71 @@
+import asyncio
+import sys
+import time
+
+import pytest
+
+from train.agent_sessions import AgentSessionPool
+from train.scripts_cli import get_tool_command, resolve_tool_binary
+
+FAKE_TOOL = f"""#!{sys.executable}
+import sys, time
+started = time.time()
+prompt = sys.stdin.read()
+print(started, sys.argv[1:], prompt.strip())
+"""
+
+
+@pytest.fixture
+def fake_q(tmp_path, monkeypatch):
+    binary = tmp_path / "q"
+    binary.write_text(FAKE_TOOL)
+    binary.chmod(0o755)
+    monkeypatch.setenv("PATH", str(tmp_path))
+    return str(binary)
+
+
+def test_direct_commands_match_script_flags():
+    assert get_tool_command("amazon-q", "/bin/q", "hi") == (["/bin/q", "chat", "-a", "--no-interactive"], "hi\n")
+    assert get_tool_command("cursor-agent", "ca", "hi", model="auto") == (["ca", "agent", "--model", "auto"], "hi\n/exit\n")
+    assert get_tool_command("copilot", "copilot", "hi", allow_all_tools=False) == (["copilot", "-p", "hi"], None)
+    assert get_tool_command("gemini", "gemini", "hi", allow_all_tools=False)[0] == ["gemini"]
+    with pytest.raises(ValueError):
+        get_tool_command("vim", "vim", "hi")
+
+
+def test_resolve_once(fake_q, monkeypatch):
+    pool = AgentSessionPool()
+    assert pool.resolve("amazon-q") == resolve_tool_binary("amazon-q") == fake_q
+
+    monkeypatch.setenv("PATH", "")
+    assert pool.resolve("amazon-q") == fake_q
+    with pytest.raises(FileNotFoundError):
+        resolve_tool_binary("amazon-q")
+
+
+def test_workers_reuse_their_own_warm_process(fake_q):
+    async def run(pool, worker, prompt):
+        sent = time.time()
+        proc = await pool.start(worker, "amazon-q", prompt)
+        stdout, _ = await proc.communicate()
+        started, _, reply = stdout.decode().split(" ", 2)
+        return float(started), sent, reply.strip()
+
+    async def scenario():
+        pool = AgentSessionPool()
+        first = await run(pool, "pc_0", "one")
+        await asyncio.sleep(0.5)
+        second = await run(pool, "pc_0", "two")
+        other = await run(pool, "pc_1", "three")
+        warm = list(pool._warm.values())
+        await pool.close()
+        return first, second, other, [await task for task in warm]
+
+    first, second, other, warm = asyncio.run(scenario())
+
+    assert first[2].endswith("'--no-interactive'] one")
+    assert first[0] >= first[1]
+    # Started while pc_0 was idle, before its prompt was sent
+    assert second[0] < second[1] and second[2].endswith("two")
+    assert other[0] >= other[1]
+    assert len(warm) == 2 and all(proc.returncode is not None for proc in warm)
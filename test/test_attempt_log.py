@@ -0,0 +1,72 @@
+import json
+import multiprocessing
+
+from utils.attempt_log import AttemptLog
+
+WORKERS = 10
+APPENDS = 50
+
+
+def append_attempts(path, worker):
+    log = AttemptLog(path)
+    for n in range(APPENDS):
+        log.append({"worker": worker, "n": n, "assistant": "x" * (n * 97)})
+
+
+def test_concurrent_workers_never_lose_appends(tmp_path):
+    path = str(tmp_path / "potential_conditions.jsonl")
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=append_attempts, args=(path, w)) for w in range(WORKERS)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    attempts = [attempt for _, attempt in AttemptLog(path)]
+    assert len(attempts) == WORKERS * APPENDS
+    assert sorted((a["worker"], a["n"]) for a in attempts) == [(w, n) for w in range(WORKERS) for n in range(APPENDS)]
+
+
+def test_index_follows_appends_and_skips_torn_lines(tmp_path):
+    path = tmp_path / "another_conditions.jsonl"
+    log = AttemptLog(str(path))
+    first = log.append({"net_profit_percent": 1.5}, time="2026-01-01T00:00:00")
+    assert len(log) == 1
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"time": "2026-01-01T00:00:01", "attem')
+    assert len(log) == 1
+    log.append({"net_profit_percent": 2.5}, time="2026-01-01T00:00:02")
+
+    assert log.times() == [first, "2026-01-01T00:00:02"]
+    assert log.get("2026-01-01T00:00:02") == {"net_profit_percent": 2.5}
+    assert AttemptLog(str(path)).entries() == log.entries()
+
+
+def test_compact_merges_legacy_json(tmp_path):
+    path = tmp_path / "potential_conditions.jsonl"
+    legacy = tmp_path / "potential_conditions.json"
+    legacy.write_text(json.dumps({"2025-12-31T00:00:00": {"total_trades": 7}}))
+    log = AttemptLog(str(path))
+    log.append({"total_trades": 9}, time="2026-01-01T00:00:00")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("not json\n")
+
+    assert log.compact([str(legacy)]) == 2
+    assert log.compact([str(legacy)]) == 2
+    assert log.entries() == {"2025-12-31T00:00:00": {"total_trades": 7}, "2026-01-01T00:00:00": {"total_trades": 9}}
+    assert len(path.read_text().splitlines()) == 2
+
+
+def test_cache_helpers_reuse_one_index_per_log(tmp_path):
+    from utils import lmm_utils
+
+    path = str(tmp_path / "potential_conditions.jsonl")
+    lmm_utils.add_to_cache({"total_trades": 1}, path)
+    assert list(lmm_utils.get_cache(path).values()) == [{"total_trades": 1}]
+    log = lmm_utils._LOGS[path]
+    indexed = log._indexed_size
+
+    lmm_utils.add_to_cache({"total_trades": 2}, path)
+    assert len(lmm_utils.get_cache(path)) == 2
+    assert lmm_utils._LOGS[path] is log and log._index[0][1:] == (0, indexed)
@@ -0,0 +1,121 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from utils.binary_cache import CacheFile, CacheJournal, read_cache, write_cache
+from utils.order_table import OrderRow, OrderTable, json_default, to_columnar
+from utils.report_exporter import ReportExporter
+
+CACHE_FILES = sorted((Path(__file__).resolve().parent.parent / "data" / "cache").glob("*.json"))
+
+
+def _plain(data):
+    return json.loads(json.dumps(data, default=json_default))
+
+
+@pytest.mark.parametrize("columnar", [False, True], ids=["records", "columnar"])
+@pytest.mark.parametrize("cache_file", CACHE_FILES, ids=lambda p: p.stem)
+def test_round_trip_matches_json(tmp_path, cache_file, columnar):
+    cache = json.loads(cache_file.read_text())
+    source = to_columnar(json.loads(cache_file.read_text())) if columnar else cache
+    write_cache(tmp_path / "cache.msgpack", source)
+
+    loaded = read_cache(tmp_path / "cache.msgpack")
+    assert isinstance(loaded["global_test"]["orders"], OrderTable)
+    position = next(iter(loaded["global_test"]["positions"].values()))
+    assert all(isinstance(o, OrderRow) for o in position["orders"])
+    assert _plain(loaded) == cache
+
+
+def test_metrics_are_read_without_orders(tmp_path):
+    cache = json.loads(CACHE_FILES[0].read_text())
+    cache["single_test"]["failed"] = ""
+    path = tmp_path / "cache.msgpack"
+    write_cache(path, cache)
+
+    reader = CacheFile(path)
+    condition = next(c for c, r in cache["single_test"].items() if r)
+    metrics = reader.metrics(condition)
+    assert "orders" not in metrics and "positions" not in metrics
+    assert metrics["Net profit %"] == cache["single_test"][condition]["Net profit %"]
+    assert reader.metrics("failed") == ""
+    assert reader.metrics("missing") is None
+    assert set(reader.conditions) == set(cache["single_test"])
+
+
+def test_exporter_prefers_binary_cache(tmp_path):
+    cache = json.loads(CACHE_FILES[0].read_text())
+    json_path = tmp_path / "strategy.json"
+    json_path.write_text("{}")
+    write_cache(tmp_path / "strategy.msgpack", cache)
+    os.utime(json_path, (0, 0))
+    exporter = ReportExporter()
+
+    assert json.dumps(exporter.load_cache(str(json_path)), sort_keys=True) == json.dumps(cache, sort_keys=True)
+    assert exporter.load_cache_metrics(str(json_path))["Total trades"] == cache["global_test"]["Total trades"]
+    with pytest.raises(ValueError):
+        CacheFile(json_path)
+
+
+def test_newer_json_cache_wins_over_stale_binary(tmp_path):
+    cache = json.loads(CACHE_FILES[0].read_text())
+    json_path = tmp_path / "strategy.json"
+    write_cache(tmp_path / "strategy.msgpack", cache)
+    os.utime(tmp_path / "strategy.msgpack", (0, 0))
+    # e.g. updated by a git pull
+    json_path.write_text(json.dumps({"global_test": {"Total trades": 3}}))
+    exporter = ReportExporter()
+
+    assert exporter.load_cache(str(json_path)) == {"global_test": {"Total trades": 3}}
+    assert exporter.load_cache_metrics(str(json_path))["Total trades"] == 3
+
+
+def test_journal_replays_and_skips_torn_record(tmp_path):
+    cache = json.loads(CACHE_FILES[0].read_text())
+    condition, report = next((c, r) for c, r in cache["single_test"].items() if r)
+    journal = CacheJournal(str(tmp_path / "strategy.journal"))
+
+    assert journal.append(f"single_test/{condition}", report) == 1
+    with open(journal.path, "ab") as f:
+        f.write(b"\xff\x00\x00\x00partial")
+    assert journal.append("single_test/failed", "") == 2
+
+    replayed = journal.apply({"global_test": {}})
+    assert _plain(replayed["single_test"]) == {condition: report, "failed": ""}
+
+
+def test_conditions_are_journaled_then_compacted(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cache = json.loads(CACHE_FILES[0].read_text())
+    conditions = [c for c, r in cache["single_test"].items() if r][:3]
+    exporter = ReportExporter({"CACHE_COMPACT_EVERY": 3})
+    exporter.save_cache({"global_test": cache["global_test"]}, "strategy.xlsx")
+    cache_dir = tmp_path / "data" / "cache"
+
+    for condition in conditions[:2]:
+        exporter.save_condition(cache["single_test"][condition], "strategy.xlsx", condition)
+    assert json.loads((cache_dir / "strategy.json").read_text()) == {"global_test": cache["global_test"]}
+    assert list(exporter.load_cache(str(cache_dir / "strategy.json"))["single_test"]) == conditions[:2]
+    assert exporter.load_cache_metrics(str(cache_dir / "strategy.json"), conditions[1])["Total trades"] == cache["single_test"][conditions[1]]["Total trades"]
+
+    exporter.save_condition(cache["single_test"][conditions[2]], "strategy.xlsx", conditions[2])
+    assert not (cache_dir / "strategy.journal").exists()
+    expected = {"global_test": cache["global_test"], "single_test": {c: cache["single_test"][c] for c in conditions}}
+    assert json.loads((cache_dir / "strategy.json").read_text()) == expected
+    assert read_cache(cache_dir / "strategy.msgpack")["single_test"].keys() == expected["single_test"].keys()
+
+
+def test_orders_are_stored_once_across_reports(tmp_path):
+    cache = json.loads(CACHE_FILES[0].read_text())
+    write_cache(tmp_path / "single.msgpack", {"global_test": cache["global_test"], "single_test": {}})
+    fallback = {"global_test": cache["global_test"], "single_test": {str(i): cache["global_test"] for i in range(1, 29)}}
+    write_cache(tmp_path / "fallback.msgpack", fallback)
+
+    assert (tmp_path / "fallback.msgpack").stat().st_size < 1.1 * (tmp_path / "single.msgpack").stat().st_size
+    reader = CacheFile(tmp_path / "fallback.msgpack")
+    assert reader.orders("1") is reader.orders()
+    loaded = reader.load()
+    assert loaded["single_test"]["5"] is not loaded["global_test"]
+    assert _plain(loaded) == fallback
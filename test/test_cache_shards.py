@@ -0,0 +1,44 @@
+import json
+from pathlib import Path
+
+from utils.cache_shards import read_shards, shard_directory, shard_path, write_shards
+from utils.report_exporter import ReportExporter
+
+CACHE_FILES = sorted((Path(__file__).resolve().parent.parent / "data" / "cache").glob("*.json"))
+
+
+def test_shards_hold_metrics_and_rewrite_only_changes(tmp_path):
+    cache = json.loads(CACHE_FILES[0].read_text())
+    directory = str(tmp_path / "strategy")
+
+    written = write_shards(directory, cache)
+    assert len(written) == 1 + len(cache["single_test"])
+    shards = read_shards(directory)
+    assert list(shards["single_test"]) == sorted(cache["single_test"], key=int)
+    assert "orders" not in shards["global_test"]
+    assert shards["global_test"]["Net profit %"] == cache["global_test"]["Net profit %"]
+
+    condition = next(iter(cache["single_test"]))
+    cache["single_test"][condition] = dict(cache["single_test"][condition], tags=["RETESTED"])
+    assert write_shards(directory, cache) == [shard_path(directory, condition)]
+
+    del cache["single_test"][condition]
+    assert write_shards(directory, cache) == [shard_path(directory, condition)]
+    assert write_shards(directory, cache) == []
+
+
+def test_sweep_writes_condition_shards_and_metrics_fall_back_to_them(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cache = json.loads(CACHE_FILES[0].read_text())
+    exporter = ReportExporter({"CACHE_FORMATS": ["shards"]})
+    condition = next(iter(cache["single_test"]))
+
+    exporter.exports({"single_test": {condition: cache["single_test"][condition]}}, "strategy.xlsx", condition=condition)
+    exporter.flush_reports()
+
+    cache_file = tmp_path / "data" / "cache" / "strategy.json"
+    assert not cache_file.exists()
+    assert Path(shard_path(shard_directory(str(cache_file)), condition)).exists()
+    (tmp_path / "data" / "cache" / "strategy.journal").unlink()
+    metrics = exporter.load_cache_metrics(str(cache_file), condition)
+    assert metrics["Total trades"] == cache["single_test"][condition]["Total trades"]
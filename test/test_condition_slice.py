@@ -0,0 +1,64 @@
+from pathlib import Path
+
+import pytest
+
+from train.condition_slice import (
+    EDIT_MARKER, apply_focused_edit, available_variables, focused_edit_path, render_focused_edit, splice_condition,
+    write_focused_edit,
+)
+
+DEV_PINE = (Path(__file__).resolve().parent.parent / "train" / "dev.pine").read_text()
+NEW_VARIABLE = "[rsi_7_30M] = request.security(tickerid, T30m, [ta.rsi(close, 7)[offset]], lookahead = lookahead_type)"
+
+
+def test_scratch_lists_variables_and_round_trips():
+    scratch = render_focused_edit(DEV_PINE, "openLong2")
+    header, region = scratch.split(EDIT_MARKER)
+
+    assert ("rsi50_30M", "ta.rsi(high,50)") in available_variables(DEV_PINE)["T30m"]
+    assert "rsi50_30M=ta.rsi(high,50)" in header and "// bool openLong1 =" in header
+    assert region.strip().startswith("bool openLong2 = ta.crossover(sma_20_30M, sma_80_30M)")
+    assert len(scratch) < len(DEV_PINE) / 3
+    assert splice_condition(DEV_PINE, "openLong2", scratch) == DEV_PINE
+
+
+def test_splice_inserts_new_variables_above_condition():
+    scratch = render_focused_edit(DEV_PINE, "openLong2")
+    edited = scratch.split(EDIT_MARKER)[0] + EDIT_MARKER + f"\n{NEW_VARIABLE}\nbool openLong2 = rsi_7_30M < 30 // oversold\n"
+
+    lines = splice_condition(DEV_PINE, "openLong2", edited).splitlines()
+    i = lines.index(NEW_VARIABLE)
+
+    assert lines[i + 1] == "bool openLong2 = rsi_7_30M < 30 // oversold"
+    assert lines[i + 2] == "" and lines[i - 3].startswith("bool openLong1")
+    assert len(lines) == len(DEV_PINE.splitlines()) - 1
+
+
+@pytest.mark.parametrize("edit, reason", [
+    ("bool openLong3 = close > open", "does not define openLong2"),
+    ("bool openLong2 = ta.crossover(sma_20_30M, sma_80_30M", "unbalanced"),
+    ("bool openLong2 = foo_30M > 1 and rsi50_30M < 30", "undefined identifiers in openLong2: foo_30M"),
+    ("bool openLong2 = condText != ' '", "condText"),
+    ("rsi50_30M = ta.rsi(close, 50)\nbool openLong2 = rsi50_30M < 30", "redefines existing variables: rsi50_30M"),
+    ("plot(close)\nbool openLong2 = close > open", "unexpected line"),
+    ("bool openLong2 = close > open\nbool openLong2 = close < open", "more than once"),
+])
+def test_splice_rejects_invalid_edits(edit, reason):
+    with pytest.raises(ValueError, match=reason):
+        splice_condition(DEV_PINE, "openLong2", f"{EDIT_MARKER}\n{edit}\n")
+
+
+def test_apply_leaves_script_untouched_on_rejection(tmp_path):
+    script = tmp_path / "pc_1.pine"
+    script.write_text(DEV_PINE)
+
+    path = write_focused_edit(str(script), "openLong1")
+    assert path == focused_edit_path(str(script), "openLong1") == str(tmp_path / "pc_1.openLong1.edit.pine")
+    Path(path).write_text(Path(path).read_text().replace("open_30M > close_30M", "open_30M > missing"))
+    assert "missing" in apply_focused_edit(str(script), "openLong1")
+    assert script.read_text() == DEV_PINE and not Path(path).exists()
+
+    path = write_focused_edit(str(script), "openLong1")
+    Path(path).write_text(Path(path).read_text().replace("open_30M > close_30M", "open_30M < close_30M"))
+    assert apply_focused_edit(str(script), "openLong1") is None
+    assert script.read_text() == DEV_PINE.replace("open_30M > close_30M", "open_30M < close_30M")
@@ -0,0 +1,41 @@
+from pathlib import Path
+
+from train.doc_index import (
+    DOCS_PATH, DocIndex, condition_functions, estimate_tokens, relevant_docs, split_sections, variable_definitions,
+)
+
+DEV_PINE = (Path(__file__).resolve().parent.parent / "train" / "dev.pine").read_text()
+
+
+def test_sections_cover_every_function_entry():
+    text = Path(DOCS_PATH).read_text()
+    sections = split_sections(text)
+
+    assert sections[0].title == "ta.alma" and sections[-1].title == "ta.wpr"
+    assert len(sections) == len({s.title for s in sections})
+    assert sum(len(s.text) for s in sections) > 0.95 * len(text.strip())
+
+
+def test_condition_functions_follow_security_tuples():
+    definitions = variable_definitions(DEV_PINE)
+    assert definitions["sma_20_30M"] == "ta.sma(low,20)[offset]"
+    assert definitions["diplus_13_30M"] == "dmi1[offset]"
+
+    functions, identifiers = condition_functions(DEV_PINE, "openLong2")
+    assert functions == ["ta.crossover", "ta.sma", "ta.atr", "ta.dmi"]
+    assert "atr50_30M" in identifiers
+
+
+def test_relevant_docs_fit_budget():
+    docs = relevant_docs(DEV_PINE, "openLong2", top_k=4, max_tokens=1500)
+    titles = [s.title for s in split_sections(docs)]
+
+    assert titles == ["ta.crossover", "ta.sma", "ta.atr", "ta.dmi"]
+    assert estimate_tokens(docs) <= 1500
+    assert relevant_docs(DEV_PINE, "openLong99") == ""
+
+
+def test_search_ranks_by_terms():
+    index = DocIndex.from_file()
+    assert index is DocIndex.from_file()
+    assert index.search("relative strength index rsi")[0][0].title == "ta.rsi"
@@ -0,0 +1,65 @@
+import itertools
+
+import numpy as np
+
+from analytics.ensemble_selector import EnsembleSelector
+
+
+def _synthetic_single_test(n_conditions, n_slots, seed):
+    rng = np.random.default_rng(seed)
+    single_test = {}
+    for c in range(1, n_conditions + 1):
+        slots = rng.choice(n_slots, size=rng.integers(1, n_slots // 2), replace=False)
+        positions = {
+            f"Position 2020-01-01 {slot:05d}": {
+                "orders": [{"Net P&L USD": float(rng.normal(20, 40))}],
+                "Position max drawdown %": float(-rng.uniform(0, 40)),
+            }
+            for slot in sorted(slots)
+        }
+        single_test[str(c)] = {"positions": positions, "Net profit": 100.0, "Net profit %": 10.0}
+    single_test[str(n_conditions + 1)] = ""
+    return single_test
+
+
+def test_branch_and_bound_matches_brute_force():
+    single_test = _synthetic_single_test(9, 40, seed=7)
+    selector = EnsembleSelector(single_test, max_drawdown=35, min_trades=10)
+    best = selector.select()
+
+    brute = None
+    for size in range(1, len(selector.conditions) + 1):
+        for subset in itertools.combinations(selector.conditions, size):
+            result = selector.evaluate(list(subset))
+            if selector._is_feasible(result) and selector._is_better(result, brute):
+                brute = result
+
+    assert best is not None and brute is not None
+    assert best["Net profit %"] == brute["Net profit %"]
+    assert abs(best["Max drawdown %"]) <= 35
+    assert best["Total positions"] >= 10
+
+
+def test_select_scales_to_many_conditions():
+    single_test = _synthetic_single_test(60, 400, seed=3)
+    selector = EnsembleSelector(single_test, max_drawdown=38, min_trades=50, max_nodes=20000)
+
+    best = selector.select()
+
+    assert best is not None
+    assert selector._is_feasible(selector.evaluate(best["conditions"]))
+
+
+def test_shared_position_is_counted_once():
+    def report(pnls):
+        positions = {f"Position 2020-01-0{slot}": {"orders": [{"Net P&L USD": pnl}], "Position max drawdown %": -1.0}
+                     for slot, pnl in pnls.items()}
+        return {"positions": positions, "Net profit": 100.0, "Net profit %": 10.0}
+
+    selector = EnsembleSelector({"1": report({1: 50.0, 2: 30.0}), "2": report({2: 80.0, 3: -20.0})}, max_drawdown=50)
+    result = selector.evaluate(["1", "2"])
+
+    assert result["Total positions"] == 3
+    # Capital 1000: slot 2 gives 8% once, not 3% + 8%
+    assert result["Net profit %"] == 5.0 + 8.0 - 2.0
+    assert selector.select()["conditions"] == ["1", "2"]
@@ -0,0 +1,21 @@
+import glob
+from pathlib import Path
+
+import pytest
+
+from utils.excel_reader import ExcelReader
+
+SHEETS = sorted(glob.glob(str(Path(__file__).resolve().parent.parent / "data" / "sheets" / "*.xlsx")))
+
+
+@pytest.mark.parametrize("file_path", SHEETS)
+def test_bulk_read_matches_per_sheet_read(file_path):
+    bulk = list(ExcelReader.read_workbook_as_json(file_path).values())
+    per_sheet = [ExcelReader.read_worksheet_as_json(file_path, i) for i in range(len(bulk))]
+
+    assert repr(bulk) == repr(per_sheet)
+
+
+def test_bulk_read_rejects_bad_index():
+    with pytest.raises(Exception, match="out of range"):
+        ExcelReader.read_workbook_as_json(SHEETS[0], [99])
@@ -0,0 +1,72 @@
+import json
+import multiprocessing
+import os
+
+import pytest
+
+from utils.file_operations import atomic_copy, atomic_write, file_lock
+
+WORKERS = 4
+INCREMENTS = 50
+
+
+def increment(path):
+    for _ in range(INCREMENTS):
+        with file_lock(path):
+            with open(path, "r", encoding="utf-8") as f:
+                value = int(f.read())
+            with atomic_write(path) as f:
+                f.write(str(value + 1))
+
+
+def rewrite(path, stop):
+    n = 0
+    while not stop.is_set():
+        n += 1
+        with atomic_write(path) as f:
+            json.dump({"n": n, "orders": list(range(20000))}, f)
+
+
+def test_failed_write_keeps_previous_file(tmp_path):
+    path = tmp_path / "cache.json"
+    path.write_text('{"ok": true}')
+
+    with pytest.raises(RuntimeError):
+        with atomic_write(str(path)) as f:
+            f.write('{"ok": fa')
+            raise RuntimeError("interrupted")
+
+    assert json.loads(path.read_text()) == {"ok": True}
+    assert os.listdir(tmp_path) == ["cache.json"]
+    atomic_copy(str(path), str(tmp_path / "copy.json"))
+    assert (tmp_path / "copy.json").read_text() == path.read_text()
+
+
+def test_locked_read_modify_write_is_not_lost(tmp_path):
+    path = tmp_path / "counter.txt"
+    path.write_text("0")
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=increment, args=(str(path),)) for _ in range(WORKERS)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert path.read_text() == str(WORKERS * INCREMENTS)
+
+
+def test_readers_never_see_partial_writes(tmp_path):
+    path = tmp_path / "cache.json"
+    with atomic_write(str(path)) as f:
+        json.dump({"n": 0}, f)
+    context = multiprocessing.get_context("fork")
+    stop = context.Event()
+    writer = context.Process(target=rewrite, args=(str(path), stop))
+    writer.start()
+    try:
+        for _ in range(300):
+            with open(path, "r", encoding="utf-8") as f:
+                json.load(f)
+    finally:
+        stop.set()
+        writer.join()
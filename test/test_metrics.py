@@ -0,0 +1,63 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from analytics.metrics import EquityCurves, compute_equity_metrics
+
+CACHE_FILES = sorted((Path(__file__).resolve().parent.parent / "data" / "cache").glob("*.json"))
+
+
+def _trade(number, signal, entry, exit_, pnl, cumulative):
+    row = {"Trade #": number, "Net P&L USD": pnl, "Cumulative P&L USD": cumulative, "Cumulative P&L %": cumulative / 10}
+    return [
+        dict(row, Type="Exit long", **{"Date/Time": exit_, "Signal": "0.01"}),
+        dict(row, Type="Entry long", **{"Date/Time": entry, "Signal": signal}),
+    ]
+
+
+ORDERS = (
+    _trade(1, " 1  | 1 | 0.2", "2020-01-01 00:00:00", "2020-01-11 00:00:00", 100.0, 100.0)
+    + _trade(2, " 2  | 1 | 0.2", "2020-06-01 00:00:00", "2020-06-11 00:00:00", -220.0, -120.0)
+    + _trade(3, " 1 2  | 1 | 0.2", "2021-01-01 00:00:00", "2021-01-01 00:00:00", 330.0, 210.0)
+)
+
+
+def test_global_and_condition_curves():
+    overall, by_condition = compute_equity_metrics(ORDERS)
+
+    # 1000 -> 1100 -> 880 -> 1210: drawdown 20% from the 1100 peak
+    assert overall["Equity max drawdown %"] == -20.0
+    assert overall["Yearly returns %"] == {"2020": -12.0, "2021": 37.5}
+    assert overall["Exposure %"] == round(20 / 366 * 100, 4)
+    assert set(by_condition) == {"", "1", "2"}
+    # Condition 1 compounds +10% then +37.5%, never below its peak
+    assert by_condition["1"]["Equity max drawdown %"] == 0.0
+    assert by_condition["1"]["Calmar ratio"] is None
+    assert by_condition["1"]["Yearly returns %"] == {"2020": 10.0, "2021": 37.5}
+    assert by_condition["2"]["Equity max drawdown %"] == -20.0
+
+
+def test_open_trade_is_excluded_from_equity():
+    orders = [dict(o) for o in ORDERS]
+    orders[4]["Signal"] = "Open"
+
+    curves = EquityCurves.from_orders(orders)
+    assert curves.equity()[0, -1] == pytest.approx(1100 * 0.8)
+
+
+@pytest.mark.parametrize("cache_file", CACHE_FILES, ids=lambda p: p.stem)
+def test_global_curve_ends_at_cumulative_pnl(cache_file):
+    report = json.loads(cache_file.read_text())["global_test"]
+    curves = EquityCurves.from_orders(report["orders"])
+    closed = [o for o in report["orders"] if "Exit" in o["Type"] and o["Signal"] != "Open"]
+
+    assert curves.equity()[0, -1] - curves.capital == pytest.approx(sum(o["Net P&L USD"] for o in closed))
+    assert set(compute_equity_metrics(report["orders"])[1]) == set(report["conditions"])
+
+
+def test_no_orders():
+    overall, by_condition = compute_equity_metrics([])
+
+    assert overall["Equity max drawdown %"] == 0.0
+    assert by_condition == {}
@@ -0,0 +1,82 @@
+import glob
+import json
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from analytics.strategy_analyzer import StrategyAnalyzer
+from utils.binary_cache import read_cache, write_cache
+from utils.excel_reader import ExcelReader
+from utils.order_table import OrderTable, OrderRow, json_default, to_columnar
+
+DATA = Path(__file__).resolve().parent.parent / "data"
+SHEETS = sorted(glob.glob(str(DATA / "sheets" / "*.xlsx")))
+CACHE_FILES = sorted((DATA / "cache").glob("*.json"))
+
+
+@pytest.mark.parametrize("file_path", SHEETS)
+def test_from_frame_matches_records(file_path):
+    trades = ExcelReader.read_workbook(file_path, [3])["List of trades"]
+    table = OrderTable.from_frame(trades.copy())
+
+    assert repr(table.to_records()) == repr(ExcelReader.to_records(trades))
+    assert table[0].to_dict() == table.to_records()[0]
+
+
+@pytest.mark.parametrize("cache_file", CACHE_FILES, ids=lambda p: p.stem)
+def test_columnar_cache_round_trip(cache_file):
+    raw = json.loads(cache_file.read_text())
+    cache = to_columnar(json.loads(cache_file.read_text()))
+
+    global_test = cache["global_test"]
+    assert isinstance(global_test["orders"], OrderTable)
+    position = next(iter(global_test["positions"].values()))
+    assert all(isinstance(o, OrderRow) for o in position["orders"])
+    assert json.dumps(cache, default=json_default) == json.dumps(raw)
+
+
+@pytest.mark.parametrize("cache_file", CACHE_FILES, ids=lambda p: p.stem)
+def test_aggregation_on_table_matches_records(cache_file):
+    analyzer = StrategyAnalyzer({})
+    report = json.loads(cache_file.read_text())["global_test"]
+    positions, conditions = analyzer._aggregate_orders(OrderTable.from_records(report["orders"]))
+
+    assert json.dumps(positions, default=json_default) == json.dumps(report["positions"])
+    assert json.dumps(conditions) == json.dumps(report["conditions"])
+
+
+def test_mixed_numeric_column_keeps_types():
+    table = OrderTable.from_records([{"Signal": 0.5}, {"Signal": "Open"}, {"Signal": 1}, {"Signal": True}])
+
+    assert [type(v) for v in table.column("Signal")] == [float, str, int, bool]
+    assert table[-1].get("Missing", "x") == "x"
+    with pytest.raises(IndexError):
+        table[4]
+    with pytest.raises(TypeError):
+        json.dumps(pd.DataFrame({"Signal": [1]}), default=json_default)
+
+
+def _multi_entry_report():
+    orders = [
+        {"Trade #": 1, "Type": "Entry long", "Signal": "1 dca1", "Price USD": 100.0, "Net P&L USD": float("nan")},
+        {"Trade #": 1, "Type": "Entry long", "Signal": "1 dca2", "Price USD": 95.0, "Net P&L USD": float("nan")},
+        {"Trade #": 1, "Type": "Exit long", "Signal": "0.05", "Price USD": 110.0, "Net P&L USD": 25.0},
+    ]
+    position = {"orders": [dict(orders[0]), dict(orders[1])], "Position max drawdown %": -5.0}
+    return {"orders": orders, "positions": {"Position 2024-01-02": position}}
+
+
+def test_multi_entry_trade_keeps_each_entry_row(tmp_path):
+    raw = json.dumps(_multi_entry_report())
+    report = to_columnar(json.loads(raw))
+
+    rows = report["positions"]["Position 2024-01-02"]["orders"]
+    assert [(type(o), o._index) for o in rows] == [(OrderRow, 0), (OrderRow, 1)]
+    assert [o["Signal"] for o in rows] == ["1 dca1", "1 dca2"]
+    assert json.dumps(report, default=json_default) == raw
+
+    write_cache(tmp_path / "cache.msgpack", _multi_entry_report())
+    loaded = read_cache(tmp_path / "cache.msgpack")
+    assert [o["Signal"] for o in loaded["positions"]["Position 2024-01-02"]["orders"]] == ["1 dca1", "1 dca2"]
+    assert json.dumps(loaded, default=json_default) == raw
@@ -0,0 +1,89 @@
+import asyncio
+import os
+import time
+from pathlib import Path
+
+from train.condition_slice import apply_condition_edit
+from train.patch_output import PATCH_CLOSE, PATCH_OPEN, PatchReader, patch_instructions, read_patch
+
+DEV_PINE = (Path(__file__).resolve().parent.parent / "train" / "dev.pine").read_text()
+
+
+def test_reader_ignores_prompt_echo_and_fences():
+    reader = PatchReader("openLong1")
+    output = patch_instructions("openLong1").splitlines() + [
+        "Thinking about RSI levels...",
+        f"\x1b[32m{PATCH_OPEN} openLong1\x1b[0m",
+        "```pine",
+        "bool openLong1 = rsi50_30M < 30",
+        "```",
+        PATCH_CLOSE,
+        "trailing text",
+    ]
+
+    closed = [reader.feed(line) for line in output]
+
+    assert closed.index(True) == len(output) - 2
+    assert reader.patch == "bool openLong1 = rsi50_30M < 30\n"
+    assert PatchReader("openLong1").patch is None
+
+
+def test_reader_only_accepts_target_condition():
+    reader = PatchReader("openLong1")
+    for line in [f"{PATCH_OPEN} openLong2", "bool openLong2 = close > open", PATCH_CLOSE]:
+        reader.feed(line)
+
+    assert not reader.opened and reader.patch is None
+
+
+def test_read_patch_stops_tool_once_block_closes(tmp_path):
+    pid_file = tmp_path / "child.pid"
+    script = (
+        f"sleep 30 & echo $! > {pid_file}\n"
+        "echo 'reading strategy'\n"
+        f"printf '{PATCH_OPEN} openLong1\\nbool openLong1 = open_30M < close_30M\\n{PATCH_CLOSE}\\n'\n"
+        "sleep 30\n"
+    )
+
+    async def run():
+        proc = await asyncio.create_subprocess_shell(
+            script, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE, start_new_session=True,
+        )
+        reader = PatchReader("openLong1")
+        return await read_patch(proc, reader, timeout=20), reader, proc
+
+    started = time.monotonic()
+    stdout, reader, proc = asyncio.run(run())
+
+    assert time.monotonic() - started < 10
+    assert stdout.splitlines()[0] == "reading strategy"
+    assert proc.returncode is not None
+    child = int(pid_file.read_text())
+    for _ in range(50):
+        try:
+            os.kill(child, 0)
+        except ProcessLookupError:
+            break
+        time.sleep(0.1)
+    else:
+        raise AssertionError("tool child process still running")
+
+    script_path = tmp_path / "pc_1.pine"
+    script_path.write_text(DEV_PINE)
+    assert apply_condition_edit(str(script_path), "openLong1", reader.patch) is None
+    assert "bool openLong1 = open_30M < close_30M\n" in script_path.read_text()
+
+
+def test_read_patch_times_out_without_block():
+    async def run():
+        proc = await asyncio.create_subprocess_shell(
+            "echo 'no patch here'; sleep 30",
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE, start_new_session=True,
+        )
+        reader = PatchReader("openLong1")
+        return await read_patch(proc, reader, timeout=0.5), reader
+
+    stdout, reader = asyncio.run(run())
+
+    assert stdout == "no patch here"
+    assert reader.patch is None
@@ -0,0 +1,61 @@
+import ast
+import importlib
+import json
+import shutil
+from pathlib import Path
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from utils.order_table import json_default, to_columnar
+from utils.report_exporter import ReportExporter
+
+CACHE_FILES = sorted((Path(__file__).resolve().parent.parent / "data" / "cache").glob("*.json"))
+
+
+def test_streamed_workbook_matches_dataframe_export(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cache = to_columnar(json.loads(CACHE_FILES[0].read_text()))
+    cache["single_test"]["1"]["Sharpe ratio"] = float("nan")
+    exporter = ReportExporter()
+    model = exporter.build_report_model(cache, "strategy.xlsx")
+
+    success, path = exporter.export_excel(cache, "strategy.xlsx", model)
+    assert success, path
+
+    sheets = pd.read_excel(path, sheet_name=None)
+    assert list(sheets) == ["Summary", "Single Test Performance", "Conditions", "Positions"]
+    positions = pd.DataFrame(model.positions, columns=["Date/Time", "Orders", "DD %", "Step", "Size %", "Trade #"])
+    pd.testing.assert_frame_equal(sheets["Positions"], positions, check_dtype=False)
+    single = sheets["Single Test Performance"]
+    assert single["Condition"].astype(str).tolist() == [r["condition"] for r in model.single_rows] + ["TOTAL"]
+    assert single.loc[single["Condition"].astype(str) == "1", "Sharpe Ratio"].isna().all()
+
+    header = openpyxl.load_workbook(path)["Conditions"]["A1"]
+    assert (header.value, header.font.b, header.border.top.style) == ("Condition", True, "thin")
+
+
+BOT = Path(__file__).resolve().parent.parent / "src" / "automation" / "tradingview_bot.py"
+SHEETS = sorted((Path(__file__).resolve().parent.parent / "data" / "sheets").glob("*.xlsx"))
+
+
+def _bot_module(suffix):
+    imports = [n.module for n in ast.walk(ast.parse(BOT.read_text())) if isinstance(n, ast.ImportFrom) and n.module]
+    return importlib.import_module(next(m for m in imports if m.endswith(suffix)))
+
+
+def test_global_export_of_analyzer_output_writes_every_format(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data" / "sheets").mkdir(parents=True)
+    shutil.copy(SHEETS[0], tmp_path / "data" / "sheets" / "strategy.xlsx")
+    report = _bot_module(".strategy_analyzer").StrategyAnalyzer({}).analyze_file("strategy.xlsx")
+    exporter = _bot_module(".report_exporter").ReportExporter({"CACHE_FORMATS": ["msgpack", "json", "shards"]})
+
+    exporter.exports({"global_test": report}, "strategy.xlsx")
+
+    cache_dir = tmp_path / "data" / "cache"
+    expected = json.loads(json.dumps(report, default=json_default))
+    assert json.loads((cache_dir / "strategy.json").read_text())["global_test"] == expected
+    assert (cache_dir / "strategy.msgpack").exists()
+    assert json.loads((cache_dir / "strategy" / "global_test.json").read_text())["Total trades"] == report["Total trades"]
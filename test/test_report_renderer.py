@@ -0,0 +1,78 @@
+import json
+import threading
+import time
+from pathlib import Path
+
+from utils.report_exporter import ReportExporter
+from utils.report_renderer import CoalescingRenderer
+
+CACHE_FILES = sorted((Path(__file__).resolve().parent.parent / "data" / "cache").glob("*.json"))
+
+
+def test_flush_renders_only_latest_submission():
+    rendered = []
+    renderer = CoalescingRenderer(lambda results, name: rendered.append((dict(results["single_test"]), name)))
+    results = {"single_test": {}}
+
+    for condition in ["1", "2", "3"]:
+        results["single_test"][condition] = {"Total trades": int(condition)}
+        renderer.submit(results, "strategy.xlsx")
+
+    assert rendered == []
+    assert renderer.flush() is True
+    assert rendered == [({"1": {"Total trades": 1}, "2": {"Total trades": 2}, "3": {"Total trades": 3}}, "strategy.xlsx")]
+    assert renderer.flush() is False
+
+
+def test_background_renders_are_rate_limited():
+    done = threading.Event()
+    rendered = []
+
+    def render(results, name):
+        rendered.append(results["n"])
+        done.set()
+
+    renderer = CoalescingRenderer(render, interval=0.2)
+    renderer.submit({"n": 1}, "strategy.xlsx")
+    assert done.wait(2)
+    done.clear()
+    for n in range(2, 6):
+        renderer.submit({"n": n}, "strategy.xlsx")
+    assert done.wait(2)
+    time.sleep(0.05)
+
+    assert rendered == [1, 5]
+    assert renderer.flush() is False
+
+
+def test_flush_and_discard_stop_the_worker_thread():
+    rendered = []
+    renderer = CoalescingRenderer(lambda results, name: rendered.append(results["n"]), interval=60)
+    renderer.submit({"n": 1}, "strategy.xlsx")
+    thread = renderer._thread
+    renderer.flush()
+    thread.join(2)
+    assert not thread.is_alive() and renderer._thread is None and rendered == [1]
+
+    renderer.submit({"n": 2}, "strategy.xlsx")
+    thread = renderer._thread
+    renderer.discard()
+    thread.join(2)
+    assert not thread.is_alive() and rendered == [1]
+
+
+def test_sweep_defers_reports_until_flush(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cache = json.loads(CACHE_FILES[0].read_text())
+    exporter = ReportExporter()
+    results = {"global_test": cache["global_test"], "single_test": {}}
+    reports_dir = tmp_path / "data" / "reports"
+
+    for condition in list(cache["single_test"])[:3]:
+        results["single_test"][condition] = cache["single_test"][condition]
+        exporter.exports(results, "strategy.xlsx", condition=condition)
+    assert not reports_dir.exists()
+
+    assert exporter.flush_reports() is True
+    assert sorted(p.name for p in reports_dir.iterdir()) == ["strategy.txt", "strategy.xlsx"]
+    assert "Single Test Performance" in (reports_dir / "strategy.txt").read_text()
@@ -0,0 +1,110 @@
+import json
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from utils.report_exporter import ReportExporter
+from utils.results_db import ResultsDB, code_hash, parse_since
+
+CACHE_FILES = sorted((Path(__file__).resolve().parent.parent / "data" / "cache").glob("*.json"))
+
+
+def report(mdd, profit, trades=10, tags=()):
+    return {"Max drawdown %": mdd, "Net profit %": profit, "Total trades": trades, "Percent profitable": "NaN",
+            "tags": list(tags), "orders": {"Trade #": [1]}}
+
+
+def test_query_orders_and_filters(tmp_path):
+    db = ResultsDB(str(tmp_path / "results.db"))
+    first = db.record_run("btc-long", [(None, report(-30, 50)), ("11", report(-12.5, 20, tags=["NORMAL"]))],
+                          created_at="2026-01-01T00:00:00")
+    db.record_run("btc-long", [("11", report(-8.0, 5)), ("12", report(-4.0, 1))], created_at="2026-01-09T00:00:00")
+    db.record_run("eth-long", [("11", report(-1.0, 90))], created_at="2026-01-09T00:00:00")
+
+    rows = db.query(strategy="btc-long", condition="11")
+    assert [(r["max_drawdown"], r["net_profit"]) for r in rows] == [(-8.0, 5.0), (-12.5, 20.0)]
+    assert [r["net_profit"] for r in db.query(condition="11", order="profit", limit=2)] == [90.0, 20.0]
+    assert [r["condition"] for r in db.query(strategy="btc-long", since="2026-01-05")] == ["12", "11"]
+    assert [(r["run_id"], r["tags"]) for r in db.query(tag="NORMAL")] == [(first, "NORMAL")]
+    assert db.query(strategy="btc-long", condition="global")[0]["percent_profitable"] is None
+    assert "orders" not in db.metrics(first, "11")
+    with pytest.raises(ValueError):
+        db.query(order="sharpe")
+
+
+def test_conditions_without_trades_rank_last_by_drawdown(tmp_path):
+    db = ResultsDB(str(tmp_path / "results.db"))
+    db.record_run("btc-long", [("1", report(0.0, 0.0, trades=0)), ("2", report(-9.0, 12)), ("3", report(-2.0, 3))])
+
+    assert [r["condition"] for r in db.query(order="mdd")] == ["3", "2", "1"]
+    assert [r["condition"] for r in db.query(order="profit")][0] == "2"
+
+
+def test_candidate_keeps_verdict_when_rerecorded(tmp_path):
+    db = ResultsDB(str(tmp_path / "results.db"))
+    digest = db.record_candidate("btc-long", "//@version=5", assistant="tighter stop", verdict="potential")
+    assert db.record_candidate("btc-long", "//@version=5") == digest == code_hash("//@version=5")
+    db.record_run("btc-long", [(None, report(-3, 4))], code_hash=digest)
+
+    assert db.query(strategy="btc-long")[0]["code_hash"] == digest
+
+
+def test_parse_since():
+    now = datetime(2026, 1, 8, 12)
+    assert parse_since("7d", now) == "2026-01-01T12:00:00"
+    assert parse_since("12h", now) == "2026-01-08T00:00:00"
+    assert parse_since("2026-01-02") == "2026-01-02T00:00:00"
+    assert parse_since(None) is None
+
+
+def test_exporter_records_sweep_as_one_run(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cache = json.loads(CACHE_FILES[0].read_text())
+    conditions = [c for c in cache["single_test"] if isinstance(cache["single_test"][c], dict)][:3]
+    exporter = ReportExporter({"RESULTS_DB": "results.db"}, code="//@version=5")
+    results = {"global_test": cache["global_test"], "single_test": {}}
+
+    for condition in conditions:
+        results["single_test"][condition] = cache["single_test"][condition]
+        exporter.exports(results, "strategy.xlsx", condition=condition)
+    db = ResultsDB("results.db")
+    assert db.query() == []
+
+    exporter.flush_reports()
+    exporter.exports(results, "strategy.xlsx")
+    rows = db.query(strategy="strategy", limit=None)
+    assert sorted(r["condition"] for r in rows) == sorted(conditions + ["global"])
+    assert {(r["run_id"], r["code_hash"]) for r in rows} == {(rows[0]["run_id"], code_hash("//@version=5"))}
+
+    ReportExporter().exports(results, "strategy.xlsx")
+    assert len(db.query(limit=None)) == len(rows)
+
+
+def test_worker_sheets_are_recorded_under_the_strategy(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cache = json.loads(CACHE_FILES[0].read_text())
+    results = {"global_test": cache["global_test"], "single_test": {}}
+    config = {"RESULTS_DB": "results.db"}
+
+    ReportExporter(config, strategy="btc-long-bot").exports(results, "pc_0.xlsx")
+    ReportExporter(config, strategy="btc-long-bot").exports(results, "btc-long-bot.xlsx")
+    ReportExporter(config).exports(results, "pc_1.xlsx")
+
+    db = ResultsDB("results.db")
+    rows = sorted(db.query(strategy="btc-long-bot"), key=lambda r: r["run_id"])
+    assert [r["worker"] for r in rows] == ["pc_0", None]
+    assert [(r["strategy"], r["worker"]) for r in db.query(strategy="pc_1")] == [("pc_1", None)]
+
+
+def test_existing_database_gains_worker_column(tmp_path):
+    import sqlite3
+
+    path = str(tmp_path / "results.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE runs (id INTEGER PRIMARY KEY AUTOINCREMENT, strategy TEXT NOT NULL, "
+                     "created_at TEXT NOT NULL, source TEXT NOT NULL, code_hash TEXT)")
+    db = ResultsDB(path)
+    db.record_run("btc-long", [(None, report(-3, 4))], worker="pc_2")
+
+    assert db.query()[0]["worker"] == "pc_2"
@@ -0,0 +1,59 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from analytics.metrics import EquityCurves
+from analytics.robustness import TradeBootstrap, bootstrap_robustness
+from analytics.strategy_analyzer import StrategyAnalyzer
+
+CACHE_FILES = sorted((Path(__file__).resolve().parent.parent / "data" / "cache").glob("*.json"))
+
+
+@pytest.mark.parametrize("cache_file", CACHE_FILES, ids=lambda p: p.stem)
+def test_batch_matches_per_curve_loop(cache_file):
+    curves = EquityCurves.from_orders(json.loads(cache_file.read_text())["global_test"]["orders"])
+    bootstrap = TradeBootstrap(curves)
+    growth, drawdown = bootstrap._batch(np.random.default_rng(1), 3)
+
+    # Replay the same uniform draws curve by curve
+    uniform = np.random.default_rng(1).random((3, bootstrap.segment.size))
+    for sample in range(3):
+        for j, row in enumerate(bootstrap.active):
+            returns = curves.returns[curves.membership[row]]
+            start, n = bootstrap.starts[j], len(returns)
+            picked = np.maximum(returns[(uniform[sample, start:start + n] * n).astype(int)], -0.999999)
+            equity = np.concatenate(([1.0], np.cumprod(1 + picked)))
+            mdd = (equity / np.maximum.accumulate(equity) - 1).min()
+
+            assert np.expm1(growth[sample, j]) == pytest.approx(equity[-1] - 1, rel=1e-9, abs=1e-9)
+            assert np.expm1(drawdown[sample, j]) == pytest.approx(mdd, abs=1e-9)
+
+
+def test_summary_is_reproducible_and_chunked():
+    orders = json.loads(CACHE_FILES[0].read_text())["global_test"]["orders"]
+    curves = EquityCurves.from_orders(orders)
+
+    full = TradeBootstrap(curves).run(50, seed=3)
+    chunked = TradeBootstrap(curves, max_cells=1).run(50, seed=3)
+    assert bootstrap_robustness(curves, 200, 5, 7) == bootstrap_robustness(curves, 200, 5, 7)
+    assert full[0].shape == chunked[0].shape == (50, len(curves.labels))
+    for i in range(len(full)):
+        np.testing.assert_allclose(full[i], chunked[i])
+
+
+def test_tags_use_bootstrap_percentiles():
+    analyzer = StrategyAnalyzer({"ROBUSTNESS_CONDITIONS": {"PERCENTILE": 5, "PROFIT_LOWER": 0, "MDD_LOWER": -35}})
+    report = {"Monte Carlo": {"Net profit % p5": -1.0, "Max drawdown % p5": -40.0}}
+
+    assert analyzer._tag_conditions(report)["tags"] == ["OVERFIT", "RISK"]
+    report["Monte Carlo"] = {"Net profit % p5": 5.0, "Max drawdown % p5": -10.0}
+    assert analyzer._tag_conditions(report)["tags"] == ["NORMAL"]
+
+
+def test_no_trades():
+    scores, by_condition = bootstrap_robustness([], samples=10)
+
+    assert scores["Net profit % p5"] == 0.0
+    assert by_condition == {}
@@ -0,0 +1,55 @@
+import io
+from pathlib import Path
+
+import pandas as pd
+
+from analytics.sheet_reanalysis import reanalyze
+from analytics.strategy_analyzer import StrategyAnalyzer
+from utils.sheet_archive import SheetArchive
+
+SHEETS = sorted((Path(__file__).resolve().parent.parent / "data" / "sheets").glob("*.xlsx"))
+
+
+def test_identical_downloads_share_one_compressed_object(tmp_path):
+    archive = SheetArchive(str(tmp_path / "archive"))
+    first = archive.store(str(SHEETS[0]), "btc-long", "3", code_hash="abc", created_at="2026-01-01T00:00:00")
+    second = archive.store(str(SHEETS[0]), "btc-long", None, code_hash="abc")
+
+    assert first == second
+    assert len(list((tmp_path / "archive" / "objects").rglob("*.xz"))) == 1
+    assert Path(archive.object_path(first)).stat().st_size < SHEETS[0].stat().st_size / 2
+    assert [e["condition"] for e in archive.entries()] == ["3", None]
+    assert [e["created_at"] for e in archive.entries(condition="3")] == ["2026-01-01T00:00:00"]
+    assert archive.entries(condition="global")[0]["digest"] == first
+
+    archive.store(str(SHEETS[0]), "btc-long", "3", worker="pc_0")
+    assert [e["worker"] for e in archive.entries(strategy="btc-long", condition="3")] == [None, "pc_0"]
+
+    with open(archive.manifest_path, "a", encoding="utf-8") as f:
+        f.write('{"digest": "torn')
+    archive.store(str(SHEETS[0]), "btc-long", "4")
+    assert [e["condition"] for e in archive.entries(strategy="btc-long")] == ["3", None, "3", "4"]
+
+    original = pd.read_excel(SHEETS[0], sheet_name=None)
+    restored = pd.read_excel(io.BytesIO(archive.read(first)), sheet_name=None)
+    assert list(original) == list(restored)
+    for name in original:
+        pd.testing.assert_frame_equal(original[name], restored[name])
+
+
+def test_reanalysis_matches_analyzer_on_original_sheet(tmp_path):
+    archive = SheetArchive(str(tmp_path / "archive"))
+    for sheet in SHEETS:
+        archive.store(str(sheet), sheet.stem)
+    archive.store(str(SHEETS[0]), SHEETS[0].stem, "1")
+
+    results = list(reanalyze({}, archive.directory, archive.entries(), workers=2))
+
+    assert [entry["strategy"] for entry, _, _ in results] == [s.stem for s in SHEETS] + [SHEETS[0].stem]
+    assert all(error is None for _, _, error in results)
+    expected = StrategyAnalyzer({}).analyze_file(str(SHEETS[0]))
+    report = results[0][1]
+    assert "orders" not in report
+    for key in ("Net profit %", "Max drawdown %", "Total trades", "Total positions"):
+        assert report[key] == expected[key]
+    assert results[-1][1] == report
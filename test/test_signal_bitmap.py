@@ -0,0 +1,47 @@
+import json
+from pathlib import Path
+
+import numpy as np
+
+from analytics.signal_bitmap import ConditionBitmaps, parse_condition_tokens
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / "data" / "cache"
+
+
+def _position(*signals):
+    return {"orders": [{"Signal": s} for s in signals], "Position max drawdown %": 0.0}
+
+
+def test_parse_condition_tokens():
+    assert parse_condition_tokens(" 4  | 6588.181 | 0.2") == ["4"]
+    assert parse_condition_tokens(" 4 10 15  |  | 0.01") == ["4", "10", "15"]
+    assert parse_condition_tokens(" dca1  |  | 0.1") == ["dca1"]
+
+
+def test_overlap_matrix():
+    positions = {
+        "Position a": _position(" 1 2  |  | 0.2"),
+        "Position b": _position(" 1  |  | 0.2", " dca1  |  | 0.1"),
+        "Position c": _position(" 2  |  | 0.2"),
+    }
+    bitmaps = ConditionBitmaps.from_positions(positions)
+    names, intersection, jaccard = bitmaps.overlap_matrix()
+
+    assert names == ["1", "2", "dca1"]
+    assert bitmaps.counts() == {"1": 2, "2": 2, "dca1": 1}
+    assert intersection.tolist() == [[2, 1, 1], [1, 2, 0], [1, 0, 1]]
+    assert np.isclose(jaccard[0, 1], 1 / 3)
+    assert bitmaps.redundant_pairs(0.5) == [
+        {"Conditions": ["1", "dca1"], "Shared positions": 1, "Jaccard": 0.5}
+    ]
+
+
+def test_overlap_matches_set_semantics_on_cache():
+    report = json.loads((CACHE_DIR / "btc-long-bot.json").read_text())["global_test"]
+    bitmaps = ConditionBitmaps.from_positions(report["positions"])
+    names, intersection, _ = bitmaps.overlap_matrix()
+
+    sets = {k: set(i for i, b in enumerate(bitmaps.bitmaps[k]) if b) for k in names}
+    for i, a in enumerate(names):
+        for j, b in enumerate(names):
+            assert intersection[i, j] == len(sets[a] & sets[b])
@@ -0,0 +1,56 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from utils.order_table import OrderTable
+from utils.signal_processing import SignalParser, encode_signals, format_size_percent
+
+CACHE_FILES = sorted((Path(__file__).resolve().parent.parent / "data" / "cache").glob("*.json"))
+
+
+def _legacy_decode(signal):
+    """Report exporter decoding before the batch parser."""
+    try:
+        data = encode_signals(signal)
+        return str(data.get("conditions", "")).strip(), format_size_percent(data.get("sizeEquity", ""))
+    except Exception:
+        return signal.strip(), ""
+
+
+@pytest.mark.parametrize("cache_file", CACHE_FILES, ids=lambda p: p.stem)
+def test_parser_matches_per_order_decoding(cache_file):
+    signals = [str(o["Signal"]) for o in json.loads(cache_file.read_text())["global_test"]["orders"]]
+    column = SignalParser().parse_column(signals)
+
+    for row, signal in enumerate(signals):
+        parsed = column[row]
+        assert (parsed.conditions, parsed.size_text) == _legacy_decode(signal)
+        assert parsed.head == signal.split(" | ")[0]
+        if len(signal.split(" | ")) >= 3:
+            encoded = encode_signals(signal)
+            assert (parsed.limit, parsed.size_equity) == (encoded["limit"], encoded["sizeEquity"])
+
+
+def test_condition_tokens_are_interned_and_shared():
+    parser = SignalParser()
+    column = parser.parse_column([" 4  | 58182.807 | 0.2", " 4  | 63151.036 | 0.2", " 4 dca1  |  | 0.25", "bad | x | 0.1"])
+
+    ids = column.condition_ids
+    assert ids[0] is ids[1]
+    assert ids[2] == ("4", "dca1") and ids[2][0] is ids[0][0]
+    np.testing.assert_array_equal(column.limit[:3], [58182.807, 63151.036, 0.0])
+    np.testing.assert_array_equal(column.size_equity[:3], [0.2, 0.2, 0.25])
+    assert (column[3].conditions, column[3].size_text) == ("bad | x | 0.1", "")
+    assert parser.parse(" 4  | 58182.807 | 0.2") is column[0]
+
+
+def test_order_table_parses_each_distinct_signal_once():
+    orders = json.loads(CACHE_FILES[0].read_text())["global_test"]["orders"]
+    table = OrderTable.from_records(orders)
+
+    signals = table.signals()
+    assert table.signals() is signals
+    assert len(signals.distinct) == len({str(o["Signal"]) for o in orders})
+    assert table[1].signal() is signals[1]
@@ -0,0 +1,57 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from analytics.strategy_analyzer import StrategyAnalyzer
+
+CACHE_FILES = sorted((Path(__file__).resolve().parent.parent / "data" / "cache").glob("*.json"))
+
+
+def _reports(cache_file):
+    cache = json.loads(cache_file.read_text())
+    yield "global_test", cache["global_test"]
+    for condition, report in cache["single_test"].items():
+        if isinstance(report, dict):
+            yield f"single_test[{condition}]", report
+
+
+@pytest.mark.parametrize("cache_file", CACHE_FILES, ids=lambda p: p.stem)
+def test_aggregation_matches_golden_cache(cache_file):
+    analyzer = StrategyAnalyzer({})
+    for name, report in _reports(cache_file):
+        positions, conditions = analyzer._aggregate_orders(report["orders"])
+
+        assert json.dumps(positions) == json.dumps(report["positions"]), name
+        assert json.dumps(conditions) == json.dumps(report["conditions"]), name
+
+
+def test_aggregation_without_orders():
+    assert StrategyAnalyzer({})._aggregate_orders([]) == ({}, {})
+
+
+def _order(trade, kind, when, signal, pnl=1.0):
+    return {"Trade #": trade, "Type": f"{kind} long", "Date/Time": when, "Signal": signal, "Net P&L USD": pnl}
+
+
+def test_dca_entries_are_joined_by_trade_number():
+    orders = [
+        _order(1, "Exit", "2020-01-05 00:00:00", "0.10"),
+        _order(2, "Exit", "2020-01-05 00:00:00", "0.10"),
+        _order(2, "Entry", "2020-01-03 00:00:00", " dca1  |  | 0.1", pnl=-1.0),
+        _order(1, "Entry", "2020-01-01 00:00:00", " 4  | 100 | 0.2"),
+        _order(1, "Entry", "2020-01-02 00:00:00", " dca2  |  | 0.1"),
+        _order(3, "Exit", "2020-02-01 00:00:00", "Open"),
+        _order(3, "Entry", "2020-01-20 00:00:00", " 4  | 120 | 0.2"),
+    ]
+    positions, conditions = StrategyAnalyzer({})._aggregate_orders(orders)
+
+    first = positions["Position 2020-01-05 00:00:00"]
+    assert [o["Signal"] for o in first["orders"]] == [" 4  | 100 | 0.2", " dca2  |  | 0.1", " dca1  |  | 0.1"]
+    assert first["Position max drawdown %"] == -10.0
+    assert positions["Position 2020-02-01 00:00:00"]["Position max drawdown %"] == 0
+
+    assert conditions["4"]["Entry Triggers time"] == 2
+    assert conditions["4"]["Max drawdown %"] == -10.0
+    assert conditions["dca1"]["DCA Triggers time"] == 1
+    assert conditions["dca1"]["Lose orders"] == 1
@@ -0,0 +1,47 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from analytics.tag_rules import TagRuleEngine, cache_reports, compile_expression, legacy_rules
+
+CACHE_FILES = sorted((Path(__file__).resolve().parent.parent / "data" / "cache").glob("*.json"))
+
+THRESHOLDS = {
+    "OVERFIT_CONDITIONS": {"TOTAL_TRADES_LOWER": 15, "WIN_RATE_UPPER": 80},
+    "RISK_CONDITIONS": {"MDD_LOWER": -35},
+    "GOOD_CONDITIONS": {"TOTAL_TRADES_UPPER": 30, "WIN_RATE_UPPER": 80},
+}
+
+
+def test_legacy_thresholds_reproduce_cached_tags():
+    caches = [json.loads(path.read_text()) for path in CACHE_FILES]
+    cached = [list(r["tags"]) for cache in caches for r in cache_reports(cache)]
+
+    assert TagRuleEngine(legacy_rules(THRESHOLDS)).retag(caches) == 0
+    assert [r["tags"] for cache in caches for r in cache_reports(cache)] == cached
+
+
+def test_combinators_and_nested_fields():
+    engine = TagRuleEngine([
+        {"tag": "FRAGILE", "when": {"any": [
+            ["Monte Carlo.Loss probability %", ">", 10],
+            {"not": ["Total trades", ">=", 5]},
+        ]}},
+        {"tag": "CORE", "when": ["Symbol", "in", ["BTC", "ETH"]]},
+    ], default_tag="OK")
+    reports = [
+        {"Total trades": 3, "Symbol": "BTC"},
+        {"Total trades": 50, "Monte Carlo": {"Loss probability %": 20.0}, "Symbol": "XAU"},
+        {"Total trades": 50, "Monte Carlo": {"Loss probability %": 1.0}},
+        {"Total trades": "", "Symbol": "ETH"},
+    ]
+
+    assert engine.evaluate(reports) == [["FRAGILE", "CORE"], ["FRAGILE"], ["OK"], ["FRAGILE", "CORE"]]
+    assert engine.fields == ["Monte Carlo.Loss probability %", "Total trades", "Symbol"]
+
+
+@pytest.mark.parametrize("expr", [["Total trades", "~", 1], ["Total trades", "<"], {"xor": []}, {"all": [], "any": []}])
+def test_malformed_rules_are_rejected(expr):
+    with pytest.raises(ValueError):
+        compile_expression(expr)
@@ -0,0 +1,56 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from analytics.metrics import EquityCurves
+from analytics.walk_forward import PeriodBreakdown, period_windows, profitable_share, walk_forward
+
+CACHE_FILES = sorted((Path(__file__).resolve().parent.parent / "data" / "cache").glob("*.json"))
+
+
+def test_rolling_windows_pair_in_and_out_of_sample():
+    windows = period_windows(np.datetime64("2019-01-01"), np.datetime64("2022-06-01"), "rolling", 730, 365)
+
+    assert [w[0] for w in windows] == [
+        "IS 2019-01-01..2020-12-31", "OOS 2020-12-31..2021-12-31",
+        "IS 2020-01-01..2021-12-31", "OOS 2021-12-31..2022-12-31",
+    ]
+    with pytest.raises(ValueError):
+        period_windows(np.datetime64("2019-01-01"), np.datetime64("2020-01-01"), "monthly")
+
+
+@pytest.mark.parametrize("mode", ["yearly", "rolling"])
+@pytest.mark.parametrize("cache_file", CACHE_FILES, ids=lambda p: p.stem)
+def test_periods_match_filtering(cache_file, mode):
+    curves = EquityCurves.from_orders(json.loads(cache_file.read_text())["global_test"]["orders"])
+    breakdown = PeriodBreakdown(curves)
+    windows = breakdown.windows(mode)
+    results = breakdown.stats(windows)
+
+    for row in range(len(curves.labels)):
+        for (label, start, end), period in zip(windows, results[row]):
+            inside = (curves.exit_time >= start) & (curves.exit_time < end) & curves.membership[row] & curves.closed
+            returns = curves.returns[inside]
+            equity = np.concatenate(([1.0], np.cumprod(1 + returns)))
+
+            assert period["Trades"] == inside.sum()
+            assert period["Net profit %"] == pytest.approx((equity[-1] - 1) * 100, abs=1e-3)
+            assert period["Max drawdown %"] == pytest.approx((equity / np.maximum.accumulate(equity) - 1).min() * 100, abs=1e-3)
+
+
+def test_profitable_share_prefers_out_of_sample():
+    periods = [
+        {"Period": "IS a", "Trades": 3, "Net profit %": -5.0},
+        {"Period": "OOS b", "Trades": 2, "Net profit %": 4.0},
+        {"Period": "OOS c", "Trades": 0, "Net profit %": 0.0},
+    ]
+
+    assert profitable_share(periods) == 100.0
+    assert profitable_share(periods[:1]) == 0.0
+    assert profitable_share([]) is None
+
+
+def test_no_trades():
+    assert walk_forward(EquityCurves.from_orders([])) == ([], {})
@@ -0,0 +1,152 @@
+"""
+Warm agent sessions for the optimization loop.
+
+Running a tool through its generated bash script repeats the install checks
+(``command -v``, installer fallbacks, ``grep`` on shell rc files) and
+``--version`` and cold-starts the CLI on every iteration. The pool resolves
+each tool's executable once, starts it directly and keeps one started
+process per worker and tool command waiting on stdin, so the next prompt is
+written to a process that has already booted (node runtime, auth, config)
+while the previous backtest was running.
+
+The supported CLIs answer one prompt per process, so a warm process is used
+for exactly one prompt and a replacement is started right after it.
+"""
+
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+from train.patch_output import terminate_process_group
+from train.scripts_cli import get_tool_command, resolve_tool_binary
+
+SessionKey = Tuple[str, Tuple[str, ...]]
+
+
+class AgentSessionPool:
+    """Tool processes started ahead of their prompts, one per worker and command."""
+
+    def __init__(self, prewarm: bool = True):
+        """
+        Initialize pool.
+
+        Args:
+            prewarm: Start the next process for a worker as soon as one is taken
+        """
+        self.prewarm = prewarm
+        self._binaries: Dict[str, str] = {}
+        self._warm: Dict[SessionKey, "asyncio.Task[asyncio.subprocess.Process]"] = {}
+
+    def resolve(self, tool: str) -> str:
+        """
+        Executable of a tool, resolved on first use.
+
+        Args:
+            tool: Choose "gemini", "cursor-agent", "copilot", or "amazon-q"
+
+        Returns:
+            Absolute executable path
+
+        Raises:
+            ValueError: If invalid tool specified
+            FileNotFoundError: If the tool is not installed
+        """
+        if tool not in self._binaries:
+            self._binaries[tool] = resolve_tool_binary(tool)
+        return self._binaries[tool]
+
+    @staticmethod
+    async def _spawn(arguments: List[str]) -> asyncio.subprocess.Process:
+        # Own process group so terminate_process_group also stops the tool's children
+        return await asyncio.create_subprocess_exec(
+            *arguments,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True,
+        )
+
+    async def _take(self, key: SessionKey) -> Optional[asyncio.subprocess.Process]:
+        """Warm process for a key if it started and is still waiting."""
+        task = self._warm.pop(key, None)
+        if task is None:
+            return None
+        try:
+            proc = await task
+        except OSError:
+            return None
+        return proc if proc.returncode is None else None
+
+    async def start(
+        self,
+        worker: str,
+        tool: str,
+        prompt: str,
+        command: str = "agent",
+        model: Optional[str] = None,
+        allow_all_tools: bool = True,
+        accept_all: bool = True,
+        no_interactive: bool = True,
+    ) -> asyncio.subprocess.Process:
+        """
+        Send a prompt to a worker's warm process (or a new one) and return it running.
+
+        Args:
+            worker: Worker name, e.g. "pc_1"; workers never share processes
+            tool: Choose "gemini", "cursor-agent", "copilot", or "amazon-q"
+            prompt: The prompt to send
+            command: Command for cursor-agent
+            model: Model for cursor-agent and gemini
+            allow_all_tools: Auto-approve tools for copilot and gemini
+            accept_all: Auto-approve tools for Amazon Q
+            no_interactive: Non-interactive mode for Amazon Q and gemini
+
+        Returns:
+            Process with the prompt written and stdin closed; stdout and stderr are pipes
+
+        Raises:
+            ValueError: If invalid tool specified
+            FileNotFoundError: If the tool is not installed
+        """
+        arguments, stdin_text = get_tool_command(
+            tool, self.resolve(tool), prompt, command, model, allow_all_tools, accept_all, no_interactive,
+        )
+        if stdin_text is None:
+            # The prompt is an argument, so the process cannot be started ahead
+            proc = await self._spawn(arguments)
+            proc.stdin.close()
+            return proc
+
+        key = (worker, tuple(arguments))
+        proc = await self._take(key)
+        for attempt in range(2):
+            if proc is None:
+                proc = await self._spawn(arguments)
+            try:
+                proc.stdin.write(stdin_text.encode("utf-8"))
+                await proc.stdin.drain()
+                proc.stdin.close()
+                break
+            except (BrokenPipeError, ConnectionResetError):
+                # The warm process exited while waiting; start a fresh one
+                await proc.wait()
+                proc = None
+                if attempt:
+                    raise
+        if self.prewarm:
+            self._warm[key] = asyncio.ensure_future(self._spawn(arguments))
+        return proc
+
+    async def close(self) -> None:
+        """Stop all warm processes."""
+        tasks, self._warm = list(self._warm.values()), {}
+        for task in tasks:
+            try:
+                proc = await task
+            except OSError:
+                continue
+            if proc.returncode is None:
+                terminate_process_group(proc)
+            await proc.wait()
+
+
+__all__ = ["AgentSessionPool"]
@@ -0,0 +1,304 @@
+"""
+Focused edits of a single strategy condition.
+
+Instead of pointing the agent at the whole ``train/pc_N.pine`` (hundreds of
+lines, most of them huge request.security tuples) the target condition is
+written to a small scratch file together with the variables it may use and
+the other conditions it must not overlap. The agent edits only that file;
+the edited condition (plus any new variable definitions above it) is then
+validated and spliced back in place of the original block.
+"""
+
+import os
+import re
+import textwrap
+from typing import Dict, List, Optional, Tuple
+
+from src.utils.file_operations import atomic_write
+from train.doc_index import (
+    SINGLE_ASSIGN, TUPLE_ASSIGN, security_expressions, split_top_level, condition_block, condition_span,
+    variable_definitions,
+)
+
+EDIT_MARKER = "// === EDIT BELOW ==="
+EDIT_SUFFIX = ".edit.pine"
+LINE_WIDTH = 120
+
+# Identifiers not preceded by a word character or dot, so 1e5 and a.b.c parse as one token or none
+IDENTIFIER = re.compile(r"(?<![\w.])[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*")
+NAMED_ARGUMENT = re.compile(r"\b[A-Za-z_]\w*\s*=(?!=)")
+STRING_LITERAL = re.compile(r"\"[^\"]*\"|'[^']*'")
+FUNCTION_DEFINITION = re.compile(r"^([A-Za-z_]\w*)\s*\([^)]*\)\s*=>")
+PINE_KEYWORDS = {
+    "and", "or", "not", "true", "false", "na", "if", "else", "var", "varip", "bool", "int", "float", "string",
+}
+PINE_BUILTINS = {
+    "open", "high", "low", "close", "volume", "hl2", "hlc3", "ohlc4", "hlcc4", "time", "time_close",
+    "bar_index", "last_bar_index", "nz", "fixnan", "year", "month", "weekofyear", "dayofmonth", "dayofweek",
+    "hour", "minute", "second",
+}
+PINE_NAMESPACES = {
+    "ta", "math", "request", "strategy", "syminfo", "timeframe", "barstate", "barmerge", "str", "array",
+    "color", "input",
+}
+
+
+def focused_edit_path(pinescript_path: str, cond_var: str) -> str:
+    """Scratch file of a focused edit, e.g. train/pc_1.openLong7.edit.pine."""
+    return f"{os.path.splitext(pinescript_path)[0]}.{cond_var}{EDIT_SUFFIX}"
+
+
+def _strip_comment(line: str) -> str:
+    return line.split("//", 1)[0].rstrip()
+
+
+def available_variables(code: str) -> Dict[str, List[Tuple[str, str]]]:
+    """
+    request.security outputs grouped by timeframe argument.
+
+    Args:
+        code: Pine Script source (typically the part above the condition)
+
+    Returns:
+        {timeframe: [(variable, expression without [offset]), ...]} in source order
+    """
+    groups: Dict[str, List[Tuple[str, str]]] = {}
+    for line in code.splitlines():
+        line = _strip_comment(line)
+        match = TUPLE_ASSIGN.match(line)
+        names = [n.strip() for n in match.group(1).split(",")] if match else None
+        if not match:
+            match = SINGLE_ASSIGN.match(line)
+            names = [match.group(1)] if match else None
+        if not match or "request.security(" not in match.group(2):
+            continue
+        rhs = match.group(2)
+        arguments = split_top_level(rhs[rhs.index("request.security(") + len("request.security("):])
+        timeframe = arguments[1] if len(arguments) > 1 else ""
+        expressions = security_expressions(rhs) if len(names) > 1 else [arguments[2] if len(arguments) > 2 else rhs]
+        for i, name in enumerate(names):
+            expression = expressions[i] if expressions and i < len(expressions) else rhs
+            groups.setdefault(timeframe, []).append((name, expression.replace("[offset]", "").replace(" ", "")))
+    return groups
+
+
+def other_conditions(code: str, cond_var: str) -> List[str]:
+    """Definitions of the sibling conditions (openLong1, openLong2, ... except cond_var)."""
+    base = re.sub(r"\d+$", "", cond_var)
+    names = re.findall(rf"^\s*(?:bool\s+)?({re.escape(base)}\d+)\s*=(?!=)", code, re.MULTILINE)
+    return [condition_block(code, name) for name in dict.fromkeys(names) if name != cond_var]
+
+
+def render_focused_edit(code: str, cond_var: str, source_path: str = "") -> str:
+    """
+    Scratch file content for a focused edit of one condition.
+
+    Args:
+        code: Full Pine Script source
+        cond_var: Condition variable, e.g. "openLong7"
+        source_path: Full script path, shown in the header
+
+    Returns:
+        Pine Script text: commented context, EDIT_MARKER, then the current condition
+
+    Raises:
+        ValueError: If the condition is not defined in the code
+    """
+    span = condition_span(code, cond_var)
+    if span is None:
+        raise ValueError(f"{cond_var} is not defined")
+    lines = code.splitlines()
+    header = [
+        f"// Focused edit of {cond_var}{f' ({source_path})' if source_path else ''}.",
+        f"// Only the lines below the EDIT BELOW marker are spliced back: the {cond_var} definition and,",
+        "// above it, any new request.security variables it needs. Comments and everything above the marker are ignored.",
+        "//",
+        "// Available variables (request.security outputs, [offset] omitted) by timeframe:",
+    ]
+    for timeframe, variables in available_variables("\n".join(lines[:span[0]])).items():
+        text = f"{timeframe}: " + ", ".join(f"{name}={expression}" for name, expression in variables)
+        header.extend(textwrap.wrap(
+            text, LINE_WIDTH, initial_indent="// ", subsequent_indent="//     ", break_long_words=False,
+        ))
+    siblings = other_conditions(code, cond_var)
+    if siblings:
+        header.extend(["//", "// Other conditions (read only, do not overlap their logic):"])
+        header.extend("// " + line for block in siblings for line in block.splitlines())
+    return "\n".join(header + ["", EDIT_MARKER] + lines[span[0]:span[1]]) + "\n"
+
+
+def _unknown_identifiers(expression: str, known: set) -> List[str]:
+    expression = NAMED_ARGUMENT.sub(" ", STRING_LITERAL.sub(" ", expression))
+    unknown = []
+    for name in IDENTIFIER.findall(expression):
+        if name in known or name in PINE_KEYWORDS or name in PINE_BUILTINS:
+            continue
+        if "." in name and name.split(".", 1)[0] in PINE_NAMESPACES:
+            continue
+        if name not in unknown:
+            unknown.append(name)
+    return unknown
+
+
+def _balanced(expression: str) -> bool:
+    depth = {"(": 0, "[": 0}
+    closing = {")": "(", "]": "["}
+    for char in STRING_LITERAL.sub(" ", expression):
+        if char in depth:
+            depth[char] += 1
+        elif char in closing:
+            depth[closing[char]] -= 1
+            if depth[closing[char]] < 0:
+                return False
+    return not any(depth.values())
+
+
+def splice_condition(code: str, cond_var: str, edited: str) -> str:
+    """
+    Replace a condition with its focused edit, after validation.
+
+    New variable definitions in the edit are inserted right above the
+    condition. The edit is rejected if it drops the condition, defines it more
+    than once, redefines an existing variable, contains anything other than
+    definitions, has unbalanced brackets or reads identifiers that are not
+    defined above the condition (or are Pine built-ins).
+
+    Args:
+        code: Full Pine Script source
+        cond_var: Condition variable, e.g. "openLong7"
+        edited: Scratch file content (text below EDIT_MARKER when present)
+
+    Returns:
+        Full source with the condition replaced
+
+    Raises:
+        ValueError: If the original or edited condition is missing or the edit is invalid
+    """
+    span = condition_span(code, cond_var)
+    if span is None:
+        raise ValueError(f"{cond_var} is not defined in the script")
+    if EDIT_MARKER in edited:
+        edited = edited.split(EDIT_MARKER, 1)[1]
+    region = [line for line in edited.splitlines() if _strip_comment(line).strip()]
+    region_text = "\n".join(region)
+
+    block_span = condition_span(region_text, cond_var)
+    if block_span is None:
+        raise ValueError(f"edit does not define {cond_var}")
+    block = region[block_span[0]:block_span[1]]
+    rest = region[:block_span[0]] + region[block_span[1]:]
+    if condition_span("\n".join(rest), cond_var) is not None:
+        raise ValueError(f"edit defines {cond_var} more than once")
+
+    lines = code.splitlines()
+    existing = set(variable_definitions(code))
+    known = set(variable_definitions("\n".join(lines[:span[0]])))
+    known.update(m.group(1) for m in map(FUNCTION_DEFINITION.match, lines[:span[0]]) if m)
+    for line in rest:
+        stripped = _strip_comment(line)
+        match = TUPLE_ASSIGN.match(stripped)
+        names = [n.strip() for n in match.group(1).split(",")] if match else None
+        if not match:
+            match = SINGLE_ASSIGN.match(stripped)
+            names = [match.group(1)] if match else None
+        if not match:
+            raise ValueError(f"unexpected line in edit: {line.strip()}")
+        redefined = [name for name in names if name in existing]
+        if redefined:
+            raise ValueError(f"edit redefines existing variables: {', '.join(redefined)}")
+        if not _balanced(match.group(2)):
+            raise ValueError(f"unbalanced brackets: {line.strip()}")
+        unknown = _unknown_identifiers(match.group(2), known)
+        if unknown:
+            raise ValueError(f"undefined identifiers: {', '.join(unknown)}")
+        known.update(names)
+
+    expression = " ".join(_strip_comment(line) for line in block).split("=", 1)[1]
+    if not expression.strip():
+        raise ValueError(f"{cond_var} has an empty definition")
+    if not _balanced(expression):
+        raise ValueError(f"unbalanced brackets in {cond_var}")
+    unknown = _unknown_identifiers(expression, known)
+    if unknown:
+        raise ValueError(f"undefined identifiers in {cond_var}: {', '.join(unknown)}")
+
+    spliced = lines[:span[0]] + rest + block + lines[span[1]:]
+    return "\n".join(spliced) + ("\n" if code.endswith("\n") else "")
+
+
+def write_focused_edit(pinescript_path: str, cond_var: str) -> str:
+    """
+    Write the scratch file of a focused edit next to the script.
+
+    Args:
+        pinescript_path: Full Pine Script path
+        cond_var: Condition variable, e.g. "openLong7"
+
+    Returns:
+        Scratch file path
+
+    Raises:
+        ValueError: If the condition is not defined in the script
+    """
+    with open(pinescript_path, "r", encoding="utf-8") as f:
+        code = f.read()
+    edit_path = focused_edit_path(pinescript_path, cond_var)
+    with atomic_write(edit_path, "w", encoding="utf-8") as f:
+        f.write(render_focused_edit(code, cond_var, pinescript_path))
+    return edit_path
+
+
+def apply_condition_edit(pinescript_path: str, cond_var: str, edited: str) -> Optional[str]:
+    """
+    Splice an edited condition into the script file.
+
+    The script is left untouched when the edit is invalid.
+
+    Args:
+        pinescript_path: Full Pine Script path
+        cond_var: Condition variable, e.g. "openLong7"
+        edited: Scratch file content or patch body (see splice_condition)
+
+    Returns:
+        None when applied, otherwise the reason the edit was rejected
+    """
+    try:
+        with open(pinescript_path, "r", encoding="utf-8") as f:
+            code = f.read()
+        spliced = splice_condition(code, cond_var, edited)
+    except (OSError, ValueError) as e:
+        return str(e)
+    if spliced != code:
+        with atomic_write(pinescript_path, "w", encoding="utf-8") as f:
+            f.write(spliced)
+    return None
+
+
+def apply_focused_edit(pinescript_path: str, cond_var: str, edit_path: Optional[str] = None) -> Optional[str]:
+    """
+    Splice a focused edit back into the script and remove the scratch file.
+
+    Args:
+        pinescript_path: Full Pine Script path
+        cond_var: Condition variable, e.g. "openLong7"
+        edit_path: Scratch file (focused_edit_path when None)
+
+    Returns:
+        None when applied, otherwise the reason the edit was rejected
+    """
+    edit_path = edit_path or focused_edit_path(pinescript_path, cond_var)
+    try:
+        with open(edit_path, "r", encoding="utf-8") as f:
+            edited = f.read()
+    except OSError as e:
+        return str(e)
+    finally:
+        if os.path.exists(edit_path):
+            os.remove(edit_path)
+    return apply_condition_edit(pinescript_path, cond_var, edited)
+
+
+__all__ = [
+    "EDIT_MARKER", "focused_edit_path", "available_variables", "other_conditions", "render_focused_edit",
+    "splice_condition", "write_focused_edit", "apply_condition_edit", "apply_focused_edit",
+]
@@ -0,0 +1,312 @@
+"""
+Lexical retrieval over the Pine Script reference for agent prompts.
+
+The reference (train/pinescripts_docs/pinescript_docs.md) is split into one
+section per function and indexed with TF-IDF. For a target condition such
+as ``openLong7`` the ``ta.*`` functions it uses, directly or through the
+variables it reads (request.security tuples are resolved positionally),
+form the query; the prompt then carries only the best sections within a
+token budget instead of the whole 43 KB file.
+"""
+
+import math
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+DOCS_PATH = os.path.join(os.path.dirname(__file__), "pinescripts_docs", "pinescript_docs.md")
+
+# "ta.alma()2 overloads", "ta.atr()"
+SECTION_HEADER = re.compile(r"^([A-Za-z_][A-Za-z0-9_.]*)\(\)(?:\s*\d+ overloads)?\s*$")
+# Identifiers with dotted namespaces ("ta.rsi", "request.security"), no trailing period
+TOKEN_PATTERN = r"[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*"
+TA_CALL = re.compile(r"\bta\.[A-Za-z_][A-Za-z0-9_]*")
+IDENTIFIER = re.compile(TOKEN_PATTERN)
+TUPLE_ASSIGN = re.compile(r"^\s*\[([^\]]*)\]\s*=\s*(.*)$")
+SINGLE_ASSIGN = re.compile(r"^\s*(?:(?:var|varip)\s+)?(?:(?:bool|float|int|string)\s+)?([A-Za-z_]\w*)\s*=(?!=)\s*(.*)$")
+# Repeated title terms weight a section towards its own function name
+TITLE_WEIGHT = 3
+
+
+class DocSection(NamedTuple):
+    """One function entry of the reference."""
+    title: str
+    text: str
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough model token count (about four characters per token)."""
+    return math.ceil(len(text) / 4)
+
+
+def split_sections(text: str) -> List[DocSection]:
+    """
+    Split the reference into function sections.
+
+    Args:
+        text: Reference markdown
+
+    Returns:
+        Sections in document order (text includes the header line)
+    """
+    sections: List[DocSection] = []
+    title, lines = None, []
+    for line in text.splitlines():
+        match = SECTION_HEADER.match(line)
+        if match:
+            if title is not None:
+                sections.append(DocSection(title, "\n".join(lines).strip()))
+            title, lines = match.group(1), []
+        lines.append(line)
+    if title is not None:
+        sections.append(DocSection(title, "\n".join(lines).strip()))
+    return sections
+
+
+def split_top_level(text: str) -> List[str]:
+    """
+    Split on commas outside brackets and parentheses.
+
+    Args:
+        text: Argument list without its enclosing brackets
+
+    Returns:
+        Stripped top-level items, e.g. the arguments of a call
+    """
+    parts, depth, start = [], 0, 0
+    for i, char in enumerate(text):
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif char == "," and depth == 0:
+            parts.append(text[start:i].strip())
+            start = i + 1
+    parts.append(text[start:].strip())
+    return parts
+
+
+def security_expressions(rhs: str) -> Optional[List[str]]:
+    """
+    Requested expressions of a tuple ``request.security`` call.
+
+    Args:
+        rhs: Right-hand side of an assignment
+
+    Returns:
+        [e1, e2, ...] of ``request.security(..., [e1, e2, ...], ...)``, or
+        None when rhs requests no list
+    """
+    call = rhs.find("request.security(")
+    start = rhs.find("[", call) if call >= 0 else -1
+    if start < 0:
+        return None
+    depth = 0
+    for end in range(start, len(rhs)):
+        depth += rhs[end] == "["
+        depth -= rhs[end] == "]"
+        if depth == 0:
+            return split_top_level(rhs[start + 1:end])
+    return None
+
+
+def variable_definitions(code: str) -> Dict[str, str]:
+    """
+    Map each assigned variable to the expression that defines it.
+
+    Args:
+        code: Pine Script source
+
+    Returns:
+        {variable: defining expression}; tuple members of request.security
+        get their own element of the requested list
+    """
+    definitions: Dict[str, str] = {}
+    for line in code.splitlines():
+        line = line.split("//", 1)[0]
+        match = TUPLE_ASSIGN.match(line)
+        if match:
+            names = [name.strip() for name in match.group(1).split(",")]
+            expressions = security_expressions(match.group(2))
+            for i, name in enumerate(names):
+                if expressions is not None and i < len(expressions):
+                    definitions[name] = expressions[i]
+                else:
+                    definitions[name] = match.group(2)
+            continue
+        match = SINGLE_ASSIGN.match(line)
+        if match:
+            definitions.setdefault(match.group(1), match.group(2))
+    return definitions
+
+
+def condition_span(code: str, cond_var: str) -> Optional[Tuple[int, int]]:
+    """
+    Line range of a condition definition including its indented continuation lines.
+
+    Args:
+        code: Pine Script source
+        cond_var: Condition variable, e.g. "openLong7"
+
+    Returns:
+        (first line index, end line index exclusive), or None when the condition is not defined
+    """
+    lines = code.splitlines()
+    pattern = re.compile(rf"^(\s*)(?:bool\s+)?{re.escape(cond_var)}\s*=(?!=)")
+    for i, line in enumerate(lines):
+        match = pattern.match(line)
+        if not match:
+            continue
+        indent = len(match.group(1))
+        end = i + 1
+        while end < len(lines):
+            following = lines[end]
+            if not following.strip() or len(following) - len(following.lstrip()) <= indent:
+                break
+            end += 1
+        return i, end
+    return None
+
+
+def condition_block(code: str, cond_var: str) -> str:
+    """
+    Source of a condition definition including its indented continuation lines.
+
+    Args:
+        code: Pine Script source
+        cond_var: Condition variable, e.g. "openLong7"
+
+    Returns:
+        Definition text, or "" when the condition is not defined
+    """
+    span = condition_span(code, cond_var)
+    if span is None:
+        return ""
+    return "\n".join(code.splitlines()[span[0]:span[1]])
+
+
+def condition_functions(code: str, cond_var: str, depth: int = 3) -> Tuple[List[str], Set[str]]:
+    """
+    ``ta.*`` functions and identifiers a condition depends on.
+
+    Args:
+        code: Pine Script source
+        cond_var: Condition variable, e.g. "openLong7"
+        depth: Levels of variable definitions to follow
+
+    Returns:
+        (functions in first-use order, identifiers read by the condition)
+    """
+    definitions = variable_definitions(code)
+    block = condition_block(code, cond_var).split("=", 1)[-1]
+    identifiers = list(dict.fromkeys(IDENTIFIER.findall(block)))
+    functions = list(dict.fromkeys(TA_CALL.findall(block)))
+    frontier, seen = identifiers, set()
+    for _ in range(depth):
+        following = []
+        for name in frontier:
+            expression = definitions.get(name)
+            if name in seen or expression is None:
+                continue
+            seen.add(name)
+            functions.extend(f for f in TA_CALL.findall(expression) if f not in functions)
+            following.extend(IDENTIFIER.findall(expression))
+        frontier = following
+    return functions, set(identifiers)
+
+
+class DocIndex:
+    """TF-IDF index over reference sections."""
+
+    def __init__(self, sections: List[DocSection]):
+        """
+        Initialize index.
+
+        Args:
+            sections: Reference sections
+        """
+        self.sections = sections
+        self.vectorizer = TfidfVectorizer(token_pattern=TOKEN_PATTERN, sublinear_tf=True)
+        self.matrix = self.vectorizer.fit_transform(
+            [" ".join([s.title] * TITLE_WEIGHT) + "\n" + s.text for s in sections]
+        )
+        self._titles = {s.title: i for i, s in enumerate(sections)}
+
+    @classmethod
+    def from_file(cls, path: str = DOCS_PATH) -> "DocIndex":
+        """Index of a reference file (cached per path and modification time)."""
+        return _load_index(path, os.path.getmtime(path))
+
+    def search(self, query: str, functions: Optional[List[str]] = None) -> List[Tuple[DocSection, float]]:
+        """
+        Rank sections for a query.
+
+        Args:
+            query: Free text (identifiers, function names)
+            functions: Function names whose own sections rank first, in this order
+
+        Returns:
+            (section, score) pairs, best first; sections without any matching term are omitted
+        """
+        scores = (self.matrix @ self.vectorizer.transform([query]).T).toarray().ravel()
+        exact = [self._titles[f] for f in functions or [] if f in self._titles]
+        rest = [int(i) for i in np.argsort(-scores, kind="stable") if scores[i] > 0 and i not in exact]
+        return [(self.sections[i], float(scores[i])) for i in exact + rest]
+
+    def select(
+        self, query: str, functions: Optional[List[str]] = None, top_k: int = 6, max_tokens: int = 2500
+    ) -> List[DocSection]:
+        """
+        Best sections that fit a token budget.
+
+        Args:
+            query: Free text (identifiers, function names)
+            functions: Function names whose own sections rank first
+            top_k: Maximum number of sections
+            max_tokens: Token budget for the selected sections
+
+        Returns:
+            Selected sections, best first
+        """
+        selected, used = [], 0
+        for section, _ in self.search(query, functions):
+            tokens = estimate_tokens(section.text)
+            if used + tokens > max_tokens:
+                continue
+            selected.append(section)
+            used += tokens
+            if len(selected) >= top_k:
+                break
+        return selected
+
+
+@lru_cache(maxsize=4)
+def _load_index(path: str, mtime: float) -> DocIndex:
+    with open(path, "r", encoding="utf-8") as f:
+        return DocIndex(split_sections(f.read()))
+
+
+def relevant_docs(code: str, cond_var: str, top_k: int = 6, max_tokens: int = 2500, path: str = DOCS_PATH) -> str:
+    """
+    Reference sections relevant to a condition, formatted for a prompt.
+
+    Args:
+        code: Pine Script source
+        cond_var: Condition variable, e.g. "openLong7"
+        top_k: Maximum number of sections
+        max_tokens: Token budget for the sections
+        path: Reference markdown path
+
+    Returns:
+        Sections separated by blank lines ("" when nothing matches)
+    """
+    functions, identifiers = condition_functions(code, cond_var)
+    # Variable names such as rsi50_30M or diplus_13_1H contribute their word parts
+    words = {part for name in identifiers for part in re.split(r"[_\d]+", name) if len(part) > 1}
+    query = " ".join(functions + sorted(words))
+    sections = DocIndex.from_file(path).select(query, functions, top_k, max_tokens)
+    return "\n\n".join(s.text for s in sections)
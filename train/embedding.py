@@ -7,6 +7,10 @@ import os
 from typing import Optional, Dict, Any, Literal
 from src.utils.lmm_utils import decode_LMM_output
 from train.scripts_cli import get_tool_script
+from train.doc_index import relevant_docs
+from train.condition_slice import write_focused_edit, apply_focused_edit, apply_condition_edit, render_focused_edit
+from train.patch_output import PatchReader, patch_instructions, read_patch, terminate_process_group
+from train.agent_sessions import AgentSessionPool
 from config import STRATEGY_SETTINGS
 
 
@@ -28,7 +32,12 @@ async def run_strategy_embedding(
     pinescript_path: str = "train/dev.pine",
     tool: Literal["cursor-agent", "copilot", "amazon-q"] = "cursor-agent",
     model: Optional[str] = None,
-    stream_logs: bool = False
+    stream_logs: bool = False,
+    docs_top_k: int = 6,
+    docs_token_budget: int = 2500,
+    edit_mode: Literal["full", "focused", "patch"] = "full",
+    sessions: Optional[AgentSessionPool] = None,
+    worker: str = "default"
 ) -> dict:
     """Build and run AI coding agent prompt with cursor-agent, copilot, or Amazon Q.
 
@@ -50,9 +59,18 @@ async def run_strategy_embedding(
         tool: Choose "cursor-agent", "copilot", or "amazon-q"
         model: Model to use (cursor-agent: "grok", "claude-sonnet-4")
         stream_logs: Enable real-time log streaming
+        docs_top_k: Pine reference sections to inline (0 points the agent at the whole file)
+        docs_token_budget: Token budget for the inlined reference sections
+        edit_mode: "full" lets the agent edit the whole script; "focused" gives it only the
+            condition (and the variables it may use) in a scratch file that is validated and
+            spliced back afterwards; "patch" inlines that slice, runs the tool without file
+            edits and applies the replacement block it prints
+        sessions: Run the tool through this warm session pool instead of a generated bash script
+        worker: Worker name whose warm process the pool uses (e.g. "pc_1")
 
     Returns:
-        Decoded LMM output dict
+        Decoded LMM output dict; in focused and patch mode "focused_edit" holds None when
+        the edit was applied, otherwise the reason it was rejected
     """
     # Use strategy settings as defaults
     name = name or STRATEGY_SETTINGS.get("asset_name", "XAU")
@@ -69,19 +87,55 @@ async def run_strategy_embedding(
     np_line = f"- Net Profit (%): {net_profit_percent}" if net_profit_percent is not None else "- Net Profit (%):"
     pp_line = f"- Percent profitable: {percent_profitable}" if percent_profitable is not None else "- Percent profitable:"
 
+    # Inline only the reference sections for the functions the condition uses
+    docs = ""
+    if docs_top_k:
+        try:
+            docs = relevant_docs(load_pine_code(path=pinescript_path), cond_var, docs_top_k, docs_token_budget)
+        except Exception as e:
+            print(f"⚠️ Pine docs retrieval failed: {e}")
+    if docs:
+        docs_instruction = f"Use these Pine Script reference sections to optimize the logic of `{cond_var}`:\n\n{docs}"
+    else:
+        docs_instruction = f"Learn logic and function in train/pinescripts_docs/pinescript_docs.md and use it to optimize the logic of `{cond_var}`"
+
+    # Focused mode: the agent only sees and edits the condition slice;
+    # patch mode: the slice goes into the prompt and the reply carries the replacement
+    edit_path = pinescript_path
+    code_sections = ""
+    if edit_mode == "focused":
+        try:
+            edit_path = write_focused_edit(pinescript_path, cond_var)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Focused edit unavailable, editing the full script: {e}")
+            edit_mode = "full"
+    elif edit_mode == "patch":
+        try:
+            scratch = render_focused_edit(load_pine_code(path=pinescript_path), cond_var, pinescript_path)
+            code_sections = f"\n\n# Code\n```pine\n{scratch}```\n\n# Output\n{patch_instructions(cond_var)}"
+        except ValueError as e:
+            print(f"⚠️ Patch mode unavailable, editing the full script: {e}")
+            edit_mode = "full"
+    if edit_mode == "patch":
+        source_ref = "the code in # Code"
+        edit_line = "[Just REPLY with the patch block described in # Output and not talking anything else]"
+    else:
+        source_ref = f"@{edit_path}"
+        edit_line = f"[Just EDIT the code in {source_ref} and not talking anything else]"
+
     # Get prompt template from settings
     prompt_template = STRATEGY_SETTINGS.get("prompt_template", {})
 
     # Build the main prompt
     prompt = f"""
 # Context
-[Just EDIT the code in @{pinescript_path} and not talking anything else]
+{edit_line}
 {prompt_template.get("context", "You are an AI agent specialized in PineScript code optimization.")}
 Your task is to edit/write the given PineScript strategy so that the backtest results meet the target condition.
 
 {prompt_template.get("asset_description", f"{name} can be long in some situation like:\n- trend following")}
 
-Learn logic and function in train/pinescripts_docs/pinescript_docs.md and use it to optimize the logic of `{cond_var}`
+{docs_instruction}
 
 # Backtest Result (Single Test for {cond_var})
 - Time: {time_backtest}
@@ -95,7 +149,7 @@ Learn logic and function in train/pinescripts_docs/pinescript_docs.md and use it
   Example: already have a >= b => no use anymore. open1 = rsi50_30M >= 50 so only use rsi50_30M < 50
   NOT use >= 45 or >=45 <= 60..., it's IN-RANGE and in same Direction
 - In {cond_var} only use maximum 3 logic conditions
-- Don't look at results or logic in another file, only focus on @{pinescript_path}
+- Don't look at results or logic in another file, only focus on {source_ref}
 - If condition has mdd <= -100%, try to add more conditions to reduce mdd
 - Keep strategy logic limited to variables already defined in request_security
 - You can define more variables in request_security but keep same output rules
@@ -126,94 +180,107 @@ Learn logic and function in train/pinescripts_docs/pinescript_docs.md and use it
 {assitent_comment_before if assitent_comment_before != "" else "No comment before"}
 
 # Task
-1. Analyze the given PineScript strategy and current backtest results (@{pinescript_path})
-2. Write/Rewrite the **code logic** of `{cond_var}` in @{pinescript_path} to get target
+1. Analyze the given PineScript strategy and current backtest results ({source_ref})
+2. Write/Rewrite the **code logic** of `{cond_var}` in {source_ref} to get target{code_sections}
 """.strip()
 
-    # Generate bash script using utility module
+    # Start the tool: a warm session process, or a generated bash script
     try:
-        bash_script = get_tool_script(
-            tool=tool,
-            prompt=prompt,
-            command=command,
-            model=model,
-            allow_all_tools=True,
-            accept_all=True,
-            no_interactive=True
-        )
-    except ValueError as e:
-        print(f"❌ {str(e)}")
+        if sessions is not None:
+            proc = await sessions.start(
+                worker,
+                tool,
+                prompt,
+                command=command,
+                model=model,
+                allow_all_tools=edit_mode != "patch",
+                accept_all=edit_mode != "patch",
+                no_interactive=True
+            )
+        else:
+            bash_script = get_tool_script(
+                tool=tool,
+                prompt=prompt,
+                command=command,
+                model=model,
+                allow_all_tools=edit_mode != "patch",
+                accept_all=edit_mode != "patch",
+                no_interactive=True
+            )
+            # Own process group so the tool's children stop with it
+            proc = await asyncio.create_subprocess_shell(
+                bash_script,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True
+            )
+    except (OSError, ValueError) as e:
+        print(f"❌ Error running {tool}: {str(e)}")
+        if edit_mode == "focused":
+            os.remove(edit_path)
         return {}
 
-    # Execute the subprocess
+    if edit_mode == "patch":
+        reader = PatchReader(cond_var)
+        try:
+            result = decode_LMM_output(await read_patch(proc, reader, timeout, f"[{tool}]" if stream_logs else None))
+        except Exception as e:
+            print(f"❌ Error running {tool}: {str(e)}")
+            result = {}
+        patch = reader.patch
+        result["focused_edit"] = apply_condition_edit(pinescript_path, cond_var, patch) if patch else "no patch block in output"
+        if result["focused_edit"]:
+            print(f"⚠️ Patch for {cond_var} rejected: {result['focused_edit']}")
+        return result
+
+    result = await _collect_output(proc, tool, timeout, stream_logs)
+    if edit_mode == "focused":
+        result["focused_edit"] = apply_focused_edit(pinescript_path, cond_var, edit_path)
+        if result["focused_edit"]:
+            print(f"⚠️ Focused edit of {cond_var} rejected: {result['focused_edit']}")
+    return result
+
+
+async def _collect_output(proc: asyncio.subprocess.Process, tool: str, timeout: int, stream_logs: bool) -> dict:
+    """Wait for a started tool and decode its stdout ({} on timeout or error)."""
+    async def read_stream(stream, prefix):
+        """Read stream line by line, printing it in real-time when streaming logs."""
+        lines = []
+        while True:
+            line = await stream.readline()
+            if not line:
+                break
+            decoded = line.decode('utf-8', errors='ignore').rstrip()
+            if stream_logs:
+                print(f"{prefix}: {decoded}")
+            lines.append(decoded)
+        return "\n".join(lines)
+
     try:
-        proc = await asyncio.create_subprocess_shell(
-            bash_script,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            shell=True
+        stdout_str, stderr_str, _ = await asyncio.wait_for(
+            asyncio.gather(
+                read_stream(proc.stdout, f"[{tool}]"),
+                read_stream(proc.stderr, f"[{tool} ERR]"),
+                proc.wait()
+            ),
+            timeout=timeout
         )
+    except asyncio.TimeoutError:
+        print(f"⚠️ {tool} timed out after {timeout}s, killing process")
+        terminate_process_group(proc)
+        await proc.wait()
+        return {}
+    except Exception as e:
+        print(f"❌ Error running {tool}: {str(e)}")
+        return {}
 
+    if stderr_str:
         if stream_logs:
-            # Real-time streaming mode
-            async def read_stream(stream, prefix):
-                """Read and print stream line by line in real-time."""
-                lines = []
-                while True:
-                    line = await stream.readline()
-                    if not line:
-                        break
-                    decoded = line.decode('utf-8', errors='ignore').rstrip()
-                    print(f"{prefix}: {decoded}")
-                    lines.append(decoded)
-                return "\n".join(lines)
-
-            try:
-                stdout_str, stderr_str, _ = await asyncio.wait_for(
-                    asyncio.gather(
-                        read_stream(proc.stdout, f"[{tool}]"),
-                        read_stream(proc.stderr, f"[{tool} ERR]"),
-                        proc.wait()
-                    ),
-                    timeout=timeout
-                )
-
-                if stderr_str:
-                    print(f"\n⚠️ [{tool}] stderr output detected")
-
-                return decode_LMM_output(stdout_str)
-
-            except asyncio.TimeoutError:
-                print(f"⚠️ {tool} timed out after {timeout}s, killing process")
-                proc.kill()
-                await proc.wait()
-                return {}
-
+            print(f"\n⚠️ [{tool}] stderr output detected")
         else:
-            # Wait for completion mode (no streaming)
-            try:
-                stdout, stderr = await asyncio.wait_for(
-                    proc.communicate(),
-                    timeout=timeout
-                )
-
-                stdout_str = stdout.decode('utf-8', errors='ignore') if stdout else ""
-                stderr_str = stderr.decode('utf-8', errors='ignore') if stderr else ""
-
-                if stderr_str:
-                    print(f"[{tool} stderr]: {stderr_str}")
-
-                return decode_LMM_output(stdout_str)
+            print(f"[{tool} stderr]: {stderr_str}")
 
-            except asyncio.TimeoutError:
-                print(f"⚠️ {tool} timed out after {timeout}s, killing process")
-                proc.kill()
-                await proc.wait()
-                return {}
-
-    except Exception as e:
-        print(f"❌ Error running {tool}: {str(e)}")
-        return {}
+    return decode_LMM_output(stdout_str)
 
 
 def load_pine_code(path: Optional[str] = None, name: Optional[str] = None) -> str:
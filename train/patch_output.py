@@ -0,0 +1,158 @@
+"""
+Structured patch output for non-agentic tool runs.
+
+In patch mode the tool is not allowed to edit files. It answers with one
+block holding the replacement for the target condition::
+
+    <<<PATCH openLong7
+    [rsi_7_30M] = request.security(tickerid, T30m, [ta.rsi(close, 7)[offset]], lookahead = lookahead_type)
+    bool openLong7 = rsi_7_30M < 30
+    PATCH>>>
+
+The block is parsed from stdout as it streams, and the tool's process
+group is terminated as soon as the block closes. The caller then validates
+and splices the body with condition_slice.
+"""
+
+import asyncio
+import os
+import re
+import signal
+from typing import List, Optional
+
+PATCH_OPEN = "<<<PATCH"
+PATCH_CLOSE = "PATCH>>>"
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]")
+FENCE = re.compile(r"^\s*```")
+# Seconds to wait for a terminated tool to close stderr
+DRAIN_TIMEOUT = 5
+
+
+def patch_instructions(cond_var: str) -> str:
+    """Output format section of a patch-mode prompt."""
+    return f"""Do NOT edit any file and do NOT run tools. Reply with exactly one patch block and nothing after it:
+- first a line `{PATCH_OPEN} {cond_var}`
+- then any new request.security variable definitions `{cond_var}` needs, followed by the complete new `{cond_var}` definition
+- last a line `{PATCH_CLOSE}`"""
+
+
+class PatchReader:
+    """Incremental parser of the patch block for one condition."""
+
+    def __init__(self, cond_var: str):
+        """
+        Initialize reader.
+
+        Args:
+            cond_var: Condition variable the patch must be for, e.g. "openLong7"
+        """
+        self.opening = re.compile(rf"{re.escape(PATCH_OPEN)}\s+{re.escape(cond_var)}\s*$")
+        self.closing = re.compile(rf"(?:^|\s){re.escape(PATCH_CLOSE)}\s*$")
+        self.lines: List[str] = []
+        self.opened = False
+        self.closed = False
+
+    def feed(self, line: str) -> bool:
+        """
+        Consume one output line.
+
+        Args:
+            line: Tool output line (ANSI colors allowed)
+
+        Returns:
+            True once the patch block has closed
+        """
+        if self.closed:
+            return True
+        line = ANSI_ESCAPE.sub("", line).rstrip("\r\n")
+        if not self.opened:
+            # A repeated opening line restarts the block (the first one may be echoed prompt text)
+            self.opened = bool(self.opening.search(line))
+        elif self.closing.search(line):
+            self.closed = True
+        elif self.opening.search(line):
+            self.lines = []
+        elif not FENCE.match(line):
+            self.lines.append(line)
+        return self.closed
+
+    @property
+    def patch(self) -> Optional[str]:
+        """Body of the closed patch block, or None."""
+        return "\n".join(self.lines) + "\n" if self.closed else None
+
+
+def terminate_process_group(proc: asyncio.subprocess.Process) -> None:
+    """
+    Terminate a tool process and its children.
+
+    The whole group is signalled only when the process leads its own group
+    (started with start_new_session=True); otherwise only the process is killed.
+
+    Args:
+        proc: Running subprocess
+    """
+    try:
+        if os.getpgid(proc.pid) == proc.pid:
+            os.killpg(proc.pid, signal.SIGTERM)
+        else:
+            proc.kill()
+    except ProcessLookupError:
+        pass
+
+
+async def read_patch(
+    proc: asyncio.subprocess.Process,
+    reader: PatchReader,
+    timeout: float,
+    log_prefix: Optional[str] = None,
+) -> str:
+    """
+    Stream a tool's output into a PatchReader and stop the tool once the patch closes.
+
+    Args:
+        proc: Subprocess with piped stdout and stderr
+        reader: Patch reader for the target condition
+        timeout: Seconds to wait for the patch before terminating the tool
+        log_prefix: Print output lines with this prefix (None keeps quiet)
+
+    Returns:
+        Stdout read so far
+    """
+    lines: List[str] = []
+
+    async def read_stdout():
+        while not reader.closed:
+            raw = await proc.stdout.readline()
+            if not raw:
+                break
+            line = raw.decode("utf-8", errors="ignore").rstrip()
+            if log_prefix:
+                print(f"{log_prefix}: {line}")
+            lines.append(line)
+            reader.feed(line)
+
+    async def drain_stderr():
+        while True:
+            raw = await proc.stderr.readline()
+            if not raw:
+                break
+            if log_prefix:
+                print(f"{log_prefix} ERR: {raw.decode('utf-8', errors='ignore').rstrip()}")
+
+    stderr_task = asyncio.ensure_future(drain_stderr())
+    try:
+        await asyncio.wait_for(read_stdout(), timeout=timeout)
+    except asyncio.TimeoutError:
+        print(f"⚠️ No patch after {timeout}s, terminating tool")
+    if proc.returncode is None:
+        terminate_process_group(proc)
+    await proc.wait()
+    try:
+        await asyncio.wait_for(stderr_task, timeout=DRAIN_TIMEOUT)
+    except asyncio.TimeoutError:
+        pass
+    return "\n".join(lines)
+
+
+__all__ = ["PATCH_OPEN", "PATCH_CLOSE", "patch_instructions", "PatchReader", "terminate_process_group", "read_patch"]
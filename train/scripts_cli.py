@@ -2,7 +2,17 @@
 Utility module for AI coding tool bash script generation
 Supports cursor-agent, GitHub Copilot CLI, and Amazon Q Developer CLI
 """
-from typing import Optional, Literal
+import os
+import shutil
+from typing import List, Optional, Literal, Tuple
+
+# Executable of each tool and the directories its installer uses besides PATH
+TOOL_BINARIES = {
+    "cursor-agent": ("cursor-agent", ["~/.local/bin"]),
+    "copilot": ("copilot", []),
+    "amazon-q": ("q", ["~/q/bin"]),
+    "gemini": ("gemini", []),
+}
 
 
 def generate_cursor_agent_script(prompt: str, command: str = "agent", model: Optional[str] = None) -> str:
@@ -137,7 +147,7 @@ def get_tool_script(
         prompt: The prompt to send
         command: Command for cursor-agent (default: "agent")
         model: Model for cursor-agent (e.g., "grok", "claude-sonnet-4")
-        allow_all_tools: Auto-approve tools for copilot (default: True)
+        allow_all_tools: Auto-approve tools for copilot and gemini (default: True)
         accept_all: Auto-approve tools for Amazon Q (default: True)
         no_interactive: Non-interactive mode for Amazon Q (default: True)
 
@@ -154,11 +164,13 @@ def get_tool_script(
     elif tool == "amazon-q":
         return generate_amazon_q_script(prompt, accept_all, no_interactive)
     elif tool == "gemini":  
-        return generate_gemini_cli_script(prompt, model, no_interactive)
+        return generate_gemini_cli_script(prompt, model, no_interactive, allow_all_tools)
     else:
         raise ValueError(f"Invalid tool: {tool}. Choose 'gemini', 'cursor-agent', 'copilot', or 'amazon-q'")
 
-def generate_gemini_cli_script(prompt: str, model: Optional[str] = None, non_interactive: bool = True) -> str:
+def generate_gemini_cli_script(
+    prompt: str, model: Optional[str] = None, non_interactive: bool = True, yolo: bool = True
+) -> str:
     """Generate bash script for Google Gemini CLI.
 
     Args:
@@ -166,6 +178,7 @@ def generate_gemini_cli_script(prompt: str, model: Optional[str] = None, non_int
         model: Model to use (e.g., "gemini-2.5-flash", "gemini-2.5-pro")
                Default is gemini-2.5-pro if not specified
         non_interactive: If True, run in non-interactive mode (exit after response)
+        yolo: If True, auto-approve all tool usage (--yolo)
 
     Returns:
         Complete bash script as string
@@ -176,6 +189,7 @@ def generate_gemini_cli_script(prompt: str, model: Optional[str] = None, non_int
     
     # Build model flag
     model_flag = f"-m '{model}'" if model else ""
+    yolo_flag = "--yolo" if yolo else ""
     
     script = f"""
 set -e
@@ -202,10 +216,10 @@ gemini --version || true
 # Run Gemini CLI
 if [ "{non_interactive}" = "True" ]; then
     # Non-interactive mode: pipe prompt and exit
-    echo '{escaped_prompt}' | gemini --yolo
+    echo '{escaped_prompt}' | gemini {yolo_flag}
 else
     # Interactive mode: use heredoc for multi-line prompt
-    gemini --yolo <<'EOF'
+    gemini {yolo_flag} <<'EOF'
 {prompt}
 /quit
 EOF
@@ -215,10 +229,79 @@ fi
     return script
 
 
+
+def resolve_tool_binary(tool: str) -> str:
+    """Resolve the executable of a tool once (PATH first, then its install directories).
+
+    Args:
+        tool: Choose "gemini", "cursor-agent", "copilot", or "amazon-q"
+
+    Returns:
+        Absolute path of the executable
+
+    Raises:
+        ValueError: If invalid tool specified
+        FileNotFoundError: If the tool is not installed (run its get_tool_script once to install it)
+    """
+    if tool not in TOOL_BINARIES:
+        raise ValueError(f"Invalid tool: {tool}. Choose 'gemini', 'cursor-agent', 'copilot', or 'amazon-q'")
+    binary, directories = TOOL_BINARIES[tool]
+    search_path = os.pathsep.join([os.environ.get("PATH", "")] + [os.path.expanduser(d) for d in directories])
+    path = shutil.which(binary, path=search_path)
+    if path is None:
+        raise FileNotFoundError(f"{binary} not found for {tool}; run the {tool} script once to install it")
+    return path
+
+
+def get_tool_command(
+    tool: str,
+    binary: str,
+    prompt: str,
+    command: str = "agent",
+    model: Optional[str] = None,
+    allow_all_tools: bool = True,
+    accept_all: bool = True,
+    no_interactive: bool = True
+) -> Tuple[List[str], Optional[str]]:
+    """Get the direct invocation of a tool (same flags as get_tool_script, no install checks).
+
+    Args:
+        tool: Choose "gemini", "cursor-agent", "copilot", or "amazon-q"
+        binary: Executable from resolve_tool_binary
+        prompt: The prompt to send
+        command: Command for cursor-agent (default: "agent")
+        model: Model for cursor-agent and gemini
+        allow_all_tools: Auto-approve tools for copilot and gemini (default: True)
+        accept_all: Auto-approve tools for Amazon Q (default: True)
+        no_interactive: Non-interactive mode for Amazon Q and gemini (default: True)
+
+    Returns:
+        (argument list, stdin text); the prompt goes through stdin, except for
+        copilot which takes it as an argument (stdin text None)
+
+    Raises:
+        ValueError: If invalid tool specified
+    """
+    if tool == "cursor-agent":
+        return [binary, command] + (["--model", model] if model else []), f"{prompt}\n/exit\n"
+    elif tool == "copilot":
+        return [binary, "-p", prompt] + (["--allow-all-tools"] if allow_all_tools else []), None
+    elif tool == "amazon-q":
+        flags = (["-a"] if accept_all else []) + (["--no-interactive"] if no_interactive else [])
+        return [binary, "chat"] + flags, f"{prompt}\n"
+    elif tool == "gemini":
+        arguments = [binary] + (["-m", model] if model else []) + (["--yolo"] if allow_all_tools else [])
+        return arguments, f"{prompt}\n" if no_interactive else f"{prompt}\n/quit\n"
+    else:
+        raise ValueError(f"Invalid tool: {tool}. Choose 'gemini', 'cursor-agent', 'copilot', or 'amazon-q'")
+
+
 __all__ = [
     "generate_gemini_cli_script",
     "generate_cursor_agent_script",
     "generate_copilot_script",
     "generate_amazon_q_script",
-    "get_tool_script"
+    "get_tool_script",
+    "resolve_tool_binary",
+    "get_tool_command"
 ]